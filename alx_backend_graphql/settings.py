@@ -50,6 +50,23 @@ CRONJOBS = [
     ('0 */12 * * *', 'crm.cron.update_low_stock'),
 ]
 
+# Jobs of the resident scheduler (manage.py run_scheduler, crm/scheduler.py):
+# the CRONJOBS plus the crontabs of crm/cron_jobs, run in one long-lived
+# process with a pool of CRM_SCHEDULER_WORKERS threads. Durations and results
+# of the runs are recorded in the CRM_SCHEDULER_STATE JSON file.
+CRM_SCHEDULER_JOBS = [
+    *CRONJOBS,
+    ('0 2 * * 0', 'crm.cron.clean_inactive_customers'),
+    ('0 8 * * *', 'crm.cron_jobs.send_order_reminders.send_order_reminders'),
+]
+CRM_SCHEDULER_WORKERS = 4
+CRM_SCHEDULER_STATE = '/tmp/crm_scheduler_state.json'
+
+# Scheduled jobs execute GraphQL in-process ('inprocess') or over HTTP ('http')
+CRM_GRAPHQL_TRANSPORT = 'inprocess'
+CRM_HEARTBEAT_TRANSPORT = 'inprocess'
+CRM_GRAPHQL_URL = 'http://localhost:8000/graphql'
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -84,10 +101,52 @@ WSGI_APPLICATION = 'alx_backend_graphql.wsgi.application'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 DATABASES = {
+    # Writes: mutations, cron jobs, Celery tasks and management commands
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {
+            # Write transactions take the database lock at BEGIN and queue for
+            # it, instead of failing with "database is locked" when two
+            # concurrent orders upgrade from a read to a write lock.
+            'transaction_mode': 'IMMEDIATE',
+            # Seconds a writer waits for that lock before giving up.
+            'timeout': 20,
+        },
+        # Keep connections open between requests, checking them before reuse.
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    # Reads of GraphQL query operations (crm/db.py); the same file, on
+    # connections of its own
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+        },
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['crm.db.ReadWriteRouter']
+CRM_WRITE_DATABASE = 'default'
+CRM_READ_DATABASE = 'replica'
+
+# Applied to every new SQLite connection (crm/db.py). WAL lets readers and the
+# writer proceed concurrently; NORMAL sync is durable across application
+# crashes in WAL mode. busy_timeout matches the 'timeout' option above.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'cache_size': -65536,  # KiB, i.e. 64 MiB of page cache per connection
+    'mmap_size': 268435456,  # 256 MiB of the file memory-mapped
+    'temp_store': 'MEMORY',
 }
 
 
@@ -124,9 +183,75 @@ USE_TZ = True
 # GRAPHENE Configuration
 # Points the runtime to the location of the root schema object
 GRAPHENE = {
-    "SCHEMA": "alx_backend_graphql.schema.schema"
+    "SCHEMA": "alx_backend_graphql.schema.schema",
+    # Per-field resolver timings for the operation trace (crm/tracing.py)
+    "MIDDLEWARE": ["crm.tracing.TracingMiddleware"],
 }
 
+# Report each GraphQL operation's resolver timings and SQL totals in the
+# `tracing` response extension, a Server-Timing header and a crm.graphql log line
+GRAPHQL_TRACING = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'require_debug_true': {'()': 'django.utils.log.RequireDebugTrue'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        # Only while DEBUG is on: the test runner turns it off, so test runs
+        # stay quiet. In production, give crm.graphql a handler of its own.
+        'debug_console': {'class': 'logging.StreamHandler', 'filters': ['require_debug_true']},
+    },
+    'loggers': {
+        # One line per GraphQL operation (crm/tracing.py)
+        'crm.graphql': {'handlers': ['debug_console'], 'level': 'INFO', 'propagate': False},
+        'crm.scheduler': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+# Parsed/validated document LRU cache and persisted-query store (crm/documents.py)
+GRAPHQL_DOCUMENT_CACHE_SIZE = 512
+GRAPHQL_PERSISTED_QUERY_LIMIT = 2048
+
+# Operations whose estimated cost (rows touched, see crm/cost.py) exceeds this
+# are rejected before execution. None disables the check.
+GRAPHQL_QUERY_COST_LIMIT = 20000
+
+# Connections count their rows exactly for totalCount while the scanned table
+# holds at most this many rows, and estimate the count beyond it (crm/counts.py)
+GRAPHQL_EXACT_COUNT_LIMIT = 100000
+
+# Response cache for query operations (crm/response_cache.py): the cache alias
+# holding responses (None disables it). Its TIMEOUT is the TTL of a response,
+# and local memory evicts least recently used entries past MAX_ENTRIES, per
+# process; to share responses between web workers, point the alias at Redis:
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#   'LOCATION': 'redis://localhost:6379/1',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'graphql': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'graphql-responses',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+GRAPHQL_RESPONSE_CACHE = 'graphql'
+
+# Where the per-model versions that invalidate cached responses are kept: None
+# for the ModelVersion table, which every process writing to the database
+# sees, or the alias of a shared cache (Redis). A process-local cache is
+# refused while CRONJOBS or CRM_SCHEDULER_JOBS write from other processes.
+GRAPHQL_RESPONSE_CACHE_VERSIONS = None
+
+# Threads that run the blocking ORM calls of the async /graphql/async view
+# (crm/threadpool.py)
+GRAPHQL_ASYNC_ORM_WORKERS = 8
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
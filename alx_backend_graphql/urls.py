@@ -24,9 +24,15 @@ urlpatterns = [
 ]
 
 from django.urls import path
-from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
+from crm.views import AsyncCRMGraphQLView, CRMGraphQLView, ExportView, ImportView
 
 urlpatterns = [
-    path("graphql", csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path("graphql", csrf_exempt(CRMGraphQLView.as_view(graphiql=True))),
+    # Async endpoint; only worthwhile when served through asgi.py.
+    path("graphql/async", csrf_exempt(AsyncCRMGraphQLView.as_view(graphiql=True))),
+    # Streaming CSV/NDJSON exports, e.g. /export/orders.csv?total_amount_gte=100
+    path("export/<slug:resource>.<slug:export_format>", ExportView.as_view()),
+    # Streaming CSV/NDJSON uploads, upserting customers on email and products on id
+    path("import/<slug:resource>.<slug:import_format>", csrf_exempt(ImportView.as_view())),
 ]
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Benchmarks the bulkCreateCustomers mutation on 10k-record batches.
+
+Compares the set-based mutation (one IN lookup per 500 emails and chunked
+bulk_create) with the previous row-at-a-time path that loaded every stored
+email and saved each customer individually. Every run is rolled back, so the
+database is left untouched.
+
+Usage: python benchmarks/bulk_create_customers.py [batch_size] [existing_customers]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
+
+import django
+django.setup()
+
+from django.db import connection, transaction
+
+from alx_backend_graphql.schema import schema
+from crm.models import Customer
+from crm.validators import validate_email, validate_phone
+
+MUTATION = """
+mutation BulkCreate($input: [BulkCustomerInput]!) {
+  bulkCreateCustomers(input: $input) {
+    customers { id }
+    errors
+  }
+}
+"""
+
+
+class Rollback(Exception):
+    pass
+
+
+def make_batch(size, prefix):
+    # Every 50th record repeats an earlier email so the duplicate path is exercised.
+    return [
+        {
+            'name': f'Bench Customer {i}',
+            'email': f'{prefix}{i - 1 if i % 50 == 0 and i else i}@bench.example.com',
+            'phone': '+1234567890',
+        }
+        for i in range(size)
+    ]
+
+
+def legacy_bulk_create(records):
+    """The previous implementation, kept here only as the baseline."""
+    emails_in_batch = set(Customer.objects.values_list('email', flat=True))
+    for record in records:
+        email = record['email']
+        validate_email(email)
+        if email in emails_in_batch:
+            Customer.objects.filter(email=email).exists()
+            continue
+        validate_phone(record['phone'])
+        emails_in_batch.add(email)
+        Customer(name=record['name'], email=email, phone=record['phone']).save()
+
+
+def measure(label, run):
+    queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    try:
+        with transaction.atomic():
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+            raise Rollback
+    except Rollback:
+        pass
+    print(f"{label:<28} {elapsed * 1000:>10.1f} ms {queries:>8} queries")
+
+
+def run_benchmark(batch_size=10_000, existing=10_000):
+    try:
+        with transaction.atomic():
+            Customer.objects.bulk_create(
+                Customer(name=f'Existing {i}', email=f'existing{i}@bench.example.com')
+                for i in range(existing)
+            )
+            batch = make_batch(batch_size, 'new')
+            print(f"Batch of {batch_size} records against {existing} existing customers")
+            measure("row-at-a-time (previous)", lambda: legacy_bulk_create(batch))
+            measure(
+                "bulkCreateCustomers",
+                lambda: schema.execute(MUTATION, variable_values={'input': batch}),
+            )
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    run_benchmark(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,111 @@
+"""
+Load-tests createOrder while many orders compete for the same hot product.
+
+Worker threads place orders through the schema, each for a few units of one
+hot product plus a random cold one. The hot product has less stock than the
+orders ask for in total, so the later orders must be turned away. The run
+reports the throughput and latency, and checks that the stock was never
+oversold: the units sold plus the stock left must equal the starting stock.
+
+Threads need committed rows, so the data lives in a throwaway database file
+created like the test database.
+
+Usage: python benchmarks/concurrent_orders.py [orders] [threads] [hot_stock]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
+
+import django
+django.setup()
+
+from django.db import connection, connections
+from django.db.models import Sum
+from django.test.utils import setup_databases, teardown_databases
+
+from alx_backend_graphql.schema import schema
+from crm.models import Customer, OrderItem, Product
+
+MUTATION = """
+mutation Place($input: OrderInput!) {
+  createOrder(input: $input) {
+    order { id totalAmount }
+  }
+}
+"""
+COLD_PRODUCTS = 50
+
+
+def seed(hot_stock):
+    customers = Customer.objects.bulk_create(
+        [Customer(name=f'Customer {i}', email=f'customer{i}@example.com') for i in range(100)]
+    )
+    hot = Product.objects.create(name='Hot SKU', price=Decimal('49.99'), stock=hot_stock)
+    cold = Product.objects.bulk_create(
+        [Product(name=f'Product {i}', price=Decimal('9.99'), stock=1_000_000) for i in range(COLD_PRODUCTS)]
+    )
+    return [customer.pk for customer in customers], hot.pk, [product.pk for product in cold]
+
+
+def place_order(customer_pks, hot_pk, cold_pks, seed_value):
+    rng = random.Random(seed_value)
+    variables = {'input': {
+        'customerId': rng.choice(customer_pks),
+        'items': [
+            {'productId': hot_pk, 'quantity': rng.randint(1, 3)},
+            {'productId': rng.choice(cold_pks), 'quantity': 1},
+        ],
+    }}
+    started = time.perf_counter()
+    result = schema.execute(MUTATION, variable_values=variables, context_value=SimpleNamespace())
+    elapsed = time.perf_counter() - started
+    connections.close_all()
+    error = str(result.errors[0].message) if result.errors else None
+    return elapsed, error
+
+
+def run_benchmark(orders=2000, threads=16, hot_stock=1000):
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            customer_pks, hot_pk, cold_pks = seed(hot_stock)
+            connection.close()
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(
+                    lambda i: place_order(customer_pks, hot_pk, cold_pks, i), range(orders)
+                ))
+            wall = time.perf_counter() - started
+
+            latencies = sorted(elapsed for elapsed, _ in results)
+            placed = sum(1 for _, error in results if error is None)
+            out_of_stock = sum(1 for _, error in results if error and 'Insufficient stock' in error)
+            failed = len(results) - placed - out_of_stock
+            sold = OrderItem.objects.filter(product_id=hot_pk).aggregate(Sum('quantity'))['quantity__sum'] or 0
+            left = Product.objects.get(pk=hot_pk).stock
+
+            print(f"{orders} orders from {threads} threads, hot product stock {hot_stock}")
+            print(f"placed {placed}, out of stock {out_of_stock}, other errors {failed}")
+            print(f"{orders / wall:.1f} orders/s, p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+                  f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+            print(f"hot product: sold {sold}, left {left}, oversold {max(0, -left)}")
+            assert sold + left == hot_stock and left >= 0, "stock accounting is inconsistent"
+            if failed:
+                print("first error:", next(error for _, error in results if error and 'Insufficient stock' not in error))
+        finally:
+            connection.close()
+            teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == '__main__':
+    run_benchmark(*(int(arg) for arg in sys.argv[1:4]))
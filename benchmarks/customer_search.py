@@ -0,0 +1,88 @@
+"""
+Benchmarks the trigram search index behind CustomerFilter.name/email against
+the previous icontains scan.
+
+Loads N customers (1,000,000 by default) in chunks, then times each search
+both ways and checks that they return the same rows. Everything runs inside
+a transaction that is rolled back, so the database is left untouched.
+
+Usage: python benchmarks/customer_search.py [customers]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
+
+import django
+django.setup()
+
+from django.db import transaction
+
+from crm.filters import CustomerFilter
+from crm.models import Customer
+from crm.search import search_index_available
+
+CHUNK_SIZE = 10_000
+FIRST_NAMES = ['Alice', 'Bob', 'Carol', 'Dmitri', 'Esther', 'Farouk', 'Grace', 'Hiro', 'Ines', 'Jamal']
+LAST_NAMES = ['Johnson', 'Smith', 'King', 'Okafor', 'Nakamura', 'Garcia', 'Novak', 'Haddad', 'Moreau', 'Lee']
+SEARCHES = [
+    ('name', 'Okafor'),
+    ('name', 'race Nak'),
+    ('email', '12345@'),
+    ('email', '@example.org'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def load_customers(count):
+    rng = random.Random(42)
+    for start in range(0, count, CHUNK_SIZE):
+        batch = []
+        for i in range(start, min(start + CHUNK_SIZE, count)):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            domain = 'example.org' if i % 100 == 0 else 'example.com'
+            batch.append(Customer(
+                name=f'{first} {last}',
+                email=f'{first.lower()}.{last.lower()}{i}@{domain}',
+            ))
+        Customer.objects.bulk_create(batch)
+
+
+def timed(queryset):
+    started = time.perf_counter()
+    ids = list(queryset.values_list('pk', flat=True))
+    return ids, (time.perf_counter() - started) * 1000
+
+
+def run_benchmark(count=1_000_000):
+    if not search_index_available():
+        print("Search index is not installed; run migrate on SQLite with FTS5.")
+        return
+    try:
+        with transaction.atomic():
+            started = time.perf_counter()
+            load_customers(count)
+            print(f"Loaded {count} customers in {time.perf_counter() - started:.1f}s")
+            print(f"{'filter':<28} {'scan ms':>10} {'index ms':>10} {'rows':>8}")
+            for field, value in SEARCHES:
+                scan_ids, scan_ms = timed(
+                    Customer.objects.filter(**{f'{field}__icontains': value}).order_by('pk')
+                )
+                index_ids, index_ms = timed(
+                    CustomerFilter({field: value}, queryset=Customer.objects.order_by('pk')).qs
+                )
+                assert scan_ids == index_ids, f"{field}={value!r} results differ"
+                print(f"{field + '=' + repr(value):<28} {scan_ms:>10.1f} {index_ms:>10.1f} {len(index_ids):>8}")
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    run_benchmark(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,72 @@
+"""
+Benchmarks the streaming exports: throughput and peak memory per row count.
+
+For each size, generates that many orders (and a tenth as many customers, see
+crm/datagen.py) and downloads /export/orders.csv, /export/orders.ndjson and
+/export/customers.csv through the test client, consuming the response
+chunk by chunk as a client would. The peak memory allocated while streaming
+is measured with tracemalloc and should not grow with the number of rows.
+
+The data lives in a throwaway database file created like the test database.
+
+Usage: python benchmarks/export_memory.py [orders] [orders] ...
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
+
+import django
+django.setup()
+
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_databases, teardown_databases
+
+from crm.datagen import clear_data, generate_data
+
+EXPORTS = ('/export/orders.csv', '/export/orders.ndjson', '/export/customers.csv')
+DEFAULT_SIZES = (20_000, 200_000)
+
+
+def download(client, url):
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        response = client.get(url)
+        size = rows = 0
+        for chunk in response.streaming_content:
+            size += len(chunk)
+            rows += chunk.count(b'\n')
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return rows, size, elapsed, peak
+
+
+def run_benchmark(*sizes):
+    client = Client()
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            print(f"{'orders':>8} {'export':<24} {'rows':>8} {'MiB':>7} {'rows/s':>9} {'peak KiB':>9}")
+            for orders in sizes or DEFAULT_SIZES:
+                clear_data()
+                generate_data(customers=max(10, orders // 10), products=max(10, orders // 100), orders=orders)
+                for url in EXPORTS:
+                    rows, size, elapsed, peak = download(client, url)
+                    print(f"{orders:>8} {url:<24} {rows:>8} {size / 2**20:>7.1f} {rows / elapsed:>9.0f} "
+                          f"{peak / 1024:>9.0f}")
+        finally:
+            connections.close_all()
+            teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == '__main__':
+    run_benchmark(*(int(arg) for arg in sys.argv[1:]))
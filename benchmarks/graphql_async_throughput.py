@@ -0,0 +1,196 @@
+"""
+Benchmarks GraphQL throughput of the WSGI path against the ASGI paths.
+
+Sends the same nested query (two root connections plus customer/product
+relations) with a fixed number of requests in flight to:
+
+  wsgi        /graphql through the WSGI handler, one thread per request in flight
+  asgi-sync   /graphql through the ASGI handler, which runs the sync view in a thread
+  asgi-async  /graphql/async through the ASGI handler
+
+The handlers are called in-process, so no web server is needed. The data
+lives in a throwaway database file created like the test database, because
+the pool threads of the async view cannot see rows from an uncommitted
+transaction. The optional latency adds a sleep to every SQL statement, to
+simulate a database across the network.
+
+Usage: python benchmarks/graphql_async_throughput.py [requests] [concurrency] [latency_ms]
+"""
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
+
+import django
+django.setup()
+
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.utils import setup_databases, teardown_databases
+
+from crm.models import Customer, Order, Product
+
+QUERY = """
+{
+  allOrders(first: 20) {
+    edges { node { id totalAmount customer { name email } products { edges { node { name stock } } } } }
+  }
+  allCustomers(first: 20) {
+    edges { node { name orders(first: 5) { edges { node { id orderDate } } } } }
+  }
+}
+"""
+BODY = json.dumps({'query': QUERY}).encode()
+
+
+def seed(customers=500, products=100, orders=2000):
+    rng = random.Random(42)
+    customer_rows = Customer.objects.bulk_create(
+        [Customer(name=f'Customer {i}', email=f'customer{i}@example.com') for i in range(customers)]
+    )
+    product_rows = Product.objects.bulk_create(
+        [Product(name=f'Product {i}', price=Decimal('9.99'), stock=i) for i in range(products)]
+    )
+    order_rows = Order.objects.bulk_create(
+        [Order(customer=rng.choice(customer_rows), total_amount=Decimal('19.98')) for _ in range(orders)]
+    )
+    Through = Order.products.through
+    Through.objects.bulk_create([
+        Through(order_id=order.pk, product_id=product.pk)
+        for order in order_rows
+        for product in rng.sample(product_rows, 2)
+    ])
+
+
+def add_latency(latency_ms):
+    def delay(execute, sql, params, many, context):
+        time.sleep(latency_ms / 1000)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install, weak=False)
+
+
+def wsgi_request(application):
+    environ = {
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': '/graphql',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(BODY)),
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'wsgi.input': io.BytesIO(BODY),
+        'wsgi.url_scheme': 'http',
+    }
+    statuses = []
+    started = time.perf_counter()
+    body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+    elapsed = time.perf_counter() - started
+    assert statuses[0].startswith('200') and b'"errors"' not in body, body[:200]
+    return elapsed
+
+
+async def asgi_request(application, path):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'POST',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'headers': [(b'host', b'localhost'), (b'content-type', b'application/json')],
+        'server': ('localhost', 80),
+    }
+    received = []
+    messages = [{'type': 'http.request', 'body': BODY, 'more_body': False}]
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # Django listens for a disconnect until the response is sent.
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        received.append(message)
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    body = b''.join(message.get('body', b'') for message in received)
+    assert received[0]['status'] == 200 and b'"errors"' not in body, body[:200]
+    return elapsed
+
+
+def run_wsgi(requests, concurrency):
+    application = get_wsgi_application()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda _: wsgi_request(application), range(requests)))
+
+
+def run_asgi(requests, concurrency, path):
+    application = get_asgi_application()
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                return await asgi_request(application, path)
+
+        return await asyncio.gather(*(one() for _ in range(requests)))
+
+    return asyncio.run(main())
+
+
+def report(label, requests, wall, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    mean = sum(latencies) / len(latencies)
+    print(f"{label:<12} {requests / wall:>10.1f} {mean * 1000:>10.1f} {p95 * 1000:>10.1f}")
+
+
+def run_benchmark(requests=500, concurrency=16, latency_ms=0):
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            seed()
+            connection.close()
+            if latency_ms:
+                add_latency(latency_ms)
+
+            print(f"{requests} requests, {concurrency} in flight, {latency_ms} ms per SQL statement")
+            print(f"{'path':<12} {'req/s':>10} {'mean ms':>10} {'p95 ms':>10}")
+            runs = [
+                ('wsgi', lambda: run_wsgi(requests, concurrency)),
+                ('asgi-sync', lambda: run_asgi(requests, concurrency, '/graphql')),
+                ('asgi-async', lambda: run_asgi(requests, concurrency, '/graphql/async')),
+            ]
+            for label, run in runs:
+                run()  # warm up caches and connections
+                started = time.perf_counter()
+                latencies = run()
+                report(label, requests, time.perf_counter() - started, latencies)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == '__main__':
+    run_benchmark(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,240 @@
+"""
+Benchmarks the hot paths of the GraphQL API and writes the results as JSON.
+
+Generates a dataset of the given scale (customers; a tenth as many products
+and five orders per customer, see crm/datagen.py) and drives each scenario
+through the real schema:
+
+  all_orders_nested        allOrders page with customer, products and items
+  all_customers_filtered   allCustomers with name search, range filters and orderBy
+  create_order             createOrder with two to four line items
+  bulk_create_customers    bulkCreateCustomers with 100 new customers
+  update_low_stock         updateLowStockProducts with 20 products low on stock
+
+Each scenario reports p50/p95/p99 and mean latency, operations per second and
+SQL statements per operation, measured over the timed iterations, and the
+peak memory allocated during a separate run of a few iterations under
+tracemalloc (which slows execution too much to time under). Compare two JSON
+files to catch regressions in throughput or query counts.
+
+The data lives in a throwaway database file created like the test database.
+
+Usage: python benchmarks/graphql_suite.py [scale] [iterations] [output.json]
+"""
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
+
+import django
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from alx_backend_graphql.schema import schema
+from crm.datagen import LAST_NAMES, generate_data
+from crm.models import Product
+
+DEFAULT_OUTPUT = 'benchmark-results.json'
+MEMORY_ITERATIONS = 5
+
+ALL_ORDERS = """
+query AllOrders($first: Int) {
+  allOrders(first: $first) {
+    edges { node {
+      id totalAmount orderDate
+      customer { name email }
+      products { edges { node { name stock } } }
+      items { quantity product { name price } }
+    } }
+  }
+}
+"""
+ALL_CUSTOMERS = """
+query AllCustomers($name: String, $since: DateTime, $minOrders: Decimal) {
+  allCustomers(first: 50, name: $name, createdAtGte: $since, orderCountGte: $minOrders, orderBy: "-lifetimeValue") {
+    edges { node { id name email orderCount lifetimeValue lastOrderAt } }
+  }
+}
+"""
+CREATE_ORDER = """
+mutation CreateOrder($input: OrderInput!) {
+  createOrder(input: $input) { order { id totalAmount } }
+}
+"""
+BULK_CREATE_CUSTOMERS = """
+mutation BulkCreateCustomers($input: [BulkCustomerInput]!) {
+  bulkCreateCustomers(input: $input) { customers { id } errors }
+}
+"""
+UPDATE_LOW_STOCK = """
+mutation UpdateLowStock {
+  updateLowStockProducts { updatedProducts { id name stock } message }
+}
+"""
+
+
+def seed(scale):
+    data = generate_data(customers=scale, products=max(10, scale // 10), orders=scale * 5)
+    # Enough stock that createOrder never runs out during the run.
+    Product.objects.update(stock=1_000_000)
+    return list(data.customers), list(data.products)
+
+
+class Scenario:
+    """One operation to benchmark; ``prepare`` runs untimed before each execution."""
+
+    def __init__(self, name, query, variables, prepare=None):
+        self.name = name
+        self.query = query
+        self.variables = variables
+        self.prepare = prepare
+
+
+def build_scenarios(customer_pks, product_pks):
+    counter = iter(range(10**9))
+    since = (timezone.now() - timedelta(days=30)).isoformat()
+
+    def create_order(rng):
+        return {'input': {
+            'customerId': rng.choice(customer_pks),
+            'items': [
+                {'productId': pk, 'quantity': rng.randint(1, 3)}
+                for pk in rng.sample(product_pks, rng.randint(2, 4))
+            ],
+        }}
+
+    def bulk_customers(rng):
+        batch = next(counter)
+        return {'input': [
+            {'name': f'Bulk {batch}-{i}', 'email': f'bulk{batch}-{i}@example.com'} for i in range(100)
+        ]}
+
+    def make_stock_low(rng):
+        Product.objects.filter(pk__in=rng.sample(product_pks, 20)).update(stock=rng.randint(0, 9))
+
+    return [
+        Scenario('all_orders_nested', ALL_ORDERS, lambda rng: {'first': 50}),
+        Scenario('all_customers_filtered', ALL_CUSTOMERS, lambda rng: {
+            'name': rng.choice(LAST_NAMES), 'since': since, 'minOrders': rng.randint(1, 5),
+        }),
+        Scenario('create_order', CREATE_ORDER, create_order),
+        Scenario('bulk_create_customers', BULK_CREATE_CUSTOMERS, bulk_customers),
+        Scenario('update_low_stock', UPDATE_LOW_STOCK, lambda rng: None, prepare=make_stock_low),
+    ]
+
+
+@contextmanager
+def count_sql():
+    counter = SimpleNamespace(count=0)
+
+    def count(execute, sql, params, many, context):
+        counter.count += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        yield counter
+
+
+def execute(scenario, rng):
+    if scenario.prepare:
+        scenario.prepare(rng)
+    variables = scenario.variables(rng)
+    with count_sql() as sql:
+        started = time.perf_counter()
+        result = schema.execute(scenario.query, variable_values=variables, context_value=SimpleNamespace())
+        elapsed = time.perf_counter() - started
+    assert not result.errors, f"{scenario.name}: {result.errors[0]}"
+    return elapsed, sql.count
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def measure(scenario, iterations, rng):
+    for _ in range(min(5, iterations)):
+        execute(scenario, rng)  # warm up caches
+
+    latencies, statements = [], 0
+    for _ in range(iterations):
+        elapsed, sql_count = execute(scenario, rng)
+        latencies.append(elapsed)
+        statements += sql_count
+
+    tracemalloc.start()
+    try:
+        for _ in range(MEMORY_ITERATIONS):
+            execute(scenario, rng)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'ops_per_sec': iterations / sum(latencies),
+        'mean_ms': sum(latencies) / iterations * 1000,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'sql_per_op': statements / iterations,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+def run_benchmark(scale=2000, iterations=200, output=DEFAULT_OUTPUT):
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            started = time.perf_counter()
+            customer_pks, product_pks = seed(scale)
+            print(f"Seeded {scale} customers, {len(product_pks)} products, {scale * 5} orders "
+                  f"in {time.perf_counter() - started:.1f}s; {iterations} iterations per scenario")
+            print(f"{'scenario':<24} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql/op':>7} {'peak KiB':>9}")
+
+            results = {}
+            for scenario in build_scenarios(customer_pks, product_pks):
+                stats = results[scenario.name] = measure(scenario, iterations, rng)
+                print(f"{scenario.name:<24} {stats['ops_per_sec']:>8.1f} {stats['p50_ms']:>8.2f} "
+                      f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['sql_per_op']:>7.1f} "
+                      f"{stats['peak_memory_kb']:>9.0f}")
+        finally:
+            connection.close()
+            teardown_databases(old_config, verbosity=0)
+
+    report = {
+        'meta': {
+            'scale': scale,
+            'iterations': iterations,
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        },
+        'results': results,
+    }
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:4]
+    run_benchmark(*(int(arg) for arg in arguments[:2]), *arguments[2:])
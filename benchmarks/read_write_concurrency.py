@@ -0,0 +1,138 @@
+"""
+Benchmarks GraphQL reader throughput while updateLowStockProducts runs.
+
+Reader threads post a nested query to /graphql in a loop. A writer thread
+repeatedly marks products as low on stock and runs the updateLowStockProducts
+mutation. Each phase runs for a fixed time, first with the readers alone and
+then with the writer alongside, under two connection profiles:
+
+  baseline   rollback journal, no pragmas, reads on the write alias
+  tuned      the settings: WAL and the SQLITE_PRAGMAS, reads on the read alias
+
+The response cache is disabled so every read reaches the database. The data
+lives in a throwaway database file created like the test database and is
+generated by crm/datagen.py.
+
+Usage: python benchmarks/read_write_concurrency.py [readers] [seconds] [customers]
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
+
+import django
+django.setup()
+
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from crm.datagen import generate_data
+from crm.models import Product
+from crm.response_cache import response_cache
+
+READ_QUERY = json.dumps({'query': """
+{
+  allOrders(first: 50) {
+    edges { node { id totalAmount customer { name email } items { quantity product { name } } } }
+  }
+  allCustomers(first: 50, orderBy: "-lifetimeValue") {
+    edges { node { name orderCount lifetimeValue } }
+  }
+}
+"""})
+WRITE_QUERY = json.dumps({'query': 'mutation { updateLowStockProducts { message } }'})
+LOW_STOCK_PRODUCTS = 200
+
+PROFILES = {
+    'baseline': {'SQLITE_PRAGMAS': {'journal_mode': 'DELETE'}, 'CRM_READ_DATABASE': None},
+    'tuned': {},
+}
+
+
+def post(client, body):
+    started = time.perf_counter()
+    response = client.post('/graphql', body, content_type='application/json')
+    elapsed = time.perf_counter() - started
+    ok = response.status_code == 200 and 'errors' not in response.json()
+    return elapsed, ok
+
+
+def reader(stop, results):
+    client = Client()
+    latencies, errors = [], 0
+    while not stop.is_set():
+        elapsed, ok = post(client, READ_QUERY)
+        latencies.append(elapsed)
+        errors += not ok
+    connections.close_all()
+    results.append((latencies, errors))
+
+
+def writer(stop, product_pks, results):
+    client = Client()
+    latencies, errors, offset = [], 0, 0
+    while not stop.is_set():
+        batch = product_pks[offset:offset + LOW_STOCK_PRODUCTS] or product_pks[:LOW_STOCK_PRODUCTS]
+        offset = (offset + LOW_STOCK_PRODUCTS) % len(product_pks)
+        Product.objects.filter(pk__in=batch).update(stock=0)
+        elapsed, ok = post(client, WRITE_QUERY)
+        latencies.append(elapsed)
+        errors += not ok
+    connections.close_all()
+    results.append((latencies, errors))
+
+
+def run_phase(readers, seconds, product_pks, with_writer):
+    stop = threading.Event()
+    read_results, write_results = [], []
+    threads = [threading.Thread(target=reader, args=(stop, read_results)) for _ in range(readers)]
+    if with_writer:
+        threads.append(threading.Thread(target=writer, args=(stop, product_pks, write_results)))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    reads = sorted(latency for latencies, _ in read_results for latency in latencies)
+    writes = [latency for latencies, _ in write_results for latency in latencies]
+    return {
+        'reads_per_sec': len(reads) / seconds,
+        'read_p95_ms': reads[int(len(reads) * 0.95) - 1] * 1000 if reads else 0,
+        'writes_per_sec': len(writes) / seconds,
+        'errors': sum(errors for _, errors in read_results + write_results),
+    }
+
+
+def run_benchmark(readers=8, seconds=10, customers=5000):
+    response_cache.alias = None
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            data = generate_data(customers=customers, products=max(10, customers // 10), orders=customers * 10)
+            product_pks = list(data.products)
+            print(f"{readers} readers, {seconds}s per phase, {customers} customers, {customers * 10} orders")
+            print(f"{'profile':<10} {'writer':<7} {'reads/s':>9} {'read p95 ms':>12} {'writes/s':>9} {'errors':>7}")
+            for profile, overrides in PROFILES.items():
+                with override_settings(**overrides):
+                    connections.close_all()
+                    for with_writer in (False, True):
+                        stats = run_phase(readers, seconds, product_pks, with_writer)
+                        print(f"{profile:<10} {'yes' if with_writer else 'no':<7} {stats['reads_per_sec']:>9.1f} "
+                              f"{stats['read_p95_ms']:>12.1f} {stats['writes_per_sec']:>9.1f} {stats['errors']:>7}")
+                    connections.close_all()
+        finally:
+            connections.close_all()
+            teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == '__main__':
+    run_benchmark(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,255 @@
+# alx-backend-graphql_crm/crm/analytics.py
+"""
+The daily order rollup behind the ``orderStats`` query.
+
+OrderDailyStats holds one row per day with orders: their count, revenue and
+distinct customers. ``order_stats`` sums these rows per day, ISO week or
+month, so a one-year chart reads at most 366 rows whatever the number of
+orders.
+
+Distinct customers do not add up across days, so each row also counts the
+customers whose first order of the week, and of the month, fell on that day;
+the sum of those over a week or month is its distinct customers. A new order
+is its customer's first of the day, week or month exactly when the
+customer's previous order (``last_order_at`` before it) falls in an earlier
+one, so ``record_order_stats`` needs no extra reads.
+
+Deleting customers subtracts all of their orders the same way. Other order
+deletions recompute the months they touch, through the end of the ISO week
+the last of them ends in, with ``rebuild_order_stats``, which also rebuilds
+the whole table for the reconciliation command.
+
+Days are calendar days in TIME_ZONE. Statistics of a single customer are
+aggregated from that customer's orders through the foreign key index.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Sum, Value, When
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Order, OrderDailyStats
+from .response_cache import bump_model_versions
+
+# Days per UPDATE when applying a batch, which keeps the CASE expressions
+# (two parameters per day and field) under SQLite's limit.
+STATS_BATCH_SIZE = 90
+DEFAULT_RANGE_DAYS = 365
+CENTS = Decimal('0.01')
+
+STATS_FIELDS = (
+    ('order_count', IntegerField()),
+    ('revenue', DecimalField(max_digits=16, decimal_places=2)),
+    ('customer_count', IntegerField()),
+    ('week_customer_count', IntegerField()),
+    ('month_customer_count', IntegerField()),
+)
+
+# Bucket start and distinct customer column per grouping.
+PERIODS = {
+    'day': (F('date'), 'customer_count'),
+    'week': (TruncWeek('date'), 'week_customer_count'),
+    'month': (TruncMonth('date'), 'month_customer_count'),
+}
+
+
+def period_start(day, group_by):
+    if group_by == 'week':
+        return day - timedelta(days=day.weekday())
+    if group_by == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _month_end(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _order_rows(orders):
+    return (
+        orders.order_by('customer_id', 'order_date', 'pk')
+        .values_list('customer_id', 'order_date', 'total_amount')
+        .iterator(chunk_size=10_000)
+    )
+
+
+def tally(orders, previous=None):
+    """
+    Daily stats of ``orders``, ``(customer_pk, order_date, total_amount)``
+    sorted by customer and date, as ``{date: [orders, revenue, customers,
+    week customers, month customers]}``. ``previous`` maps customers to the
+    date of their latest order before these.
+    """
+    previous = previous or {}
+    stats = defaultdict(lambda: [0, Decimal('0.00'), 0, 0, 0])
+    customer = last = None
+    for customer_pk, order_date, total_amount in orders:
+        day = timezone.localdate(order_date)
+        if customer_pk != customer:
+            customer = customer_pk
+            last = previous.get(customer_pk)
+            last = timezone.localdate(last) if last else None
+        row = stats[day]
+        row[0] += 1
+        row[1] += total_amount
+        row[2] += last != day
+        row[3] += last is None or last.isocalendar()[:2] != day.isocalendar()[:2]
+        row[4] += last is None or (last.year, last.month) != (day.year, day.month)
+        last = day
+    return stats
+
+
+def _per_day(values, output_field):
+    return Case(
+        *(When(date=day, then=Value(value, output_field=output_field)) for day, value in values.items()),
+        output_field=output_field,
+    )
+
+
+def _apply(stats, sign):
+    """Adds (``sign`` 1) or subtracts (-1) daily stats, with one UPDATE per STATS_BATCH_SIZE days."""
+    days = sorted(stats)
+    for start in range(0, len(days), STATS_BATCH_SIZE):
+        batch = {day: stats[day] for day in days[start:start + STATS_BATCH_SIZE]}
+        updated = OrderDailyStats.objects.filter(date__in=batch).update(**{
+            name: F(name) + _per_day({day: sign * row[index] for day, row in batch.items()}, output_field)
+            for index, (name, output_field) in enumerate(STATS_FIELDS)
+        })
+        if updated < len(batch) and sign > 0:
+            existing = set(OrderDailyStats.objects.filter(date__in=batch).values_list('date', flat=True))
+            OrderDailyStats.objects.bulk_create([
+                OrderDailyStats(date=day, **{name: value for (name, _), value in zip(STATS_FIELDS, row)})
+                for day, row in batch.items()
+                if day not in existing
+            ])
+        elif sign < 0:
+            OrderDailyStats.objects.filter(date__in=batch, order_count=0).delete()
+
+
+def record_order_stats(orders, previous):
+    """
+    Adds newly created ``orders`` to the rollup. ``previous`` maps their
+    customers to ``last_order_at`` before these orders.
+    """
+    rows = sorted((order.customer_id, order.order_date, order.total_amount) for order in orders)
+    _apply(tally(rows, previous), 1)
+
+
+def remove_customer_order_stats(customers):
+    """
+    Subtracts every order of ``customers`` (pks or a pk queryset) from the
+    rollup; call it before the customers and their orders are deleted.
+    """
+    _apply(tally(_order_rows(Order.objects.filter(customer_id__in=customers))), -1)
+
+
+@transaction.atomic
+def rebuild_order_stats(start=None, end=None, dry_run=False):
+    """
+    Recomputes the rollup from the orders, for the whole months from
+    ``start`` to ``end`` or for all time. Returns how many days had drifted;
+    with ``dry_run`` the stored rows are kept.
+
+    The range runs on to the end of the ISO week of its last day: those days
+    of the next month share a week with it, so their week customers change
+    with its orders.
+    """
+    orders, stored = Order.objects.all(), OrderDailyStats.objects.all()
+    if start is not None:
+        start = start.replace(day=1)
+        # The first week of the range may begin in the month before.
+        orders = orders.filter(order_date__gte=_day_start(period_start(start, 'week')))
+        stored = stored.filter(date__gte=start)
+    if end is not None:
+        end = _month_end(end)
+        end += timedelta(days=6 - end.weekday())
+        orders = orders.filter(order_date__lt=_day_start(end + timedelta(days=1)))
+        stored = stored.filter(date__lte=end)
+
+    actual = {
+        day: row for day, row in tally(_order_rows(orders)).items()
+        if start is None or day >= start
+    }
+    current = {
+        row[0]: list(row[1:])
+        for row in stored.values_list('date', *(name for name, _ in STATS_FIELDS))
+    }
+    stale = [day for day in actual.keys() | current.keys() if actual.get(day) != current.get(day)]
+    if stale and not dry_run:
+        stored.delete()
+        OrderDailyStats.objects.bulk_create([
+            OrderDailyStats(date=day, **{name: value for (name, _), value in zip(STATS_FIELDS, row)})
+            for day, row in sorted(actual.items())
+        ], batch_size=500)
+        bump_model_versions(OrderDailyStats)
+    return len(stale)
+
+
+def _customer_order_stats(customer_pk, group_by, start, end):
+    days = (
+        Order.objects
+        .filter(customer_id=customer_pk, order_date__gte=_day_start(start),
+                order_date__lt=_day_start(end + timedelta(days=1)))
+        .annotate(day=TruncDate('order_date'))
+        .values('day')
+        .annotate(orders=Count('pk'), revenue=Sum('total_amount'))
+        .order_by('day')
+    )
+    buckets = {}
+    for row in days:
+        bucket = buckets.setdefault(
+            period_start(row['day'], group_by),
+            OrderDailyStats(order_count=0, revenue=Decimal('0.00'), customer_count=1),
+        )
+        bucket.order_count += row['orders']
+        bucket.revenue += row['revenue']
+    for day, bucket in buckets.items():
+        bucket.date = day
+        bucket.revenue = bucket.revenue.quantize(CENTS)
+    return list(buckets.values())
+
+
+def order_stats(group_by, start=None, end=None, customer_id=None):
+    """
+    OrderDailyStats instances (unsaved), one per ``group_by`` bucket with
+    orders from ``start`` to ``end`` inclusive, dated by the bucket's first
+    day. ``start`` is moved back to the start of its bucket; it defaults to
+    DEFAULT_RANGE_DAYS before ``end``, which defaults to today.
+    """
+    end = end or timezone.localdate()
+    start = period_start(start or end - timedelta(days=DEFAULT_RANGE_DAYS), group_by)
+    if start > end:
+        raise Exception("Validation Error: 'from' must not be after 'to'.")
+
+    if customer_id is not None:
+        try:
+            customer_pk = int(customer_id)
+        except (TypeError, ValueError):
+            raise Exception(f"Validation Error: Invalid customer ID '{customer_id}'.")
+        return _customer_order_stats(customer_pk, group_by, start, end)
+
+    period, customers = PERIODS[group_by]
+    rows = (
+        OrderDailyStats.objects
+        .filter(date__range=(start, end))
+        .annotate(period=period)
+        .values('period')
+        .annotate(orders=Sum('order_count'), total=Sum('revenue'), customers=Sum(customers))
+        .order_by('period')
+    )
+    return [
+        OrderDailyStats(
+            date=row['period'],
+            order_count=row['orders'],
+            revenue=row['total'].quantize(CENTS),
+            customer_count=row['customers'],
+        )
+        for row in rows
+    ]
@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def install_search_indexes_after_migrate(sender, using, **kwargs):
+    from .search import install_search_indexes
+    install_search_indexes(connections[using])
 
 
 class CrmConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'crm'
+
+    def ready(self):
+        from .db import apply_sqlite_pragmas
+        from .response_cache import check_version_store
+        from .tracing import install_sql_tracing
+
+        post_migrate.connect(install_search_indexes_after_migrate, sender=self)
+        connection_created.connect(apply_sqlite_pragmas)
+        connection_created.connect(install_sql_tracing)
+        checks.register(check_version_store)
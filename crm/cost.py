@@ -0,0 +1,151 @@
+# alx-backend-graphql_crm/crm/cost.py
+"""
+Static cost analysis of GraphQL operations, run before any resolver.
+
+The cost of an operation estimates the rows it can touch. A connection field
+costs its page size (``first``/``last``, else the relay max limit) and
+multiplies the cost of everything selected under its nodes. Plain lists use
+the same default size. Object fields cost one row plus their selection, and
+scalars are free. So ``allCustomers { orders { products { name } } }`` with
+default pages costs 100 * (1 + 100 * (1 + 100)), and a client cannot hide a
+fan-out behind nesting.
+"""
+from django.conf import settings
+from graphene_django.settings import graphene_settings
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    get_named_type,
+    get_nullable_type,
+    is_list_type,
+)
+from graphql.execution.collect_fields import should_include_node
+from graphql.execution.values import get_argument_values, get_variable_values
+from graphql.utilities import type_from_ast
+
+DEFAULT_QUERY_COST_LIMIT = 20000
+PAGE_ARGUMENTS = ('first', 'last')
+
+
+class QueryCost:
+    """Estimated cost and nesting depth of one operation."""
+
+    def __init__(self, schema, document, operation_name=None, variables=None):
+        self.schema = schema
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        self.operation = self._get_operation(document, operation_name)
+        self.variables = self._coerce_variables(variables or {})
+        self.default_page_size = graphene_settings.RELAY_CONNECTION_MAX_LIMIT or 100
+        self.depth = 0
+        root_type = schema.get_root_type(self.operation.operation) if self.operation else None
+        self.cost = (
+            self._selection_cost(root_type, self.operation.selection_set, 1)
+            if root_type else 0
+        )
+
+    @staticmethod
+    def _get_operation(document, operation_name):
+        operations = [
+            definition for definition in document.definitions
+            if isinstance(definition, OperationDefinitionNode)
+        ]
+        for operation in operations:
+            if operation_name is None or (operation.name and operation.name.value == operation_name):
+                return operation
+        return None
+
+    def _coerce_variables(self, raw_variables):
+        coerced = get_variable_values(
+            self.schema, self.operation.variable_definitions if self.operation else [], raw_variables
+        )
+        # Invalid variables are reported by execution; cost them as absent.
+        return coerced if isinstance(coerced, dict) else {}
+
+    def _fields(self, parent_type, selection_set):
+        """Yields ``(parent_type, field_node)`` pairs, expanding fragments."""
+        for selection in selection_set.selections:
+            if not should_include_node(self.variables, selection):
+                continue
+            if isinstance(selection, FieldNode):
+                yield parent_type, selection
+            elif isinstance(selection, (InlineFragmentNode, FragmentSpreadNode)):
+                fragment = (
+                    selection if isinstance(selection, InlineFragmentNode)
+                    else self.fragments.get(selection.name.value)
+                )
+                if fragment is None:
+                    continue
+                fragment_type = (
+                    type_from_ast(self.schema, fragment.type_condition)
+                    if fragment.type_condition else parent_type
+                )
+                yield from self._fields(fragment_type, fragment.selection_set)
+
+    def _selection_cost(self, parent_type, selection_set, depth):
+        self.depth = max(self.depth, depth)
+        cost = 0
+        for field_type, field_node in self._fields(parent_type, selection_set):
+            fields = getattr(field_type, 'fields', {})
+            field_def = fields.get(field_node.name.value)
+            if field_def is None or field_node.selection_set is None:
+                continue
+            cost += self._field_cost(field_def, field_node, depth)
+        return cost
+
+    def _field_cost(self, field_def, field_node, depth):
+        named_type = get_named_type(field_def.type)
+        if 'edges' in getattr(named_type, 'fields', {}):
+            arguments = get_argument_values(field_def, field_node, self.variables)
+            page_size = next(
+                (arguments[name] for name in PAGE_ARGUMENTS if arguments.get(name) is not None),
+                self.default_page_size,
+            )
+            node_cost = self._connection_node_cost(named_type, field_node.selection_set, depth + 1)
+            return page_size * (1 + node_cost)
+
+        nested = self._selection_cost(named_type, field_node.selection_set, depth + 1)
+        if is_list_type(get_nullable_type(field_def.type)):
+            return self.default_page_size * (1 + nested)
+        return 1 + nested
+
+    def _connection_node_cost(self, connection_type, selection_set, depth):
+        """Cost per node of a connection, found under ``edges { node { ... } }``."""
+        cost = 0
+        for _, edges_node in self._fields(connection_type, selection_set):
+            if edges_node.name.value != 'edges' or edges_node.selection_set is None:
+                continue
+            edge_type = get_named_type(connection_type.fields['edges'].type)
+            for _, node_field in self._fields(edge_type, edges_node.selection_set):
+                if node_field.name.value == 'node' and node_field.selection_set is not None:
+                    node_type = get_named_type(edge_type.fields['node'].type)
+                    cost += self._selection_cost(node_type, node_field.selection_set, depth)
+        return cost
+
+
+def query_cost_limit():
+    return getattr(settings, 'GRAPHQL_QUERY_COST_LIMIT', DEFAULT_QUERY_COST_LIMIT)
+
+
+def check_query_cost(schema, document, operation_name=None, variables=None):
+    """
+    Returns the ``cost`` response extension of the operation. Raises a
+    GraphQLError carrying that extension when the cost exceeds the
+    GRAPHQL_QUERY_COST_LIMIT setting.
+    """
+    cost = QueryCost(schema, document, operation_name, variables)
+    limit = query_cost_limit()
+    extension = {'estimated': cost.cost, 'depth': cost.depth, 'limit': limit}
+    if limit is not None and cost.cost > limit:
+        raise GraphQLError(
+            f"Query cost {cost.cost} exceeds the maximum allowed cost of {limit}.",
+            extensions={'code': 'QUERY_TOO_COSTLY', 'cost': extension},
+        )
+    return extension
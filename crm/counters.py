@@ -0,0 +1,244 @@
+# alx-backend-graphql_crm/crm/counters.py
+"""
+Maintenance of the ReportCounters row behind the CRM report, and of the order
+activity columns of each customer (last_order_at, order_count, lifetime_value).
+
+Every path that creates or deletes customers or orders applies its deltas
+here, inside its own transaction, so the totals commit or roll back together
+with the rows they count. Deletions also update the daily order statistics
+(see crm/analytics.py). ``rebuild_counters`` and ``rebuild_order_activity``
+recompute them from scratch for the reconciliation command.
+
+Customers and orders must be deleted with ``delete_customers``,
+``delete_orders`` or ``purge_customers``. Nothing counts the rows gone through
+a plain ``QuerySet.delete()`` or ``Model.delete()``, or raw SQL, so
+``reconcile_crm_counters`` must be run after such a delete. (The admin
+registers no CRM models; a ModelAdmin for them would have to route its
+``delete_model`` and ``delete_queryset`` through these functions.)
+
+The counters are a single row that every counted write updates, so those
+writes queue on its row lock from their update to their commit (SQLite
+queues every writer on the database lock anyway).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    DateTimeField,
+    DecimalField,
+    F,
+    IntegerField,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, Round
+from django.utils import timezone
+
+from .analytics import rebuild_order_stats, remove_customer_order_stats
+from .models import Customer, Order, OrderDailyStats, OrderItem, ReportCounters
+from .response_cache import bump_model_versions
+
+COUNTERS_PK = 1
+
+# Customers per UPDATE when recording a batch of orders, which keeps the
+# CASE expressions (three parameters per customer) under SQLite's limit.
+ACTIVITY_BATCH_SIZE = 250
+
+
+def get_counters():
+    return ReportCounters.objects.get_or_create(pk=COUNTERS_PK)[0]
+
+
+def adjust_counters(customers=0, orders=0, revenue=Decimal('0.00')):
+    """Applies deltas to the report counters with a single UPDATE."""
+    if not (customers or orders or revenue):
+        return
+    deltas = {
+        'customer_count': F('customer_count') + customers,
+        'order_count': F('order_count') + orders,
+        'total_revenue': F('total_revenue') + revenue,
+        'updated_at': timezone.now(),
+    }
+    if not ReportCounters.objects.filter(pk=COUNTERS_PK).update(**deltas):
+        get_counters()
+        ReportCounters.objects.filter(pk=COUNTERS_PK).update(**deltas)
+
+
+def compute_totals():
+    """The totals as a full scan of the tables would report them."""
+    revenue = Order.objects.aggregate(Sum('total_amount'))['total_amount__sum']
+    return {
+        'customer_count': Customer.objects.count(),
+        'order_count': Order.objects.count(),
+        'total_revenue': revenue or Decimal('0.00'),
+    }
+
+
+@transaction.atomic
+def rebuild_counters(dry_run=False):
+    """
+    Recomputes the counters from the tables. Returns the drift per counter
+    (stored minus actual); with ``dry_run`` the stored values are kept.
+    """
+    counters = get_counters()
+    actual = compute_totals()
+    drift = {
+        name: getattr(counters, name) - value
+        for name, value in actual.items()
+        if getattr(counters, name) != value
+    }
+    if drift and not dry_run:
+        ReportCounters.objects.filter(pk=COUNTERS_PK).update(updated_at=timezone.now(), **actual)
+    return drift
+
+
+def _per_customer(values, output_field):
+    return Case(
+        *(When(pk=pk, then=Value(value, output_field=output_field)) for pk, value in values.items()),
+        output_field=output_field,
+    )
+
+
+def record_order_activity(orders):
+    """
+    Adds newly created ``orders`` to the activity columns of their customers,
+    with one UPDATE per ACTIVITY_BATCH_SIZE customers.
+    """
+    activity = {}
+    for order in orders:
+        count, value, latest = activity.get(order.customer_id, (0, Decimal('0.00'), order.order_date))
+        activity[order.customer_id] = (
+            count + 1, value + order.total_amount, max(latest, order.order_date)
+        )
+
+    pks = sorted(activity)
+    for start in range(0, len(pks), ACTIVITY_BATCH_SIZE):
+        batch = {pk: activity[pk] for pk in pks[start:start + ACTIVITY_BATCH_SIZE]}
+        latest = _per_customer({pk: row[2] for pk, row in batch.items()}, DateTimeField())
+        Customer.objects.filter(pk__in=batch).update(
+            order_count=F('order_count') + _per_customer(
+                {pk: row[0] for pk, row in batch.items()}, IntegerField()
+            ),
+            lifetime_value=F('lifetime_value') + _per_customer(
+                {pk: row[1] for pk, row in batch.items()}, DecimalField(max_digits=12, decimal_places=2)
+            ),
+            last_order_at=Greatest(Coalesce('last_order_at', latest), latest),
+        )
+
+
+def _order_activity():
+    """The activity columns as computed from the orders of the outer customer."""
+    orders = Order.objects.filter(customer=OuterRef('pk')).order_by().values('customer')
+    return {
+        'last_order_at': Subquery(orders.annotate(latest=Max('order_date')).values('latest')),
+        'order_count': Coalesce(Subquery(orders.annotate(count=Count('pk')).values('count')), 0),
+        # Rounded to cents: SQLite sums decimals as floats (89.96 becomes
+        # 89.96000000000001), which would never compare equal to the stored value.
+        'lifetime_value': Coalesce(
+            Round(Subquery(orders.annotate(value=Sum('total_amount')).values('value')), 2), Decimal('0.00')
+        ),
+    }
+
+
+def refresh_order_activity(customers):
+    """Recomputes the activity columns of ``customers`` from their orders."""
+    return customers.update(**_order_activity())
+
+
+@transaction.atomic
+def rebuild_order_activity(dry_run=False):
+    """
+    Recomputes the activity columns of the customers whose stored values do
+    not match their orders. Returns how many customers had drifted; with
+    ``dry_run`` the stored values are kept.
+    """
+    activity = _order_activity()
+    stale = Customer.objects.annotate(
+        actual_last_order_at=activity['last_order_at'],
+        actual_order_count=activity['order_count'],
+        actual_lifetime_value=activity['lifetime_value'],
+    ).exclude(
+        Q(order_count=F('actual_order_count'))
+        & Q(lifetime_value=F('actual_lifetime_value'))
+        & (
+            Q(last_order_at=F('actual_last_order_at'))
+            | Q(last_order_at__isnull=True, actual_last_order_at__isnull=True)
+        )
+    )
+    stale_pks = list(stale.values_list('pk', flat=True))
+    if stale_pks and not dry_run:
+        refresh_order_activity(Customer.objects.filter(pk__in=stale_pks))
+        bump_model_versions(Customer)
+    return len(stale_pks)
+
+
+@transaction.atomic
+def delete_orders(queryset):
+    """
+    Deletes ``queryset`` of orders, takes them off the counters and
+    recomputes the activity of their customers and the daily order
+    statistics of the months they were placed in.
+    """
+    totals = queryset.aggregate(
+        count=Count('pk'), revenue=Sum('total_amount'), first=Min('order_date'), last=Max('order_date'),
+    )
+    customer_pks = list(queryset.order_by().values_list('customer_id', flat=True).distinct())
+    queryset.delete()
+    adjust_counters(orders=-totals['count'], revenue=-(totals['revenue'] or Decimal('0.00')))
+    refresh_order_activity(Customer.objects.filter(pk__in=customer_pks))
+    if totals['count']:
+        rebuild_order_stats(timezone.localdate(totals['first']), timezone.localdate(totals['last']))
+    bump_model_versions(Customer, Order, OrderDailyStats)
+    return totals['count']
+
+
+@transaction.atomic
+def delete_customers(queryset):
+    """Deletes ``queryset`` of customers, with their cascaded orders, and updates the counters."""
+    customer_ids = queryset.values('pk')
+    orders = Order.objects.filter(customer_id__in=customer_ids)
+    totals = orders.aggregate(count=Count('pk'), revenue=Sum('total_amount'))
+    remove_customer_order_stats(customer_ids)
+    _, deleted = Customer.objects.filter(pk__in=customer_ids).delete()
+    customers = deleted.get(Customer._meta.label, 0)
+    adjust_counters(
+        customers=-customers,
+        orders=-totals['count'],
+        revenue=-(totals['revenue'] or Decimal('0.00')),
+    )
+    bump_model_versions(Customer, Order, OrderDailyStats)
+    return customers
+
+
+@transaction.atomic
+def purge_customers(queryset):
+    """
+    Deletes a bounded ``queryset`` of customers with their orders using one
+    bulk DELETE per table (order items, orders, customers) instead of the
+    cascade collector, which loads every row it deletes. Updates the counters
+    like ``delete_customers``. Returns the customers and orders deleted.
+    """
+    customer_pks = list(queryset.values_list('pk', flat=True))
+    if not customer_pks:
+        return 0, 0
+    orders = Order.objects.filter(customer_id__in=customer_pks)
+    totals = orders.aggregate(count=Count('pk'), revenue=Sum('total_amount'))
+    remove_customer_order_stats(customer_pks)
+    OrderItem.objects.filter(order_id__in=orders.values('pk'))._raw_delete(OrderItem.objects.db)
+    orders._raw_delete(orders.db)
+    customers = Customer.objects.filter(pk__in=customer_pks)._raw_delete(Customer.objects.db)
+    adjust_counters(
+        customers=-customers,
+        orders=-totals['count'],
+        revenue=-(totals['revenue'] or Decimal('0.00')),
+    )
+    bump_model_versions(Customer, Order, OrderItem, OrderDailyStats)
+    return customers, totals['count']
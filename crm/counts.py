@@ -0,0 +1,138 @@
+# alx-backend-graphql_crm/crm/counts.py
+"""
+Row counts behind the ``totalCount`` of connections.
+
+A count is cached in the response cache's store, keyed by the count query's
+SQL and parameters (so filter arguments that select the same rows, in any
+order, share an entry) and by the versions of the models the query reads;
+writes bump those versions and the next count is recomputed.
+
+The unfiltered count of a customer or order table is read from the report
+counters. Any other count is exact while the table it scans holds at most
+GRAPHQL_EXACT_COUNT_LIMIT rows. Past that it is estimated: the filter is
+counted within ESTIMATE_WINDOWS primary key ranges spread over the table,
+together covering about that many rows, and the matching fraction is scaled
+up to the table. Estimates are flagged so clients can show "about N".
+"""
+import asyncio
+import hashlib
+import json
+from collections import namedtuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Max, Min, QuerySet
+
+from .counters import get_counters
+from .models import Customer, Order
+from .response_cache import response_cache
+from .threadpool import run_blocking
+
+DEFAULT_EXACT_COUNT_LIMIT = 100_000
+ESTIMATE_WINDOWS = 4
+COUNT_KEY_PREFIX = 'crm:graphql:count:'
+
+Count = namedtuple('Count', ('value', 'is_estimate'))
+
+
+def exact_count_limit():
+    return getattr(settings, 'GRAPHQL_EXACT_COUNT_LIMIT', DEFAULT_EXACT_COUNT_LIMIT)
+
+
+def _query_models(queryset):
+    tables = {join.table_name for join in queryset.query.alias_map.values()}
+    tables.add(queryset.model._meta.db_table)
+    return [model for model in apps.get_models() if model._meta.db_table in tables]
+
+
+def _table_rows(model):
+    if model in (Customer, Order):
+        counters = get_counters()
+        return counters.customer_count if model is Customer else counters.order_count
+    return model._default_manager.count()
+
+
+def _is_unfiltered(queryset):
+    return not queryset.query.where and not queryset.query.distinct
+
+
+def estimate_count(queryset, table_rows, limit):
+    """Scales the count of ``queryset`` in a few primary key windows up to ``table_rows``."""
+    model = queryset.model
+    bounds = model._default_manager.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return 0
+    span = bounds['high'] - bounds['low'] + 1
+    # Window width in key units, so the windows hold about ``limit`` rows together.
+    width = max(1, span * limit // (table_rows * ESTIMATE_WINDOWS))
+    matched = scanned = 0
+    for index in range(ESTIMATE_WINDOWS):
+        start = bounds['low'] + (span - width) * index // max(1, ESTIMATE_WINDOWS - 1)
+        window = (start, start + width - 1)
+        matched += queryset.filter(pk__range=window).count()
+        scanned += model._default_manager.filter(pk__range=window).count()
+    return round(matched * table_rows / scanned) if scanned else 0
+
+
+def compute_count(queryset):
+    model = queryset.model
+    if _is_unfiltered(queryset) and model in (Customer, Order):
+        return Count(_table_rows(model), False)
+    limit = exact_count_limit()
+    table_rows = _table_rows(model)
+    if limit is None or table_rows <= limit:
+        return Count(queryset.count(), False)
+    return Count(estimate_count(queryset, table_rows, limit), True)
+
+
+def count_key(queryset, versions):
+    # Only the filters matter, not the columns the page selects.
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    payload = json.dumps([sql, [str(param) for param in params], sorted(versions.items())])
+    return COUNT_KEY_PREFIX + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def count_rows(queryset):
+    """The Count of ``queryset``, from the cache when its models are unchanged."""
+    if not response_cache.enabled:
+        return compute_count(queryset)
+    key = count_key(queryset, response_cache.versions(_query_models(queryset)))
+    cached = response_cache.cache.get(key)
+    if cached is not None:
+        return Count(*cached)
+    count = compute_count(queryset)
+    response_cache.store(key, tuple(count))
+    return count
+
+
+def connection_count(connection):
+    """The Count of a resolved connection, computed once per connection."""
+    count = getattr(connection, '_crm_count', None)
+    if count is None:
+        iterable = getattr(connection, 'iterable', None)
+        if isinstance(iterable, QuerySet):
+            count = count_rows(iterable)
+        else:
+            count = Count(len(iterable or connection.edges), False)
+        connection._crm_count = count
+    return count
+
+
+def resolve_count(connection, attribute):
+    """
+    Resolves ``attribute`` of the connection's Count. On the event loop of the
+    async view the count runs in the ORM thread pool, once per connection.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return getattr(connection_count(connection), attribute)
+
+    task = getattr(connection, '_crm_count_task', None)
+    if task is None:
+        task = connection._crm_count_task = asyncio.ensure_future(run_blocking(connection_count, connection))
+
+    async def resolve():
+        return getattr(await task, attribute)
+
+    return resolve()
@@ -1,20 +1,22 @@
+import io
 import sys
 from datetime import datetime
+from django.conf import settings
+from django.core.management import call_command
 from django.utils import timezone
-from gql import Client, gql
-from gql.transport.requests import RequestsHTTPTransport
 
 # Optional GraphQL check dependencies
 try:
-    from gql import Client, gql
-    from gql.transport.requests import RequestsHTTPTransport
+    from gql import gql
+    from crm.graphql_client import graphql_client
 except ImportError:
     pass 
 
 def log_crm_heartbeat():
     """
     Logs a heartbeat message to a file every 5 minutes.
-    Optionally queries the GraphQL 'hello' field to check server health.
+    Optionally queries the GraphQL 'hello' field to check server health,
+    in-process by default or over HTTP when CRM_HEARTBEAT_TRANSPORT is 'http'.
     """
     now = timezone.localtime(timezone.now())
     timestamp = now.strftime("%d/%m/%Y-%H:%M:%S")
@@ -24,12 +26,7 @@ def log_crm_heartbeat():
     try:
         HELLO_QUERY = gql("{ hello }")
 
-        transport = RequestsHTTPTransport(
-            url="http://localhost:8000/graphql",
-            verify=True,
-            timeout=5,
-        )
-        client = Client(transport=transport, fetch_schema_from_transport=False)
+        client = graphql_client(getattr(settings, 'CRM_HEARTBEAT_TRANSPORT', None))
         result = client.execute(HELLO_QUERY)
         
         if result.get('hello') == "Hello, GraphQL!":
@@ -77,19 +74,10 @@ def update_low_stock():
     log_path = "/tmp/low_stock_updates_log.txt"
 
     try:
-        # 2. Setup the GraphQL client transport
-        transport = RequestsHTTPTransport(
-            url="http://localhost:8000/graphql",
-            verify=True,
-            retries=3,
-            timeout=10,
-        )
-
-        # 3. Execute the mutation
-        client = Client(transport=transport, fetch_schema_from_transport=False)
-        result = client.execute(MUTATION)
+        # 2. Execute the mutation (in-process unless CRM_GRAPHQL_TRANSPORT is 'http')
+        result = graphql_client().execute(MUTATION)
         
-        # 4. Extract and log results
+        # 3. Extract and log results
         data = result.get('updateLowStockProducts', {})
         message = data.get('message', 'Mutation failed or returned no message.')
         updated_products = data.get('updatedProducts', [])
@@ -115,6 +103,20 @@ def update_low_stock():
         sys.exit(1)
 
 
+def clean_inactive_customers():
+    """
+    Deletes customers without an order in the last year, as
+    cron_jobs/clean_inactive_customers.sh does, and logs the summary line to
+    /tmp/customer_cleanup_log.txt with a timestamp.
+    """
+    output = io.StringIO()
+    call_command('clean_inactive_customers', days=365, stdout=output)
+    lines = output.getvalue().strip().splitlines()
+    timestamp = timezone.localtime(timezone.now()).isoformat(timespec='seconds')
+    with open("/tmp/customer_cleanup_log.txt", "a") as f:
+        f.write(f"[{timestamp}] {lines[-1] if lines else ''}\n")
+
+
 if __name__ == '__main__':
     log_crm_heartbeat()
     update_low_stock()
\ No newline at end of file
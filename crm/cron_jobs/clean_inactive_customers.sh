@@ -6,45 +6,14 @@ PROJECT_ROOT=$(dirname "$(dirname "$(dirname "$(readlink -f "$0")")")")
 # Change to the project root directory so manage.py can find the settings and apps
 cd "$PROJECT_ROOT" || { echo "Failed to change directory to $PROJECT_ROOT" >&2; exit 1; }
 
-# The Python code to be executed via manage.py shell
-PYTHON_CODE='
-from django.db.models import Q, Max
-from django.utils import timezone
-from datetime import timedelta
-from crm.models import Customer
-import sys
-
-try:
-    # 1. Define the cutoff date (1 year ago)
-    one_year_ago = timezone.now() - timedelta(days=365)
-
-    # 2. Find customers to delete:
-    #    - Annotate each customer with their latest order date.
-    #    - Filter for customers where the latest order date is:
-    #      a) Older than one year ago (latest_order_date < one_year_ago)
-    #      b) Non-existent (latest_order_date is null, i.e., no orders at all)
-    customers_to_delete = Customer.objects.annotate(
-        latest_order_date=Max("orders__order_date")
-    ).filter(
-        Q(latest_order_date__lt=one_year_ago) | Q(latest_order_date__isnull=True)
-    )
-
-    # 3. Execute deletion and get the count
-    deleted_count, _ = customers_to_delete.delete()
-
-    # 4. Log the result to /tmp/customer_cleanup_log.txt with a timestamp
-    timestamp = timezone.now().isoformat()
-    log_entry = f"[{timestamp}] Deleted {deleted_count} inactive customers."
-
-    with open("/tmp/customer_cleanup_log.txt", "a") as f:
-        f.write(log_entry + "\n")
-    
-except Exception as e:
+# Delete customers without an order in the last year. The command deletes in
+# short chunked transactions and resumes an interrupted run from its checkpoint.
+# Note: Ensure python3 is the correct interpreter for your environment
+if ! OUTPUT=$(/usr/bin/env python3 manage.py clean_inactive_customers --days 365 2>&1); then
     # Log the error to stderr, which cron job runner will capture
-    print(f"ERROR: Customer cleanup failed: {e}", file=sys.stderr)
-    sys.exit(1)
-'
+    echo "ERROR: Customer cleanup failed: $OUTPUT" >&2
+    exit 1
+fi
 
-# Execute the Python code using manage.py shell
-# Note: Ensure python3 is the correct interpreter for your environment
-/usr/bin/env python3 manage.py shell --command "$PYTHON_CODE"
\ No newline at end of file
+# Log the summary line to /tmp/customer_cleanup_log.txt with a timestamp
+echo "[$(date -Iseconds)] $(echo "$OUTPUT" | tail -n 1)" >> /tmp/customer_cleanup_log.txt
@@ -1,6 +1,7 @@
+import json
 import os
 import sys
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(PROJECT_ROOT)
@@ -10,75 +11,138 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
 
 try:
     from django.utils import timezone
-    from gql import Client, gql
-    from gql.transport.requests import RequestsHTTPTransport
+    from gql import GraphQLRequest, gql
+    from crm.graphql_client import graphql_client
 except ImportError:
     print("ERROR: Required libraries 'gql' are not installed. Please run 'pip install gql'")
     sys.exit(1)
 
 
-def send_order_reminders():
+LOG_PATH = "/tmp/order_reminders_log.txt"
+CHECKPOINT_PATH = "/tmp/order_reminders_checkpoint.json"
+PAGE_SIZE = 100
+WINDOW_DAYS = 7
+
+QUERY = gql(
+    """
+    query RecentOrders($startDate: DateTime, $first: Int, $after: String) {
+      allOrders(orderDateGte: $startDate, keyset: true, first: $first, after: $after) {
+        pageInfo {
+          hasNextPage
+          endCursor
+        }
+        edges {
+          node {
+            id
+            orderDate
+            customer {
+              email
+            }
+          }
+        }
+      }
+    }
+    """
+)
+
+
+def window_start():
+    """Start of the run's window: local midnight WINDOW_DAYS days before today."""
+    today = timezone.localtime(timezone.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (today - timedelta(days=WINDOW_DAYS)).isoformat()
+
+
+def load_checkpoint(start_date):
     """
-    Queries the GraphQL endpoint for recent orders and logs them as reminders.
+    Returns the cursor of an unfinished run over the window starting at
+    ``start_date``, or None. A checkpoint left by a run on an earlier day
+    belongs to another window and is discarded.
     """
     try:
-        one_week_ago = timezone.now() - timedelta(days=7)
-        start_date = one_week_ago.isoformat() 
-
-        QUERY = gql(
-            """
-            query RecentOrders($startDate: DateTime) {
-              allOrders(orderDateGte: $startDate) {
-                edges {
-                  node {
-                    id
-                    orderDate
-                    customer {
-                      email
-                    }
-                  }
-                }
-              }
-            }
-            """
-        )
+        with open(CHECKPOINT_PATH) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(checkpoint, dict) or checkpoint.get("start_date") != start_date:
+        clear_checkpoint()
+        return None
+    return checkpoint.get("cursor")
 
-        transport = RequestsHTTPTransport(
-            url="http://localhost:8000/graphql",
-            verify=True,
-            retries=3,
-        )
 
-        client = Client(transport=transport, fetch_schema_from_transport=True)
+def save_checkpoint(start_date, cursor):
+    # Written to a temporary file and renamed so a crash never leaves a torn checkpoint.
+    tmp_path = CHECKPOINT_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"start_date": start_date, "cursor": cursor}, f)
+    os.replace(tmp_path, CHECKPOINT_PATH)
 
-        result = client.execute(
-            QUERY, 
-            variable_values={"startDate": start_date}
-        )
-        
-        log_entries = []
-        
-        orders = result.get('allOrders', {}).get('edges', [])
-        
-        for edge in orders:
-            order = edge.get('node', {})
-            order_id = order.get('id')
-            customer_email = order.get('customer', {}).get('email', 'N/A')
-            
-            timestamp = timezone.now().isoformat()
-            log_entry = f"[{timestamp}] REMINDER: Order ID {order_id} (Customer: {customer_email})"
-            log_entries.append(log_entry)
-
-        log_path = "/tmp/order_reminders_log.txt"
-        with open(log_path, "a") as f:
-            for entry in log_entries:
-                f.write(entry + "\n")
-        
-        print("Order reminders processed!")
+
+def clear_checkpoint():
+    try:
+        os.remove(CHECKPOINT_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def iter_order_pages(client, start_date, after=None):
+    """Walks the allOrders connection one keyset page at a time."""
+    while True:
+        result = client.execute(GraphQLRequest(
+            QUERY,
+            variable_values={"startDate": start_date, "first": PAGE_SIZE, "after": after},
+        ))
+        connection = result.get('allOrders') or {}
+        page_info = connection.get('pageInfo') or {}
+        yield connection.get('edges', []), page_info.get('endCursor')
+
+        if not page_info.get('hasNextPage'):
+            return
+        after = page_info.get('endCursor')
+
+
+def iter_reminders(edges):
+    for edge in edges:
+        order = edge.get('node', {})
+        order_id = order.get('id')
+        customer_email = (order.get('customer') or {}).get('email', 'N/A')
+
+        timestamp = timezone.now().isoformat()
+        yield f"[{timestamp}] REMINDER: Order ID {order_id} (Customer: {customer_email})"
+
+
+def send_order_reminders():
+    """
+    Streams recent orders page by page and logs them as reminders.
+
+    Each page is written and then checkpointed by its end cursor, so a run
+    that crashed resumes after the last completed page when it is restarted
+    the same day, instead of starting over. Runs in-process unless
+    CRM_GRAPHQL_TRANSPORT is 'http'.
+    """
+    try:
+        start_date = window_start()
+        after = load_checkpoint(start_date)
+
+        processed = 0
+        with open(LOG_PATH, "a") as f:
+            for edges, end_cursor in iter_order_pages(graphql_client(), start_date, after):
+                for entry in iter_reminders(edges):
+                    f.write(entry + "\n")
+                    processed += 1
+                f.flush()
+                if end_cursor:
+                    save_checkpoint(start_date, end_cursor)
+
+        clear_checkpoint()
+        print(f"Order reminders processed! ({processed} orders)")
         
     except Exception as e:
         print(f"ERROR: Order reminders script failed: {e}", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == '__main__':
-    send_order_reminders()
\ No newline at end of file
+    # Only when run as a script: the scheduler imports this module into a
+    # process where Django is already set up.
+    import django
+    django.setup()
+    send_order_reminders()
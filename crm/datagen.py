@@ -0,0 +1,219 @@
+# alx-backend-graphql_crm/crm/datagen.py
+"""
+Deterministic generator of production-sized CRM data.
+
+The same counts and seed always give the same rows. Rows are generated in
+chunks and written with one ``executemany`` INSERT per chunk and table, each
+chunk in its own short transaction, so memory stays bounded by the chunk size
+and the number of customers and products, whatever the number of orders.
+
+The distributions aim at realistic query plans rather than realistic people:
+
+* Product popularity is Zipfian, so a few products appear in most orders.
+* Customer activity is Zipfian too (with a flatter exponent), so most
+  customers have a handful of orders and a few order far more often.
+* Sign-ups and orders grow over the period: a customer signs up at some point
+  over the last ``years``, and orders at dates skewed toward the present.
+* Orders have one to five line items, mostly one or two, of one to three units.
+
+After the orders, the customers' order activity, the report counters and the
+daily order statistics are recomputed with one pass each.
+"""
+import math
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .analytics import rebuild_order_stats
+from .counters import rebuild_counters, refresh_order_activity
+from .models import Customer, Order, OrderDailyStats, OrderItem, Product
+from .response_cache import bump_model_versions
+
+DEFAULT_CHUNK_SIZE = 10_000
+PRODUCT_POPULARITY_EXPONENT = 1.1
+CUSTOMER_ACTIVITY_EXPONENT = 0.5
+ITEMS_PER_ORDER_WEIGHTS = [40, 30, 15, 10, 5]
+QUANTITY_WEIGHTS = [70, 20, 10]
+
+FIRST_NAMES = [
+    'Alice', 'Bob', 'Carol', 'Dmitri', 'Esther', 'Farouk', 'Grace', 'Hiro', 'Ines', 'Jamal',
+    'Kofi', 'Lena', 'Mateo', 'Nadia', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sven', 'Tomoko',
+]
+LAST_NAMES = [
+    'Johnson', 'Smith', 'King', 'Okafor', 'Nakamura', 'Garcia', 'Novak', 'Haddad', 'Moreau', 'Lee',
+    'Mensah', 'Ivanova', 'Silva', 'Kowalski', 'Brown', 'Nguyen', 'Rossi', 'Cohen', 'Patel', 'Berg',
+]
+EMAIL_DOMAINS = ['example.com', 'example.org', 'example.net']
+PRODUCT_ADJECTIVES = ['Compact', 'Deluxe', 'Ergonomic', 'Portable', 'Smart', 'Wireless', 'Rugged', 'Classic']
+PRODUCT_NOUNS = ['Laptop', 'Keyboard', 'Mouse', 'Monitor', 'Headset', 'Webcam', 'Speaker', 'Charger', 'Dock']
+
+
+@dataclass
+class GeneratedData:
+    """The primary key ranges (inclusive) of the generated rows."""
+    customers: range
+    products: range
+    orders: range
+    order_items: int
+
+
+def zipf_cum_weights(count, exponent):
+    """Cumulative weights giving rank ``r`` a probability proportional to ``1 / r ** exponent``."""
+    total, cum_weights = 0.0, []
+    for rank in range(1, count + 1):
+        total += 1 / rank ** exponent
+        cum_weights.append(total)
+    return cum_weights
+
+
+def _next_pk(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return (last or 0) + 1
+
+
+def _insert(cursor, model, field_names, rows):
+    fields = [model._meta.get_field(name) for name in field_names]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    cursor.executemany(
+        f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})",
+        rows,
+    )
+
+
+def _chunks(count, chunk_size):
+    for start in range(0, count, chunk_size):
+        yield start, min(chunk_size, count - start)
+
+
+def _growth_offset(rng, span_seconds):
+    """Seconds into a period, with the density growing linearly toward its end."""
+    return span_seconds * math.sqrt(rng.random())
+
+
+def _price_cents(rng):
+    # Log-normal around 30.00, between 1.00 and 5000.00.
+    return max(100, min(500_000, int(math.exp(rng.gauss(8.0, 1.0)))))
+
+
+def _cents(value):
+    return f'{value // 100}.{value % 100:02d}'
+
+
+def clear_data():
+    """Deletes every customer, product, order and order item with bulk DELETEs."""
+    with transaction.atomic():
+        for model in (OrderItem, Order, Customer, Product, OrderDailyStats):
+            model.objects.all()._raw_delete(connection.alias)
+        rebuild_counters()
+        bump_model_versions(Customer, Product, Order, OrderItem, OrderDailyStats)
+
+
+def generate_data(customers, products, orders, seed=42, years=3, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Inserts ``customers``, ``products`` and ``orders`` generated from ``seed``
+    after the existing rows. ``progress(table, done, total)`` is called after
+    every chunk. Returns the GeneratedData.
+    """
+    rng = random.Random(seed)
+    now = timezone.now().replace(microsecond=0)
+    start = now - timedelta(days=365 * years)
+    span = (now - start).total_seconds()
+    adapt_datetime = connection.ops.adapt_datetimefield_value
+    report = progress or (lambda table, done, total: None)
+
+    customer_base, product_base, order_base = _next_pk(Customer), _next_pk(Product), _next_pk(Order)
+
+    # Products, in random popularity order so the popular ones are not the first ids.
+    prices = []
+    with connection.cursor() as cursor:
+        for offset, size in _chunks(products, chunk_size):
+            rows = []
+            for pk in range(product_base + offset, product_base + offset + size):
+                price = _price_cents(rng)
+                prices.append(price)
+                name = f'{rng.choice(PRODUCT_ADJECTIVES)} {rng.choice(PRODUCT_NOUNS)} {pk}'
+                rows.append((pk, name, _cents(price), rng.randint(0, 500)))
+            with transaction.atomic():
+                _insert(cursor, Product, ('id', 'name', 'price', 'stock'), rows)
+            report('products', offset + size, products)
+    popularity = list(range(products))
+    rng.shuffle(popularity)
+    product_weights = zipf_cum_weights(products, PRODUCT_POPULARITY_EXPONENT)
+
+    # Customers; sign-up times are kept to date their orders after them.
+    signed_up = []
+    with connection.cursor() as cursor:
+        for offset, size in _chunks(customers, chunk_size):
+            rows = []
+            for pk in range(customer_base + offset, customer_base + offset + size):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                created = _growth_offset(rng, span)
+                signed_up.append(created)
+                phone = f'+1{rng.randint(2000000000, 9999999999)}' if rng.random() < 0.6 else None
+                rows.append((
+                    pk,
+                    f'{first} {last}',
+                    f'{first.lower()}.{last.lower()}{pk}@{rng.choice(EMAIL_DOMAINS)}',
+                    phone,
+                    adapt_datetime(start + timedelta(seconds=created)),
+                    0,
+                    '0.00',
+                ))
+            with transaction.atomic():
+                _insert(
+                    cursor, Customer,
+                    ('id', 'name', 'email', 'phone', 'created_at', 'order_count', 'lifetime_value'),
+                    rows,
+                )
+            report('customers', offset + size, customers)
+    activity = list(range(customers))
+    rng.shuffle(activity)
+    customer_weights = zipf_cum_weights(customers, CUSTOMER_ACTIVITY_EXPONENT)
+
+    order_items = 0
+    with connection.cursor() as cursor:
+        for offset, size in _chunks(orders, chunk_size):
+            buyers = rng.choices(activity, cum_weights=customer_weights, k=size)
+            line_counts = rng.choices(range(1, 6), weights=ITEMS_PER_ORDER_WEIGHTS, k=size)
+            order_rows, item_rows = [], []
+            pks = range(order_base + offset, order_base + offset + size)
+            for pk, buyer, line_count in zip(pks, buyers, line_counts):
+                lines = {}
+                for index in rng.choices(popularity, cum_weights=product_weights, k=line_count):
+                    lines[index] = rng.choices((1, 2, 3), weights=QUANTITY_WEIGHTS)[0]
+                total = 0
+                for index, quantity in lines.items():
+                    total += prices[index] * quantity
+                    item_rows.append((pk, product_base + index, quantity))
+                created = signed_up[buyer]
+                ordered = created + _growth_offset(rng, span - created)
+                order_rows.append((
+                    pk, customer_base + buyer, _cents(total), adapt_datetime(start + timedelta(seconds=ordered)),
+                ))
+            with transaction.atomic():
+                _insert(cursor, Order, ('id', 'customer', 'total_amount', 'order_date'), order_rows)
+                _insert(cursor, OrderItem, ('order', 'product', 'quantity'), item_rows)
+            order_items += len(item_rows)
+            report('orders', offset + size, orders)
+
+        # Backends with sequences must continue after the explicit ids.
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Customer, Product, Order]):
+            cursor.execute(sql)
+
+    with transaction.atomic():
+        refresh_order_activity(Customer.objects.filter(pk__gte=customer_base))
+        rebuild_counters()
+        rebuild_order_stats()
+        bump_model_versions(Customer, Product, Order, OrderItem, OrderDailyStats)
+
+    return GeneratedData(
+        customers=range(customer_base, customer_base + customers),
+        products=range(product_base, product_base + products),
+        orders=range(order_base, order_base + orders),
+        order_items=order_items,
+    )
@@ -0,0 +1,70 @@
+# alx-backend-graphql_crm/crm/db.py
+"""
+Read/write database routing and the SQLite connection profile.
+
+``ReadWriteRouter`` sends every write to the CRM_WRITE_DATABASE alias. Reads
+go there too, unless they happen inside ``read_from(alias)``: the GraphQL
+views wrap query operations in it with CRM_READ_DATABASE, so GraphQL readers
+use their own connections while mutations, cron jobs, Celery tasks and
+management commands read and write through the write alias (and see their own
+uncommitted rows).
+
+On SQLite both aliases name the same file. ``apply_sqlite_pragmas`` runs on
+every new connection and applies the SQLITE_PRAGMAS setting; with WAL
+journaling, readers see the last committed state without waiting for a
+writer, and a writer does not wait for readers. Connections of the read alias
+are also made ``query_only``, so a stray write fails loudly instead of taking
+the write lock.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_read_alias = ContextVar('crm_read_alias', default=None)
+
+
+def write_alias():
+    return getattr(settings, 'CRM_WRITE_DATABASE', DEFAULT_DB_ALIAS)
+
+
+def read_alias():
+    return getattr(settings, 'CRM_READ_DATABASE', None) or write_alias()
+
+
+@contextmanager
+def read_from(alias):
+    """Routes the reads of the block to ``alias``; None keeps them on the write alias."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReadWriteRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or write_alias()
+
+    def db_for_write(self, model, **hints):
+        return write_alias()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == write_alias()
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """``connection_created`` receiver applying SQLITE_PRAGMAS to new SQLite connections."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    if connection.alias == read_alias() and read_alias() != write_alias():
+        pragmas['query_only'] = 'ON'
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
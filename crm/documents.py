@@ -0,0 +1,145 @@
+# alx-backend-graphql_crm/crm/documents.py
+"""
+LRU cache of parsed and validated GraphQL documents, plus the store behind
+persisted queries.
+
+Both are keyed by the SHA-256 hex digest of the query text, which is also the
+id a persisted-query client sends (Apollo's ``extensions.persistedQuery``
+``sha256Hash``), so a persisted id maps straight onto a cached document.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from graphql import parse
+from graphql.validation import validate
+
+DEFAULT_DOCUMENT_CACHE_SIZE = 512
+DEFAULT_PERSISTED_QUERY_LIMIT = 2048
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """A thread-safe, size-bounded mapping with hit/miss/eviction counters."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._data),
+            'max_size': self.max_size,
+        }
+
+
+class DocumentCache(LRUCache):
+    """
+    Caches ``(document, errors)`` per query text for one schema.
+
+    Only documents that parse and validate are cached by default: the text of
+    a failing query costs a client nothing to vary, and caching it would let
+    garbage evict the documents of real operations. Validation failures of
+    persisted queries, whose text the persisted-query store already bounds,
+    are cached with ``cache_invalid``.
+    """
+
+    def get_document(self, schema, query, validation_rules=None, max_errors=None, cache_invalid=False):
+        """
+        Returns the parsed document (``None`` on a syntax error) and its list of
+        syntax or validation errors, parsing and validating only on a miss.
+        """
+        key = query_hash(query)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            document = parse(query)
+        except Exception as e:
+            return None, [e]
+        entry = (document, validate(schema, document, validation_rules, max_errors))
+        if cache_invalid or not entry[1]:
+            self.set(key, entry)
+        return entry
+
+
+class PersistedQueryNotFound(Exception):
+    """Raised when a client sends only the hash of a query the server has not stored."""
+
+    def __init__(self):
+        super().__init__("PersistedQueryNotFound")
+
+
+class PersistedQueryStore(LRUCache):
+    """Maps SHA-256 ids to query text, registered by clients or preloaded from settings."""
+
+    def __init__(self, max_size, queries=()):
+        super().__init__(max_size)
+        for query in queries:
+            self.register(query)
+
+    def register(self, query, sha256_hash=None):
+        key = query_hash(query)
+        if sha256_hash is not None and sha256_hash != key:
+            raise Exception("Validation Error: provided sha256Hash does not match query.")
+        self.set(key, query)
+        return key
+
+    def resolve(self, sha256_hash):
+        query = self.get(sha256_hash)
+        if query is None:
+            raise PersistedQueryNotFound()
+        return query
+
+
+document_cache = DocumentCache(
+    getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_SIZE', DEFAULT_DOCUMENT_CACHE_SIZE)
+)
+
+persisted_queries = PersistedQueryStore(
+    getattr(settings, 'GRAPHQL_PERSISTED_QUERY_LIMIT', DEFAULT_PERSISTED_QUERY_LIMIT),
+    queries=getattr(settings, 'GRAPHQL_PERSISTED_QUERIES', ()),
+)
@@ -0,0 +1,147 @@
+# alx-backend-graphql_crm/crm/exports.py
+"""
+Streaming CSV and NDJSON exports of orders, customers and products.
+
+An export takes the filters of the matching FilterSet as query parameters and
+reads the rows as tuples with ``QuerySet.iterator()``, so the database
+cursor is fetched EXPORT_CHUNK_SIZE rows at a time and no model instances are
+built. Each chunk is encoded and handed to ``StreamingHttpResponse`` before
+the next one is fetched, which keeps memory flat whatever the number of rows.
+
+The product lines of an order chunk are read with one query on the order items
+table per chunk, instead of one per order or a prefetch of the whole export.
+
+Exports read from the read database alias (see crm/db.py). Rows come in
+primary key order, or in the filter's ``order_by`` order when one is given.
+"""
+import csv
+from collections import defaultdict
+from datetime import date, datetime
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .db import read_alias
+from .filters import CustomerFilter, OrderFilter, ProductFilter
+from .models import OrderItem
+
+# Rows per fetch and per response chunk; keeps the IN list of the order item
+# query under SQLite's 999 parameters.
+EXPORT_CHUNK_SIZE = 900
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Export:
+    """The filters and columns of one exportable model; ``items`` adds the order lines."""
+
+    def __init__(self, filterset_class, columns, items=False):
+        self.filterset_class = filterset_class
+        self.columns = columns
+        self.items = items
+
+    @property
+    def model(self):
+        return self.filterset_class._meta.model
+
+    @property
+    def headers(self):
+        headers = [column.replace('__', '_') for column in self.columns]
+        return headers + ['items'] if self.items else headers
+
+    def filterset(self, params):
+        queryset = self.model._default_manager.using(read_alias())
+        return self.filterset_class(params, queryset=queryset)
+
+    def queryset(self, filterset):
+        """The filtered rows, without the duplicates joins to order items can add."""
+        queryset = filterset.qs
+        ordering = queryset.query.order_by or ('pk',)
+        if len(queryset.query.alias_map) > 1 and not queryset.query.distinct:
+            queryset = queryset.model._default_manager.using(queryset.db).filter(pk__in=queryset.values('pk'))
+        return queryset.order_by(*ordering).values_list(*self.columns)
+
+    def chunks(self, queryset, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yields lists of row tuples, with the order lines appended when ``items`` is set."""
+        rows = queryset.iterator(chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            if self.items:
+                items = defaultdict(list)
+                lines = (
+                    OrderItem.objects.using(queryset.db)
+                    .filter(order_id__in=[row[0] for row in chunk])
+                    .order_by('order_id', 'product_id')
+                    .values_list('order_id', 'product_id', 'quantity')
+                )
+                for order_id, product_id, quantity in lines:
+                    items[order_id].append((product_id, quantity))
+                chunk = [row + (items[row[0]],) for row in chunk]
+            yield chunk
+
+
+EXPORTS = {
+    'orders': Export(
+        OrderFilter,
+        ('id', 'customer_id', 'customer__email', 'total_amount', 'order_date'),
+        items=True,
+    ),
+    'customers': Export(
+        CustomerFilter,
+        ('id', 'name', 'email', 'phone', 'created_at', 'last_order_at', 'order_count', 'lifetime_value'),
+    ),
+    'products': Export(ProductFilter, ('id', 'name', 'price', 'stock')),
+}
+
+
+class _Line:
+    """File-like target that hands back what ``csv.writer`` writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ';'.join(f'{product_id}:{quantity}' for product_id, quantity in value)
+    return value
+
+
+def encode_csv(export, chunks):
+    writer = csv.writer(_Line())
+    yield writer.writerow(export.headers)
+    for chunk in chunks:
+        yield ''.join(writer.writerow([_csv_value(value) for value in row]) for row in chunk)
+
+
+def encode_ndjson(export, chunks):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    headers = export.headers
+    for chunk in chunks:
+        lines = []
+        for row in chunk:
+            record = dict(zip(headers, row))
+            if export.items:
+                record['items'] = [
+                    {'product_id': product_id, 'quantity': quantity} for product_id, quantity in record['items']
+                ]
+            lines.append(encoder.encode(record) + '\n')
+        yield ''.join(lines)
+
+
+ENCODERS = {
+    'csv': encode_csv,
+    'ndjson': encode_ndjson,
+}
+
+
+def stream_export(export, filterset, export_format):
+    """The encoded export of ``filterset``'s rows, as an iterator of strings."""
+    return ENCODERS[export_format](export, export.chunks(export.queryset(filterset)))
@@ -0,0 +1,127 @@
+# alx-backend-graphql_crm/crm/fields.py
+from functools import partial
+
+import graphene
+from django.db.models import QuerySet
+from graphene.relay.connection import connection_adapter, page_info_adapter
+from graphene_django.filter import DjangoFilterConnectionField
+from graphql_relay import get_offset_with_default, offset_to_cursor
+
+from .optimizer import optimize_queryset
+from .pagination import encode_cursor, keyset_page
+
+
+class OptimizedFilterConnectionField(DjangoFilterConnectionField):
+    """
+    DjangoFilterConnectionField whose filtered queryset is joined, prefetched
+    and projected to match the client's selection set.
+
+    Passing ``keyset_ordering`` adds an opt-in ``keyset`` argument: with
+    ``keyset: true`` the connection is ordered by those fields and its cursors
+    encode the sort key instead of a row offset.
+
+    Forward offset pages fetch one extra row to tell whether there is a next
+    page, instead of counting the filtered rows on every request; the count
+    is left to ``totalCount`` (see crm/counts.py).
+    """
+
+    def __init__(self, type_, *args, keyset_ordering=None, **kwargs):
+        self.keyset_ordering = tuple(keyset_ordering or ())
+        if self.keyset_ordering:
+            kwargs.setdefault('keyset', graphene.Boolean(
+                default_value=False,
+                description=f"Paginate by ({', '.join(self.keyset_ordering)}) cursors instead of offsets.",
+            ))
+        super().__init__(type_, *args, **kwargs)
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, keyset_ordering=(), **kwargs):
+        if args.get('keyset') and args.get('order_by'):
+            raise Exception("Validation Error: 'orderBy' cannot be combined with keyset pagination.")
+        queryset = super().resolve_queryset(connection, iterable, info, args, **kwargs)
+        if args.get('keyset'):
+            queryset = queryset.order_by(*keyset_ordering)
+            return optimize_queryset(
+                queryset, info, columns=[name.lstrip('-') for name in keyset_ordering]
+            )
+        return optimize_queryset(queryset, info)
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable, max_limit=None):
+        if not args.get('keyset'):
+            if (
+                isinstance(iterable, QuerySet)
+                and args.get('last') is None
+                and args.get('before') is None
+                and (args.get('first') or 0) >= 0
+            ):
+                return cls.resolve_forward_page(connection, args, iterable, max_limit=max_limit)
+            return super().resolve_connection(connection, args, iterable, max_limit=max_limit)
+        if args.get('offset') is not None:
+            raise Exception("Validation Error: 'offset' cannot be combined with keyset pagination.")
+
+        ordering = iterable.query.order_by
+        rows, has_previous_page, has_next_page = keyset_page(
+            iterable,
+            ordering,
+            first=args.get('first'),
+            last=args.get('last'),
+            after=args.get('after'),
+            before=args.get('before'),
+            max_limit=max_limit,
+        )
+        edges = [
+            connection.Edge(node=row, cursor=encode_cursor(row, ordering)) for row in rows
+        ]
+        connection = connection_adapter(
+            connection,
+            edges,
+            page_info_adapter(
+                startCursor=edges[0].cursor if edges else None,
+                endCursor=edges[-1].cursor if edges else None,
+                hasPreviousPage=has_previous_page,
+                hasNextPage=has_next_page,
+            ),
+        )
+        connection.iterable = iterable
+        return connection
+
+    @classmethod
+    def resolve_forward_page(cls, connection, args, iterable, max_limit=None):
+        """An offset page from ``first``, ``after`` and ``offset`` without counting the rows."""
+        start = get_offset_with_default(args.get('after'), -1) + 1
+        offset = args.get('offset')
+        if offset:
+            start += offset
+        first = args.get('first')
+        if first is None:
+            first = max_limit
+
+        if first is None:
+            rows, has_next_page = list(iterable[start:]), False
+        else:
+            rows = list(iterable[start:start + first + 1])
+            has_next_page = len(rows) > first
+            rows = rows[:first]
+
+        edges = [
+            connection.Edge(node=row, cursor=offset_to_cursor(start + index))
+            for index, row in enumerate(rows)
+        ]
+        connection = connection_adapter(
+            connection,
+            edges,
+            page_info_adapter(
+                startCursor=edges[0].cursor if edges else None,
+                endCursor=edges[-1].cursor if edges else None,
+                hasPreviousPage=False,
+                hasNextPage=has_next_page,
+            ),
+        )
+        connection.iterable = iterable
+        return connection
+
+    def get_queryset_resolver(self):
+        return partial(
+            super().get_queryset_resolver(), keyset_ordering=self.keyset_ordering
+        )
@@ -1,15 +1,49 @@
 # alx-backend-graphql_crm/crm/filters.py (NEW FILE)
 import django_filters
+from django_filters.constants import EMPTY_VALUES
 from django.db.models import Q
 
 from .models import Customer, Product, Order
+from .search import contains_lookup
+
+
+class SearchFilter(django_filters.CharFilter):
+    """Case-insensitive substring filter answered from the trigram search index when possible."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('lookup_expr', 'icontains')
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        lookup = contains_lookup(qs.model, self.field_name, value)
+        if lookup is None:
+            lookup = {f'{self.field_name}__{self.lookup_expr}': value}
+        if _is_multi_valued(qs.model, self.field_name):
+            # A join to a many side returns a row per match (an order per matching
+            # product); a subquery on the primary key returns each row once.
+            lookup = {'pk__in': qs.model._default_manager.using(qs.db).filter(**lookup).values('pk')}
+        elif self.distinct:
+            qs = qs.distinct()
+        return qs.filter(**lookup)
+
+
+def _is_multi_valued(model, field_path):
+    *relations, _ = field_path.split('__')
+    for relation in relations:
+        field = model._meta.get_field(relation)
+        if field.many_to_many or field.one_to_many:
+            return True
+        model = field.related_model
+    return False
 
 # --- FilterSets ---
 
 class CustomerFilter(django_filters.FilterSet):
-    # Case-insensitive partial matches (icontains)
-    name = django_filters.CharFilter(lookup_expr='icontains')
-    email = django_filters.CharFilter(lookup_expr='icontains')
+    # Case-insensitive partial matches (icontains, via the search index)
+    name = SearchFilter()
+    email = SearchFilter()
     
     # Date range filters (explicit GTE/LTE lookups)
     created_at_gte = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
@@ -21,6 +55,21 @@ class CustomerFilter(django_filters.FilterSet):
         label='Filter by phone number starting with pattern (e.g., +1)'
     )
 
+    # Order activity range filters (indexed columns kept up to date by the order writes)
+    last_order_at_gte = django_filters.DateTimeFilter(field_name='last_order_at', lookup_expr='gte')
+    last_order_at_lte = django_filters.DateTimeFilter(field_name='last_order_at', lookup_expr='lte')
+    has_orders = django_filters.BooleanFilter(field_name='last_order_at', lookup_expr='isnull', exclude=True)
+    order_count_gte = django_filters.NumberFilter(field_name='order_count', lookup_expr='gte')
+    order_count_lte = django_filters.NumberFilter(field_name='order_count', lookup_expr='lte')
+    lifetime_value_gte = django_filters.NumberFilter(field_name='lifetime_value', lookup_expr='gte')
+    lifetime_value_lte = django_filters.NumberFilter(field_name='lifetime_value', lookup_expr='lte')
+
+    # Sorting, e.g. orderBy: "-lifetimeValue" for the top customers (graphene-django
+    # converts the camelCase names to these field names)
+    order_by = django_filters.OrderingFilter(
+        fields=('created_at', 'last_order_at', 'order_count', 'lifetime_value')
+    )
+
     class Meta:
         model = Customer
         fields = ['name', 'email', 'created_at']
@@ -32,8 +81,8 @@ class CustomerFilter(django_filters.FilterSet):
 
 
 class ProductFilter(django_filters.FilterSet):
-    # Case-insensitive partial match
-    name = django_filters.CharFilter(lookup_expr='icontains')
+    # Case-insensitive partial match (via the search index)
+    name = SearchFilter()
     
     # Range filters for price
     price_gte = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
@@ -56,8 +105,8 @@ class OrderFilter(django_filters.FilterSet):
     order_date_lte = django_filters.DateTimeFilter(field_name='order_date', lookup_expr='lte')
 
     # Related field lookups (customer name, product name)
-    customer_name = django_filters.CharFilter(field_name='customer__name', lookup_expr='icontains')
-    product_name = django_filters.CharFilter(field_name='products__name', lookup_expr='icontains')
+    customer_name = SearchFilter(field_name='customer__name')
+    product_name = SearchFilter(field_name='products__name')
 
     # Challenge: Filter by specific product ID
     product_id = django_filters.NumberFilter(
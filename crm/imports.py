@@ -0,0 +1,258 @@
+# alx-backend-graphql_crm/crm/imports.py
+"""
+Streaming CSV and NDJSON imports of customers and products.
+
+Rows are read one at a time from any iterable of text lines (a file, or the
+body of an upload) and validated with the rules of the GraphQL mutations.
+Valid rows are collected into chunks of IMPORT_CHUNK_SIZE, and each chunk is
+written in its own short transaction, so memory stays bounded by the chunk
+size whatever the size of the input. Rejected rows are written, with their
+line number and errors, as NDJSON to the ``errors`` file.
+
+Customers are upserted on their email: new emails are inserted, and the name
+and phone of existing ones are updated. Products are upserted on their ``id``
+when the row has one and inserted otherwise. Within the input, the last row
+for an email or id wins.
+
+The writes are the multi-row ``INSERT ... ON CONFLICT DO UPDATE`` statements
+``bulk_create(update_conflicts=True)`` runs, built with the same backend
+operations, but bound directly from the validated values: preparing every
+field of a model instance per row made ``bulk_create`` several times slower
+than the database itself. Conflicting rows whose values did not change are
+left alone, and the search index insert trigger is deferred for each chunk
+(see ``defer_search_index``), so new rows are indexed with one statement and
+only changed rows go through the update trigger. Each chunk adjusts the
+report counters by the customers it inserted.
+"""
+import csv
+import json
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from .counters import adjust_counters
+from .models import Customer, Product
+from .response_cache import bump_model_versions
+from .search import defer_search_index
+from .validators import validate_email, validate_phone
+
+IMPORT_CHUNK_SIZE = 20_000
+# Keys per IN (...) lookup of the existing rows; stays under SQLite's
+# bound-parameter limit.
+LOOKUP_BATCH_SIZE = 900
+# Null-safe "differs from" of the backends whose upserts take a WHERE clause.
+DISTINCT_OPERATORS = {'sqlite': 'IS NOT', 'postgresql': 'IS DISTINCT FROM'}
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    rejected: int = 0
+
+
+def _text(row, name, max_length, required=False):
+    value = row.get(name)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ValidationError(f"{name}: This field is required.")
+    if len(value) > max_length:
+        raise ValidationError(f"{name}: Ensure this value has at most {max_length} characters.")
+    return value
+
+
+def _integer(row, name, default=None):
+    value = row.get(name)
+    if value is None or str(value).strip() == '':
+        return default
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValidationError(f"{name}: Enter a whole number.")
+
+
+class CustomerImport:
+    model = Customer
+    columns = ('name', 'email', 'phone', 'created_at', 'order_count', 'lifetime_value')
+    update_columns = ('name', 'phone')
+
+    def clean(self, row):
+        name = _text(row, 'name', 100, required=True)
+        email = _text(row, 'email', 254, required=True)
+        phone = _text(row, 'phone', 20) or None
+        try:
+            validate_email(email)
+        except ValidationError as e:
+            raise ValidationError(f"email: {e.message}")
+        if phone:
+            try:
+                validate_phone(phone)
+            except ValidationError as e:
+                raise ValidationError(f"phone: {e.message}")
+        return email, (name, email, phone)
+
+    def write(self, rows):
+        existing = _existing(Customer, 'email', rows)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        with defer_search_index(Customer):
+            _upsert(
+                Customer, self.columns, [values + (now, 0, '0.00') for values in rows.values()],
+                unique_columns=('email',), update_columns=self.update_columns,
+            )
+        created = len(rows) - len(existing)
+        adjust_counters(customers=created)
+        return created, len(existing)
+
+
+class ProductImport:
+    model = Product
+    columns = ('id', 'name', 'price', 'stock')
+    max_price = Decimal('99999999.99')
+
+    def clean(self, row):
+        pk = _integer(row, 'id')
+        if pk is not None and pk < 1:
+            raise ValidationError("id: Must be a positive number.")
+        name = _text(row, 'name', 100, required=True)
+        try:
+            price = Decimal(str(row.get('price')).strip())
+        except InvalidOperation:
+            raise ValidationError("price: Enter a number.")
+        if not price.is_finite() or price <= 0 or price > self.max_price:
+            raise ValidationError("price: Price must be a positive number.")
+        if price != price.quantize(Decimal('0.01')):
+            raise ValidationError("price: Ensure that there are no more than 2 decimal places.")
+        stock = _integer(row, 'stock', default=0)
+        if stock < 0:
+            raise ValidationError("stock: Stock cannot be negative.")
+        # Rows without an id have no key to upsert on; each one is a new product.
+        return pk if pk is not None else object(), (pk, name, str(price), stock)
+
+    def write(self, rows):
+        with_pk = {pk: values for pk, values in rows.items() if values[0] is not None}
+        existing = _existing(Product, 'id', with_pk)
+        with defer_search_index(Product, inserted_pks=[pk for pk in with_pk if pk not in existing]):
+            _upsert(
+                Product, self.columns, list(with_pk.values()),
+                unique_columns=('id',), update_columns=self.columns[1:],
+            )
+            if with_pk:
+                # Backends with sequences must continue after the explicit ids.
+                with connection.cursor() as cursor:
+                    for sql in connection.ops.sequence_reset_sql(no_style(), [Product]):
+                        cursor.execute(sql)
+            _upsert(Product, self.columns[1:], [values[1:] for values in rows.values() if values[0] is None])
+        return len(rows) - len(existing), len(existing)
+
+
+IMPORTS = {
+    'customers': CustomerImport(),
+    'products': ProductImport(),
+}
+
+
+def _existing(model, column, keys):
+    """The ``keys`` already in the unique ``column`` of ``model``, as a set."""
+    keys = list(keys)
+    sql = f"SELECT {column} FROM {connection.ops.quote_name(model._meta.db_table)} WHERE {column} IN "
+    existing = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            batch = keys[start:start + LOOKUP_BATCH_SIZE]
+            cursor.execute(sql + f"({', '.join(['%s'] * len(batch))})", batch)
+            existing.update(key for key, in cursor.fetchall())
+    return existing
+
+
+def _upsert(model, columns, rows, unique_columns=None, update_columns=None):
+    """
+    Inserts ``rows`` of ``columns`` values; with ``unique_columns``, conflicting
+    rows are updated, where the backend can skip those left unchanged.
+    """
+    if not rows:
+        return
+    ops = connection.ops
+    table = ops.quote_name(model._meta.db_table)
+    fields = [model._meta.get_field(column) for column in columns]
+    suffix = ''
+    if unique_columns:
+        suffix = ' ' + ops.on_conflict_suffix_sql(fields, OnConflict.UPDATE, update_columns, unique_columns)
+        distinct = DISTINCT_OPERATORS.get(connection.vendor)
+        if distinct:
+            # Unchanged rows are neither rewritten nor passed to the update triggers.
+            suffix += ' WHERE ' + ' OR '.join(
+                f"{table}.{ops.quote_name(column)} {distinct} EXCLUDED.{ops.quote_name(column)}"
+                for column in update_columns
+            )
+    row_sql = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    batch_size = ops.bulk_batch_size(fields, rows)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(ops.quote_name(field.column) for field in fields)}) "
+                f"VALUES {', '.join([row_sql] * len(batch))}{suffix}",
+                [value for row in batch for value in row],
+            )
+
+
+def read_rows(lines, import_format):
+    """Yields ``(line_number, row)`` from CSV (with a header row) or NDJSON lines; bad lines give a None row."""
+    if import_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def _flush(importer, chunk, result):
+    if not chunk:
+        return
+    with transaction.atomic():
+        created, updated = importer.write(chunk)
+        bump_model_versions(importer.model)
+    result.created += created
+    result.updated += updated
+    chunk.clear()
+
+
+def import_rows(resource, lines, import_format, errors, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    Imports the ``resource`` rows of ``lines``, writing rejected rows to the
+    ``errors`` text file. ``progress(result)`` is called after every chunk.
+    Returns the ImportResult.
+    """
+    importer = IMPORTS[resource]
+    result = ImportResult()
+    chunk = {}
+    for line_number, row in read_rows(lines, import_format):
+        result.rows += 1
+        try:
+            if row is None:
+                raise ValidationError("Not a JSON object.")
+            key, values = importer.clean(row)
+        except ValidationError as e:
+            result.rejected += 1
+            errors.write(json.dumps({'line': line_number, 'errors': e.messages, 'row': row}, default=str) + '\n')
+            continue
+        chunk[key] = values
+        if len(chunk) >= chunk_size:
+            _flush(importer, chunk, result)
+            if progress:
+                progress(result)
+    _flush(importer, chunk, result)
+    return result
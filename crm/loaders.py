@@ -0,0 +1,257 @@
+# alx-backend-graphql_crm/crm/loaders.py
+"""
+Per-request DataLoaders for the CRM relations.
+
+graphql-core's synchronous executor resolves a list depth-first, so a loader
+cannot wait for "the end of the tick" to see every sibling key. Instead, when a
+connection's edges resolve, every node on the page is queued with the loaders
+(see ``BatchedConnection``). The first ``load()`` of a relation then dispatches
+one ``IN (...)`` query for all queued keys and later siblings read from the
+cache.
+
+Under the async view the loaders are ``AsyncDataLoader``s instead: ``load()``
+returns a future, keys requested during one event-loop tick are fetched
+together on the next, and each batch runs in the ORM thread pool, so batches of
+different loaders overlap.
+"""
+import asyncio
+from collections import defaultdict
+
+import graphene
+
+from .counts import resolve_count
+from .models import Customer, Order, OrderItem
+from .threadpool import run_blocking
+
+
+class DataLoader:
+    """
+    Caches values by key and fetches queued keys in a single batch.
+    ``on_load`` is called with the values of every fetched batch.
+    """
+
+    def __init__(self, batch_load_fn, on_load=None):
+        self.batch_load_fn = batch_load_fn
+        self.on_load = on_load
+        self._cache = {}
+        self._queue = []
+
+    def queue(self, keys):
+        """Registers keys to be fetched together with the next dispatch."""
+        self._queue.extend(key for key in keys if key not in self._cache)
+
+    def prime(self, key, value):
+        """
+        Stores an already-known value so it is never fetched. Returns False
+        when the key was cached already.
+        """
+        if key in self._cache:
+            return False
+        self._cache[key] = value
+        return True
+
+    def load(self, key):
+        if key not in self._cache:
+            self._queue.append(key)
+            self.dispatch()
+        return self._cache[key]
+
+    def load_many(self, keys):
+        self.queue(keys)
+        if self._queue:
+            self.dispatch()
+        return [self._cache[key] for key in keys]
+
+    def dispatch(self):
+        keys = self._take_queue()
+        if keys:
+            self._store(keys, self.batch_load_fn(keys))
+
+    def _take_queue(self):
+        keys = list(dict.fromkeys(key for key in self._queue if key not in self._cache))
+        self._queue = []
+        return keys
+
+    def _store(self, keys, values):
+        self._cache.update(zip(keys, values))
+        if self.on_load is not None:
+            self.on_load(values)
+
+
+class AsyncDataLoader(DataLoader):
+    """
+    DataLoader for the async executor. ``load()`` returns a future and the
+    batch is dispatched once the current event-loop tick has queued every
+    sibling key. The batch function runs in the ORM thread pool; ``on_load``
+    and the cache stay on the event loop.
+    """
+
+    def __init__(self, batch_load_fn, on_load=None):
+        super().__init__(batch_load_fn, on_load)
+        self._futures = {}
+        self._dispatch_task = None
+
+    def prime(self, key, value):
+        primed = super().prime(key, value)
+        future = self._futures.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(self._cache[key])
+        return primed
+
+    def load(self, key):
+        if key in self._cache:
+            return self._cache[key]
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            self._queue.append(key)
+            if self._dispatch_task is None:
+                # A new task first runs on the next tick, after every
+                # sibling resolver of this tick has called load().
+                self._dispatch_task = loop.create_task(self.dispatch())
+        return future
+
+    def load_many(self, keys):
+        return asyncio.gather(*(self._load_value(key) for key in keys))
+
+    async def _load_value(self, key):
+        value = self.load(key)
+        return await value if isinstance(value, asyncio.Future) else value
+
+    async def dispatch(self):
+        self._dispatch_task = None
+        keys = self._take_queue()
+        if not keys:
+            return
+        try:
+            values = await run_blocking(self.batch_load_fn, keys)
+        except Exception as error:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(error)
+            return
+        self._store(keys, values)
+        for key in keys:
+            future = self._futures.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(self._cache[key])
+
+
+# --- BATCH FUNCTIONS ---
+
+def load_customers(keys):
+    customers = Customer.objects.in_bulk(keys)
+    return [customers.get(key) for key in keys]
+
+
+def load_order_products(keys):
+    """Fetches the products of many orders through the M2M table in one query."""
+    return [[item.product for item in items] for items in load_order_items(keys)]
+
+
+def load_order_items(keys):
+    items_by_order = defaultdict(list)
+    rows = (
+        OrderItem.objects
+        .filter(order_id__in=keys)
+        .select_related('product')
+        .order_by('order_id', 'product_id')
+    )
+    for row in rows:
+        items_by_order[row.order_id].append(row)
+    return [items_by_order[key] for key in keys]
+
+
+def load_customer_orders(keys):
+    orders_by_customer = defaultdict(list)
+    for order in Order.objects.filter(customer_id__in=keys).order_by('pk'):
+        orders_by_customer[order.customer_id].append(order)
+    return [orders_by_customer[key] for key in keys]
+
+
+# --- REQUEST REGISTRY ---
+
+class RequestLoaders:
+    """The set of loaders shared by every resolver of one GraphQL request."""
+
+    def __init__(self, loader_class=DataLoader):
+        self.customer = loader_class(load_customers)
+        self.order_products = loader_class(load_order_products)
+        self.order_items = loader_class(load_order_items)
+        self.customer_orders = loader_class(load_customer_orders, on_load=self._queue_orders)
+
+    def _queue_orders(self, orders):
+        # Orders fetched for a page of customers are queued as one page, so
+        # their own relations are also fetched once rather than per customer.
+        self.queue_nodes(order for customer_orders in orders for order in customer_orders)
+
+    def queue_nodes(self, nodes):
+        """
+        Queues the relation keys of a page of model instances. Relations the
+        query optimizer already joined or prefetched are primed instead.
+        """
+        for node in nodes:
+            prefetched = getattr(node, '_prefetched_objects_cache', {})
+            if isinstance(node, Order):
+                if Order.customer.is_cached(node):
+                    self.prime_nodes(self.customer, node.customer_id, node.customer)
+                else:
+                    self.customer.queue([node.customer_id])
+                if 'products' in prefetched:
+                    self.order_products.prime(node.pk, list(prefetched['products']))
+                else:
+                    self.order_products.queue([node.pk])
+                if 'items' in prefetched:
+                    self.order_items.prime(node.pk, list(prefetched['items']))
+                else:
+                    self.order_items.queue([node.pk])
+            elif isinstance(node, Customer):
+                self.customer.prime(node.pk, node)
+                if 'orders' in prefetched:
+                    self.prime_nodes(self.customer_orders, node.pk, list(prefetched['orders']))
+                else:
+                    self.customer_orders.queue([node.pk])
+
+    def prime_nodes(self, loader, key, value):
+        """Primes a loaded relation and queues the relations of what it holds."""
+        if loader.prime(key, value):
+            self.queue_nodes(value if isinstance(value, list) else [value])
+
+
+def get_loaders(context):
+    """
+    Returns the loaders attached to the request context, creating them on
+    first use. Without a context every call gets fresh (unbatched) loaders.
+    """
+    if context is None:
+        return RequestLoaders()
+    loaders = getattr(context, '_crm_loaders', None)
+    if loaders is None:
+        loaders = RequestLoaders()
+        context._crm_loaders = loaders
+    return loaders
+
+
+class BatchedConnection(graphene.relay.Connection):
+    """
+    Relay connection that feeds its page of nodes to the request loaders, with
+    a cached (and possibly estimated) ``totalCount``; see crm/counts.py.
+    """
+
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int(description="Number of rows matching the connection's arguments, across all pages.")
+    is_estimate = graphene.Boolean(description="Whether totalCount is an estimate rather than an exact count.")
+
+    def resolve_edges(root, info):
+        get_loaders(info.context).queue_nodes(edge.node for edge in root.edges)
+        return root.edges
+
+    def resolve_total_count(root, info):
+        return resolve_count(root, 'value')
+
+    def resolve_is_estimate(root, info):
+        return resolve_count(root, 'is_estimate')
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from crm.counters import purge_customers
+from crm.models import Customer, Order
+
+DEFAULT_CHECKPOINT = '/tmp/customer_cleanup_checkpoint.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes customers without an order in the last --days days, in chunks "
+        "of ascending primary keys with a short transaction per chunk. An "
+        "interrupted run resumes after the last finished chunk, when run again "
+        "with the same --days."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help="Customers whose last order is older than this many days are inactive (default: 365).",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help="Customers deleted per transaction (default: 500).",
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.5,
+            help="Seconds to pause between chunks, so other writers get the database (default: 0.5).",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Only report what would be deleted.",
+        )
+        parser.add_argument(
+            '--checkpoint', default=DEFAULT_CHECKPOINT,
+            help=f"File recording the progress of a run, for resuming it (default: {DEFAULT_CHECKPOINT}).",
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help="Ignore an existing checkpoint and start a new run.",
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        dry_run = options['dry_run']
+        checkpoint = options['checkpoint']
+
+        # A dry run deletes nothing, so it neither resumes nor records a run.
+        state = None if options['restart'] or dry_run else self.read_checkpoint(checkpoint)
+        if state and state.get('days') != options['days']:
+            # The checkpoint belongs to a run over another period.
+            self.stdout.write(f"Discarding the checkpoint of a run with --days {state.get('days')}.")
+            os.remove(checkpoint)
+            state = None
+        if state:
+            cutoff = datetime.fromisoformat(state['cutoff'])
+            last_pk = state['last_pk']
+            self.stdout.write(f"Resuming after customer {last_pk} (cutoff {cutoff.isoformat()}).")
+        else:
+            cutoff = timezone.now() - timedelta(days=options['days'])
+            last_pk = 0
+
+        inactive = Customer.objects.filter(Q(last_order_at__lt=cutoff) | Q(last_order_at__isnull=True))
+        remaining = inactive.filter(pk__gt=last_pk).count()
+        self.stdout.write(f"{remaining} inactive customer(s) to {'check' if dry_run else 'delete'}.")
+
+        deleted_customers = deleted_orders = 0
+        chunk_number = 0
+        while True:
+            chunk = list(
+                inactive.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:options['chunk_size']]
+            )
+            if not chunk:
+                break
+            chunk_number += 1
+            if dry_run:
+                customers = len(chunk)
+                orders = Order.objects.filter(customer_id__in=chunk).count()
+            else:
+                # The chunk is selected again inside the transaction, so a
+                # customer who ordered in the meantime is kept.
+                customers, orders = purge_customers(inactive.filter(pk__in=chunk))
+            deleted_customers += customers
+            deleted_orders += orders
+            last_pk = chunk[-1]
+            if not dry_run:
+                self.write_checkpoint(checkpoint, options['days'], cutoff, last_pk)
+            self.stdout.write(
+                f"chunk {chunk_number}: customers {chunk[0]}-{last_pk}, "
+                f"{customers} customer(s) and {orders} order(s) "
+                f"({deleted_customers}/{remaining} done)"
+            )
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        if not dry_run and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {deleted_customers} inactive customers and {deleted_orders} orders."
+        ))
+
+    @staticmethod
+    def read_checkpoint(path):
+        try:
+            with open(path) as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Unreadable checkpoint {path}: {e}. Use --restart to ignore it.")
+        if not isinstance(state, dict):
+            raise CommandError(f"Unreadable checkpoint {path}: not a JSON object. Use --restart to ignore it.")
+        return state
+
+    @staticmethod
+    def write_checkpoint(path, days, cutoff, last_pk):
+        # Written to a temporary file first, so an interrupted write cannot
+        # leave a truncated checkpoint behind.
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({'days': days, 'cutoff': cutoff.isoformat(), 'last_pk': last_pk}, file)
+        os.replace(temporary, path)
@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from crm.datagen import DEFAULT_CHUNK_SIZE, clear_data, generate_data
+
+# Rows per unit of --scale
+CUSTOMERS_PER_SCALE = 10_000
+PRODUCTS_PER_SCALE = 1_000
+ORDERS_PER_SCALE = 100_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates deterministic CRM data: --scale 1 gives 10,000 customers, 1,000 "
+        "products and 100,000 orders; --scale 10 gives a million orders."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help="Scale factor (default: 1).")
+        parser.add_argument('--customers', type=int, help="Number of customers, overriding --scale.")
+        parser.add_argument('--products', type=int, help="Number of products, overriding --scale.")
+        parser.add_argument('--orders', type=int, help="Number of orders, overriding --scale.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed (default: 42).")
+        parser.add_argument(
+            '--years', type=int, default=3, help="Sign-ups and orders span this many years (default: 3).",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help=f"Rows per INSERT and transaction (default: {DEFAULT_CHUNK_SIZE}).",
+        )
+        parser.add_argument(
+            '--clear', action='store_true', help="Delete all existing customers, products and orders first.",
+        )
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        customers = options['customers'] if options['customers'] is not None else round(CUSTOMERS_PER_SCALE * scale)
+        products = options['products'] if options['products'] is not None else round(PRODUCTS_PER_SCALE * scale)
+        orders = options['orders'] if options['orders'] is not None else round(ORDERS_PER_SCALE * scale)
+        if orders and not (customers and products):
+            raise CommandError("Orders need at least one customer and one product.")
+        if options['chunk_size'] < 1 or options['years'] < 1:
+            raise CommandError("--chunk-size and --years must be at least 1.")
+
+        if options['clear']:
+            clear_data()
+            self.stdout.write("Existing data cleared.")
+
+        started = time.perf_counter()
+        reported = {}
+
+        def progress(table, done, total):
+            # One line per tenth of each table.
+            step = done * 10 // total
+            if reported.get(table) != step:
+                reported[table] = step
+                self.stdout.write(f"{table}: {done}/{total} ({time.perf_counter() - started:.1f}s)")
+
+        data = generate_data(
+            customers,
+            products,
+            orders,
+            seed=options['seed'],
+            years=options['years'],
+            chunk_size=options['chunk_size'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(data.customers)} customers, {len(data.products)} products, "
+            f"{len(data.orders)} orders and {data.order_items} order items "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from crm.exports import FORMATS
+from crm.imports import IMPORT_CHUNK_SIZE, IMPORTS, import_rows
+
+PROGRESS_ROWS = 100_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams customers (upserted on email) or products (upserted on id) "
+        "from a CSV or NDJSON file and writes rejected rows to an errors file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(IMPORTS), help="What the file holds.")
+        parser.add_argument('path', help="File to import, or - for standard input.")
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS), dest='import_format',
+            help="File format (default: from the file extension).",
+        )
+        parser.add_argument(
+            '--errors',
+            help="NDJSON file for rejected rows (default: the input path plus .errors.ndjson).",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+            help=f"Rows per transaction (default: {IMPORT_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['import_format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if import_format not in FORMATS:
+            raise CommandError("Cannot tell the format from the file name; pass --format.")
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        errors_path = options['errors'] or (
+            'import-errors.ndjson' if path == '-' else f'{path}.errors.ndjson'
+        )
+
+        started = time.perf_counter()
+        reported = [0]
+
+        def progress(result):
+            # One line per PROGRESS_ROWS rows.
+            if result.rows // PROGRESS_ROWS != reported[0]:
+                reported[0] = result.rows // PROGRESS_ROWS
+                self.stdout.write(f"{result.rows} rows read ({time.perf_counter() - started:.1f}s)")
+
+        try:
+            source = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+        with source, open(errors_path, 'w', encoding='utf-8') as errors:
+            result = import_rows(
+                options['resource'], source, import_format, errors,
+                chunk_size=options['chunk_size'], progress=progress,
+            )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.rows} rows in {elapsed:.1f}s ({result.rows / elapsed if elapsed else 0:.0f} rows/s): "
+            f"{result.created} created, {result.updated} updated, {result.rejected} rejected."
+        ))
+        if result.rejected:
+            self.stdout.write(self.style.WARNING(f"Rejected rows written to {errors_path}."))
+        else:
+            os.remove(errors_path)
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from crm.analytics import rebuild_order_stats
+from crm.counters import compute_totals, rebuild_counters, rebuild_order_activity
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the CRM report counters, the customers' order activity and "
+        "the daily order statistics from the tables and reports any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report drift; leave the stored counters unchanged.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        stale_customers = rebuild_order_activity(dry_run=dry_run)
+        if stale_customers:
+            self.stdout.write(self.style.WARNING(
+                f"order activity: {stale_customers} customer(s) out of sync"
+                + ("" if dry_run else ", rebuilt")
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("Customer order activity is in sync."))
+
+        stale_days = rebuild_order_stats(dry_run=dry_run)
+        if stale_days:
+            self.stdout.write(self.style.WARNING(
+                f"daily order stats: {stale_days} day(s) out of sync"
+                + ("" if dry_run else ", rebuilt")
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("Daily order stats are in sync."))
+
+        drift = rebuild_counters(dry_run=dry_run)
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Counters are in sync."))
+            return
+
+        actual = compute_totals()
+        for name, delta in drift.items():
+            self.stdout.write(self.style.WARNING(
+                f"{name}: stored {actual[name] + delta}, actual {actual[name]} (drift {delta:+})"
+            ))
+        if dry_run:
+            self.stdout.write("Dry run: counters left unchanged.")
+        else:
+            self.stdout.write(self.style.SUCCESS("Counters rebuilt."))
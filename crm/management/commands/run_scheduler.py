@@ -0,0 +1,66 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from crm.scheduler import (
+    DEFAULT_STATE_PATH, DEFAULT_WORKERS, Scheduler, SchedulerLock, configured_jobs,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the CRM_SCHEDULER_JOBS in one long-lived process, instead of a new "
+        "process per run from cron. Stops on SIGTERM or SIGINT after the running "
+        "jobs finish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'CRM_SCHEDULER_WORKERS', DEFAULT_WORKERS),
+            help="Jobs that may run at the same time (default: CRM_SCHEDULER_WORKERS).",
+        )
+        parser.add_argument(
+            '--state', default=getattr(settings, 'CRM_SCHEDULER_STATE', DEFAULT_STATE_PATH),
+            help="JSON file recording the runs of each job (default: CRM_SCHEDULER_STATE).",
+        )
+        parser.add_argument(
+            '--list', action='store_true',
+            help="Only print the jobs and their next run times.",
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1.")
+        try:
+            jobs = configured_jobs()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['list']:
+            now = timezone.now()
+            for job in jobs:
+                next_run = timezone.localtime(job.schedule.next_after(now))
+                self.stdout.write(f"{job.name:<28} {job.schedule.expression:<14} next {next_run.isoformat()}")
+            return
+
+        lock = SchedulerLock(options['state'])
+        if not lock.acquire():
+            raise CommandError(f"Another scheduler holds {lock.path}.")
+        try:
+            # Startup costs are paid once here instead of on every run: the job
+            # modules (with gql and the GraphQL client) and the graphene schema.
+            for job in jobs:
+                job.load()
+            from alx_backend_graphql.schema import schema
+            schema.graphql_schema
+
+            scheduler = Scheduler(jobs, workers=options['workers'], state_path=options['state'])
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *args: scheduler.stop())
+            self.stdout.write(f"Scheduler started with {len(jobs)} jobs and {options['workers']} workers.")
+            scheduler.run()
+            self.stdout.write("Scheduler stopped.")
+        finally:
+            lock.release()
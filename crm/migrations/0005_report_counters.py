@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:34
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def seed_report_counters(apps, schema_editor):
+    Customer = apps.get_model('crm', 'Customer')
+    Order = apps.get_model('crm', 'Order')
+    ReportCounters = apps.get_model('crm', 'ReportCounters')
+    ReportCounters.objects.update_or_create(pk=1, defaults={
+        'customer_count': Customer.objects.count(),
+        'order_count': Order.objects.count(),
+        'total_revenue': Order.objects.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_count', models.BigIntegerField(default=0)),
+                ('order_count', models.BigIntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_report_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:17
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_order_daily_stats(apps, schema_editor):
+    Order = apps.get_model('crm', 'Order')
+    OrderDailyStats = apps.get_model('crm', 'OrderDailyStats')
+    stats = {}
+    customer = last = None
+    orders = (
+        Order.objects.order_by('customer_id', 'order_date', 'pk')
+        .values_list('customer_id', 'order_date', 'total_amount')
+        .iterator(chunk_size=10_000)
+    )
+    for customer_pk, order_date, total_amount in orders:
+        day = timezone.localdate(order_date)
+        if customer_pk != customer:
+            customer, last = customer_pk, None
+        row = stats.setdefault(day, [0, Decimal('0.00'), 0, 0, 0])
+        row[0] += 1
+        row[1] += total_amount
+        row[2] += last != day
+        row[3] += last is None or last.isocalendar()[:2] != day.isocalendar()[:2]
+        row[4] += last is None or (last.year, last.month) != (day.year, day.month)
+        last = day
+    OrderDailyStats.objects.bulk_create([
+        OrderDailyStats(
+            date=day,
+            order_count=row[0],
+            revenue=row[1],
+            customer_count=row[2],
+            week_customer_count=row[3],
+            month_customer_count=row[4],
+        )
+        for day, row in sorted(stats.items())
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0007_customer_order_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('customer_count', models.PositiveIntegerField(default=0)),
+                ('week_customer_count', models.PositiveIntegerField(default=0)),
+                ('month_customer_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_order_daily_stats, migrations.RunPython.noop),
+    ]
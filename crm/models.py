@@ -5,6 +5,21 @@ class Customer(models.Model):
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True, blank=True)
+
+    # Order activity, maintained by the order writes (see crm/counters.py)
+    last_order_at = models.DateTimeField(blank=True, null=True)
+    order_count = models.PositiveIntegerField(default=0)
+    lifetime_value = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            # Sort key of the keyset-paginated allCustomers connection
+            models.Index(fields=['created_at', 'id'], name='crm_customer_created_id_idx'),
+            # Range filters and sorts on the order activity (inactive and top customers)
+            models.Index(fields=['last_order_at'], name='crm_customer_last_order_idx'),
+            models.Index(fields=['order_count'], name='crm_customer_order_count_idx'),
+            models.Index(fields=['lifetime_value'], name='crm_customer_ltv_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -20,9 +35,75 @@ class Product(models.Model):
 
 class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='orders')
-    products = models.ManyToManyField(Product, related_name='orders')
+    products = models.ManyToManyField(Product, related_name='orders', through='OrderItem')
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     order_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Sort key of the keyset-paginated allOrders connection
+            models.Index(fields=['order_date', 'id'], name='crm_order_date_id_idx'),
+        ]
     
     def __str__(self):
-        return f"Order {self.id} for {self.customer.name}"
\ No newline at end of file
+        return f"Order {self.id} for {self.customer.name}"
+
+class OrderItem(models.Model):
+    """
+    A product line of an order. Uses the table Django created for the former
+    auto-generated ``Order.products`` through model.
+    """
+    id = models.BigAutoField(primary_key=True)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='order_items')
+    quantity = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        db_table = 'crm_order_products'
+        unique_together = [('order', 'product')]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} in order {self.order_id}"
+
+class ReportCounters(models.Model):
+    """
+    Running CRM totals, adjusted in the same transaction as every customer and
+    order write (see crm/counters.py) so the report is a single-row read.
+    Deletes that bypass crm/counters.py leave it to reconcile_crm_counters.
+    """
+    customer_count = models.BigIntegerField(default=0)
+    order_count = models.BigIntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.customer_count} customers, {self.order_count} orders, {self.total_revenue} revenue"
+
+class OrderDailyStats(models.Model):
+    """
+    Orders, revenue and customers of one day, adjusted in the same transaction
+    as every order write (see crm/analytics.py) so order statistics read one
+    row per day instead of the orders.
+    """
+    date = models.DateField(unique=True)
+    order_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    customer_count = models.PositiveIntegerField(default=0)
+    # Customers whose first order of the ISO week, and of the month, was on this day
+    week_customer_count = models.PositiveIntegerField(default=0)
+    month_customer_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date}: {self.order_count} orders, {self.revenue} revenue"
+
+class ModelVersion(models.Model):
+    """
+    Version counter of one model for the GraphQL response cache (see
+    crm/response_cache.py), moved on after every committed write to it. Kept
+    in the database so every process sharing it sees the same versions.
+    """
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
@@ -0,0 +1,155 @@
+# alx-backend-graphql_crm/crm/optimizer.py
+"""
+Rewrites a connection queryset from the GraphQL selection set.
+
+Forward foreign keys that are selected are joined with ``select_related``,
+many-valued relations (M2M and reverse FKs) are fetched with a nested,
+optimized ``Prefetch``, and every model is projected with ``.only()`` down to
+the columns the client asked for. Primary and foreign key columns are always
+kept so relations and the request loaders never hit a deferred field.
+
+A model reached along several paths (e.g. a customer page whose orders select
+``customer { name }`` again, or two root fields of one operation) shares
+instances through prefetch caches and the request loaders, so each model is
+projected to the union of its columns across the whole operation.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode, get_named_type
+from graphql.execution.collect_fields import should_include_node
+
+# Connection plumbing that does not map to model fields.
+CONNECTION_FIELDS = {'edges', 'node'}
+
+
+def optimize_queryset(queryset, info, columns=()):
+    """
+    Returns ``queryset`` narrowed to the selection of the current connection
+    field. ``columns`` names extra fields of the root model to keep loaded.
+    """
+    selections = []
+    for field_node in info.field_nodes:
+        selections.extend(_node_selections(field_node.selection_set, info))
+    columns = defaultdict(set, {queryset.model: set(columns)})
+    _collect_operation_columns(info, columns)
+    return _optimize(queryset, selections, info, columns)
+
+
+def _collect_operation_columns(info, columns):
+    """Collects the columns selected per model by every root field of the operation."""
+    root_type = info.schema.get_root_type(info.operation.operation)
+    for field_node in _iter_fields(info.operation.selection_set, info):
+        field_def = root_type.fields.get(field_node.name.value)
+        model = _field_model(field_def) if field_def is not None else None
+        if model is not None:
+            nested = _node_selections(field_node.selection_set, info)
+            _collect_columns(model, nested, info, columns)
+
+
+def _field_model(field_def):
+    """The Django model behind a field returning a DjangoObjectType or its connection."""
+    graphene_type = getattr(get_named_type(field_def.type), 'graphene_type', None)
+    meta = getattr(graphene_type, '_meta', None)
+    node = getattr(meta, 'node', None)
+    if node is not None:
+        meta = node._meta
+    return getattr(meta, 'model', None)
+
+
+def _iter_fields(selection_set, info):
+    """Yields the field nodes of a selection set, expanding fragments and directives."""
+    if selection_set is None:
+        return
+    for selection in selection_set.selections:
+        if not should_include_node(info.variable_values, selection):
+            continue
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from _iter_fields(selection.selection_set, info)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = info.fragments.get(selection.name.value)
+            if fragment is not None:
+                yield from _iter_fields(fragment.selection_set, info)
+
+
+def _node_selections(selection_set, info):
+    """Unwraps ``edges { node { ... } }`` so callers see the node's own fields."""
+    fields = []
+    for field in _iter_fields(selection_set, info):
+        if field.name.value in CONNECTION_FIELDS:
+            fields.extend(_node_selections(field.selection_set, info))
+        else:
+            fields.append(field)
+    return fields
+
+
+def _related_fields(model, selections, info):
+    """Pairs each selection that maps to a model field with that field."""
+    for selection in selections:
+        try:
+            field = model._meta.get_field(to_snake_case(selection.name.value))
+        except FieldDoesNotExist:
+            continue
+        yield field, selection
+
+
+def _collect_columns(model, selections, info, columns):
+    for field, selection in _related_fields(model, selections, info):
+        if field.is_relation:
+            nested = _node_selections(selection.selection_set, info)
+            _collect_columns(field.related_model, nested, info, columns)
+        else:
+            columns[model].add(field.name)
+
+
+def _optimize(queryset, selections, info, columns):
+    only, select_related, prefetches = _plan(queryset.model, selections, info, columns)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset.only(*only)
+
+
+def _plan(model, selections, info, columns, prefix=''):
+    """
+    Collects the ``only()`` paths, ``select_related()`` paths and ``Prefetch``
+    objects for ``selections`` on ``model``, with lookups relative to ``prefix``.
+    """
+    only = {prefix + model._meta.pk.name}
+    only.update(
+        prefix + field.name
+        for field in model._meta.concrete_fields if field.is_relation
+    )
+    only.update(prefix + column for column in columns[model])
+    select_related = []
+    prefetches = []
+    nested_by_relation = {}
+
+    for field, selection in _related_fields(model, selections, info):
+        if field.is_relation:
+            nested_by_relation.setdefault(field, []).extend(
+                _node_selections(selection.selection_set, info)
+            )
+
+    for field, nested in nested_by_relation.items():
+        lookup = prefix + field.name
+        if field.concrete and (field.many_to_one or field.one_to_one):
+            nested_only, nested_select, nested_prefetches = _plan(
+                field.related_model, nested, info, columns, prefix=f'{lookup}__'
+            )
+            only.update(nested_only)
+            select_related.append(lookup)
+            select_related.extend(nested_select)
+            prefetches.extend(nested_prefetches)
+        else:
+            related_queryset = _optimize(
+                field.related_model._default_manager.order_by('pk'), nested, info, columns
+            )
+            prefetches.append(Prefetch(lookup, queryset=related_queryset))
+
+    return only, select_related, prefetches
@@ -0,0 +1,261 @@
+# alx-backend-graphql_crm/crm/orders.py
+"""
+Order placement with stock reservation.
+
+``place_order`` takes a fixed number of round trips whatever the size of the
+order: one fetch of the customer (which checks it exists and gives its last
+order date), one fetch of the product prices
+(which also validates the ids and gives the total), the order INSERT, one bulk
+INSERT of its items, and a single conditional UPDATE that reserves the stock
+of every product at once:
+
+    UPDATE crm_product SET stock = stock - CASE id WHEN ... END
+    WHERE id IN (...) AND stock >= CASE id WHEN ... END
+
+Orders never read stock and write it back, so concurrent orders for the same
+product cannot oversell it.
+
+``place_orders`` does the same for a batch: one query per model validates
+every customer and product id, stock is allotted to the orders in input
+order, and the accepted orders are written with one bulk INSERT per table and
+reserved with one conditional UPDATE. Should the stock have moved since it
+was read, the writes are rolled back to a savepoint and the batch allotted
+again.
+
+Both also adjust the report counters, add the new orders to the activity
+columns of their customers (see ``record_order_activity``) and to the daily
+order statistics (see ``record_order_stats``), in the same transaction. The
+customer rows are locked for update, so a customer's concurrent orders are
+counted in turn. All of these writes come before the stock update, which is
+the last statement of the transaction: the product row locks, which every
+order for the same products waits on, are held only until the commit right
+after it.
+"""
+from collections import Counter
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .analytics import record_order_stats
+from .counters import adjust_counters, record_order_activity
+from .models import Customer, Order, OrderDailyStats, OrderItem, Product
+from .response_cache import bump_model_versions
+
+
+class InsufficientStock(Exception):
+    """Raised inside a savepoint to undo a partial reservation, or the writes of a batch it failed."""
+
+
+def order_quantities(product_ids=None, items=None):
+    """
+    Returns ``{product_id: quantity}`` from the ``productIds`` (one of each,
+    as before quantities existed) and ``items`` inputs of an order. Quantities
+    of a repeated item add up.
+    """
+    quantities = {}
+    for product_id in product_ids or ():
+        quantities.setdefault(str(product_id), 1)
+    for item in items or ():
+        product_id, quantity = str(item.get('product_id')), item.get('quantity', 1)
+        if quantity is None or quantity < 1:
+            raise ValidationError(f"Quantity for product ID '{product_id}' must be at least 1.")
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def _pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _product_pks(quantities):
+    """Maps the product ids sent by the client to primary keys; unparseable ids are None."""
+    return {product_id: _pk(product_id) for product_id in quantities}
+
+
+def _per_product(quantities):
+    return Case(
+        *(When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()),
+        output_field=IntegerField(),
+    )
+
+
+def reserve_stock(quantities):
+    """
+    Takes ``{product_pk: quantity}`` off the stock in one conditional UPDATE.
+    Returns the pks without enough stock; nothing is reserved in that case.
+    """
+    needed = _per_product(quantities)
+    try:
+        with transaction.atomic():
+            reserved = (
+                Product.objects
+                .filter(pk__in=quantities, stock__gte=needed)
+                .update(stock=F('stock') - needed)
+            )
+            if reserved != len(quantities):
+                raise InsufficientStock()
+    except InsufficientStock:
+        stock = dict(Product.objects.filter(pk__in=quantities).values_list('pk', 'stock'))
+        return sorted(pk for pk, quantity in quantities.items() if stock.get(pk, 0) < quantity)
+    return []
+
+
+@transaction.atomic
+def place_order(customer_id, quantities):
+    """Creates an order for ``{product_id: quantity}`` and reserves its stock."""
+    if not quantities:
+        raise Exception("Validation Error: An order must contain at least one product.")
+
+    try:
+        customer = (
+            Customer.objects.select_for_update()
+            .filter(pk=customer_id)
+            .values_list('pk', 'last_order_at')
+            .first()
+        )
+    except (TypeError, ValueError):
+        customer = None
+    if customer is None:
+        raise Exception(f"Validation Error: Invalid customer ID '{customer_id}'.")
+
+    pks = _product_pks(quantities)
+    prices = dict(
+        Product.objects
+        .filter(pk__in=[pk for pk in pks.values() if pk is not None])
+        .values_list('pk', 'price')
+    )
+    invalid_ids = [str(product_id) for product_id, pk in pks.items() if pk not in prices]
+    if invalid_ids:
+        raise Exception(f"Validation Error: Invalid product ID(s) found: {', '.join(invalid_ids)}.")
+
+    quantities = {pks[product_id]: quantity for product_id, quantity in quantities.items()}
+    total_amount = sum(
+        (prices[pk] * quantity for pk, quantity in quantities.items()), Decimal('0.00')
+    )
+
+    order = Order.objects.create(customer_id=customer[0], total_amount=total_amount)
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product_id=pk, quantity=quantity)
+        for pk, quantity in sorted(quantities.items())
+    ])
+    adjust_counters(orders=1, revenue=total_amount)
+    record_order_activity([order])
+    record_order_stats([order], dict([customer]))
+
+    short = reserve_stock(quantities)
+    if short:
+        raise Exception(
+            f"Validation Error: Insufficient stock for product ID(s): {', '.join(map(str, short))}."
+        )
+    bump_model_versions(Customer, Order, OrderItem, Product, OrderDailyStats)
+    return order
+
+
+# Attempts to allot and reserve a batch when stock changes between the
+# product fetch and the reservation.
+RESERVATION_ATTEMPTS = 3
+
+
+def _allot_stock(candidates, stock):
+    """Splits ``(index, customer_pk, quantities)`` into those the stock covers, in order, and the rest."""
+    available = dict(stock)
+    accepted, short = [], []
+    for candidate in candidates:
+        quantities = candidate[2]
+        if all(available[pk] >= quantity for pk, quantity in quantities.items()):
+            for pk, quantity in quantities.items():
+                available[pk] -= quantity
+            accepted.append(candidate)
+        else:
+            short.append(candidate)
+    return accepted, short
+
+
+def _create_orders(accepted, products, last_order_dates):
+    """Writes the ``accepted`` orders, their items, counters, activity and statistics."""
+    orders = Order.objects.bulk_create([
+        Order(
+            customer_id=customer_pk,
+            total_amount=sum(
+                (products[pk][0] * quantity for pk, quantity in quantities.items()), Decimal('0.00')
+            ),
+        )
+        for _, customer_pk, quantities in accepted
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product_id=pk, quantity=quantity)
+        for order, (_, _, quantities) in zip(orders, accepted)
+        for pk, quantity in sorted(quantities.items())
+    ])
+    if orders:
+        adjust_counters(orders=len(orders), revenue=sum(order.total_amount for order in orders))
+        record_order_activity(orders)
+        record_order_stats(orders, last_order_dates)
+    return orders
+
+
+@transaction.atomic
+def place_orders(entries):
+    """
+    Creates the orders of ``[(customer_id, {product_id: quantity}), ...]``
+    that are valid and in stock. Returns the created orders and a list of
+    ``(index, message)`` for the entries that were not.
+    """
+    failures = []
+    customer_pks = {_pk(customer_id) for customer_id, _ in entries} - {None}
+    product_pks = {
+        pk for _, quantities in entries for pk in _product_pks(quantities).values()
+    } - {None}
+    last_order_dates = dict(
+        Customer.objects.select_for_update().filter(pk__in=customer_pks).values_list('pk', 'last_order_at')
+    )
+    products = {
+        pk: (price, stock)
+        for pk, price, stock in Product.objects.filter(pk__in=product_pks).values_list('pk', 'price', 'stock')
+    }
+
+    candidates = []
+    for index, (customer_id, quantities) in enumerate(entries):
+        if not quantities:
+            failures.append((index, "An order must contain at least one product."))
+            continue
+        customer_pk = _pk(customer_id)
+        if customer_pk not in last_order_dates:
+            failures.append((index, f"Invalid customer ID '{customer_id}'."))
+            continue
+        pks = _product_pks(quantities)
+        invalid_ids = [str(product_id) for product_id, pk in pks.items() if pk not in products]
+        if invalid_ids:
+            failures.append((index, f"Invalid product ID(s) found: {', '.join(invalid_ids)}."))
+            continue
+        candidates.append((
+            index, customer_pk, {pks[product_id]: quantity for product_id, quantity in quantities.items()}
+        ))
+
+    stock = {pk: product_stock for pk, (_, product_stock) in products.items()}
+    for _ in range(RESERVATION_ATTEMPTS):
+        accepted, short = _allot_stock(candidates, stock)
+        try:
+            with transaction.atomic():
+                orders = _create_orders(accepted, products, last_order_dates)
+                reserved = Counter()
+                for _, _, quantities in accepted:
+                    reserved.update(quantities)
+                if reserved and reserve_stock(dict(reserved)):
+                    raise InsufficientStock()
+            break
+        except InsufficientStock:
+            # Stock moved since it was read; allot again from the current values.
+            stock = dict(Product.objects.filter(pk__in=stock).values_list('pk', 'stock'))
+    else:
+        raise Exception("Validation Error: Stock changed while the batch was placed; retry the batch.")
+
+    failures.extend((index, "Insufficient stock for this order.") for index, _, _ in short)
+    if orders:
+        bump_model_versions(Customer, Order, OrderItem, Product, OrderDailyStats)
+    return orders, sorted(failures)
@@ -0,0 +1,92 @@
+# alx-backend-graphql_crm/crm/pagination.py
+"""
+Keyset (seek) pagination for the relay connections.
+
+Offset cursors turn deep pages into ``OFFSET n`` scans. A keyset cursor
+instead encodes the sort key of the last row seen (e.g. ``order_date, id``),
+and the next page is a range read on the matching composite index that costs
+the same for page N as for page 1.
+"""
+import json
+
+from django.db.models import Q
+from graphql_relay.utils import base64, unbase64
+
+KEYSET_CURSOR_PREFIX = 'keyset:'
+
+
+def _split(ordering):
+    """Turns ``('-order_date', 'id')`` into ``[('order_date', True), ('id', False)]``."""
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+def encode_cursor(node, ordering):
+    values = [getattr(node, name) for name, _ in _split(ordering)]
+    payload = json.dumps(
+        [value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values]
+    )
+    return base64(KEYSET_CURSOR_PREFIX + payload)
+
+
+def decode_cursor(cursor, model, ordering):
+    """Returns the sort key values of ``cursor`` converted to Python values."""
+    try:
+        payload = unbase64(cursor)
+        if not payload.startswith(KEYSET_CURSOR_PREFIX):
+            raise ValueError
+        values = json.loads(payload[len(KEYSET_CURSOR_PREFIX):])
+        fields = [model._meta.get_field(name) for name, _ in _split(ordering)]
+        if len(values) != len(fields):
+            raise ValueError
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except Exception:
+        raise Exception(f"Validation Error: Invalid keyset cursor '{cursor}'.")
+
+
+def seek_filter(ordering, values, forward=True):
+    """
+    Builds the lexicographic "rows after (or before) this key" condition as
+    ``k1 >= v1 AND (k1 > v1 OR <rest>)`` so the leading column stays an
+    index range.
+    """
+    (name, descending), *rest = _split(ordering)
+    value, *rest_values = values
+    op = 'gt' if forward != descending else 'lt'
+    strict = Q(**{f'{name}__{op}': value})
+    if not rest:
+        return strict
+    rest_ordering = [f'-{n}' if d else n for n, d in rest]
+    return Q(**{f'{name}__{op}e': value}) & (strict | seek_filter(rest_ordering, rest_values, forward))
+
+
+def keyset_page(queryset, ordering, first=None, last=None, after=None, before=None, max_limit=None):
+    """
+    Fetches one page of ``queryset`` by sort key. Returns the rows with their
+    ``has_previous_page`` and ``has_next_page`` flags; one extra row is read
+    to tell whether more rows exist in the paging direction.
+    """
+    model = queryset.model
+    queryset = queryset.order_by(*ordering)
+    if after:
+        queryset = queryset.filter(seek_filter(ordering, decode_cursor(after, model, ordering)))
+    if before:
+        queryset = queryset.filter(
+            seek_filter(ordering, decode_cursor(before, model, ordering), forward=False)
+        )
+
+    if last is not None and first is None:
+        rows = list(queryset.reverse()[:last + 1])
+        has_previous_page = len(rows) > last
+        return rows[:last][::-1], has_previous_page, bool(before)
+
+    limit = first if first is not None else max_limit
+    if limit is None:
+        rows = list(queryset)
+        has_next_page = False
+    else:
+        rows = list(queryset[:limit + 1])
+        has_next_page = len(rows) > limit
+        rows = rows[:limit]
+    if last is not None and len(rows) > last:
+        return rows[-last:], True, has_next_page
+    return rows, bool(after), has_next_page
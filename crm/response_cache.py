@@ -0,0 +1,329 @@
+# alx-backend-graphql_crm/crm/response_cache.py
+"""
+Response cache for read-only GraphQL operations.
+
+Responses are stored in the Django cache named by the GRAPHQL_RESPONSE_CACHE
+setting: local memory by default (LRU eviction plus a TTL), or any other
+cache backend, such as Redis, when responses must be shared between worker
+processes. A key is the hash of the normalized operation (the printed AST, so
+whitespace and comments do not matter), the operation name, the variables, and
+the current version of every model the operation can read.
+
+Each model has a version counter. Writers call ``bump_model_versions()`` and
+the versions move on when their transaction commits, so later lookups build
+new keys and stale responses are never read again; eviction and the TTL clean
+them up. Operations with a root field that is not backed by a model (cache
+stats, introspection) are never cached.
+
+The versions must be shared by every process that writes, or a restock by the
+scheduler or a cron job would never reach the web workers' responses. They
+live in the ModelVersion table by default, read with one indexed query per
+lookup, or in the cache named by GRAPHQL_RESPONSE_CACHE_VERSIONS when that
+cache is shared (Redis, Memcached). A system check refuses a per-process
+version cache while scheduled jobs are configured.
+"""
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from graphql import (
+    OperationType,
+    TypeInfo,
+    TypeInfoVisitor,
+    Visitor,
+    get_named_type,
+    is_abstract_type,
+    print_ast,
+    visit,
+)
+
+from .db import write_alias
+from .documents import LRUCache, query_hash
+from .models import ModelVersion
+from .threadpool import run_blocking
+
+DEFAULT_PLAN_CACHE_SIZE = 512
+VERSION_KEY_PREFIX = 'crm:graphql:version:'
+RESPONSE_KEY_PREFIX = 'crm:graphql:response:'
+
+
+def _type_models(schema, graphql_type):
+    """The Django models behind a type, its connection, or the implementations of an interface."""
+    named_type = get_named_type(graphql_type)
+    if is_abstract_type(named_type):
+        types = schema.get_possible_types(named_type)
+    else:
+        types = [named_type]
+
+    models = set()
+    for object_type in types:
+        meta = getattr(getattr(object_type, 'graphene_type', None), '_meta', None)
+        node = getattr(meta, 'node', None)
+        if node is not None:
+            meta = node._meta
+        model = getattr(meta, 'model', None)
+        if model is not None:
+            models.add(model)
+    return models
+
+
+class OperationPlan:
+    """What the response cache needs to know about one operation of a document."""
+
+    def __init__(self, schema, document, operation_ast):
+        self.normalized_hash = hashlib.sha256(print_ast(document).encode('utf-8')).hexdigest()
+        self.models = frozenset()
+        self.cacheable = False
+        if operation_ast is None or operation_ast.operation != OperationType.QUERY:
+            return
+
+        root_type = schema.query_type
+        root_models = []
+        for selection in operation_ast.selection_set.selections:
+            name = getattr(getattr(selection, 'name', None), 'value', None)
+            if name == '__typename':
+                continue
+            field = root_type.fields.get(name) if name else None
+            root_models.append(_type_models(schema, field.type) if field is not None else set())
+        if not root_models or not all(root_models):
+            return
+
+        type_info = TypeInfo(schema)
+        models = set()
+
+        class ModelCollector(Visitor):
+            def enter_field(self, node, *args):
+                field_type = type_info.get_type()
+                if field_type is not None:
+                    models.update(_type_models(schema, field_type))
+
+        visit(document, TypeInfoVisitor(type_info, ModelCollector()))
+        self.models = frozenset(models)
+        self.cacheable = True
+
+
+def version_key(model):
+    return VERSION_KEY_PREFIX + model._meta.label_lower
+
+
+class DatabaseVersions:
+    """Version counters in the ModelVersion table, shared by every process using the database."""
+
+    def get_many(self, models):
+        # Read from the primary: a lagging replica would return the versions
+        # from before a write and so hit the responses it made stale.
+        labels = {model._meta.label_lower: version_key(model) for model in models}
+        stored = dict(
+            ModelVersion.objects.using(write_alias())
+            .filter(label__in=labels)
+            .values_list('label', 'version')
+        )
+        return {key: stored.get(label, 0) for label, key in labels.items()}
+
+    async def aget_many(self, models):
+        return await run_blocking(self.get_many, models)
+
+    def bump(self, models):
+        labels = [model._meta.label_lower for model in models]
+        versions = ModelVersion.objects.using(write_alias()).filter(label__in=labels)
+        if versions.update(version=F('version') + 1) < len(labels):
+            # First write to a model: its row is created, then every row moves
+            # on again, which only skips versions of the others.
+            ModelVersion.objects.using(write_alias()).bulk_create(
+                [ModelVersion(label=label) for label in labels], ignore_conflicts=True
+            )
+            versions.update(version=F('version') + 1)
+
+
+class CacheVersions:
+    """Version counters in a Django cache, which must be shared by the writing processes."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_many(self, models):
+        version_keys = [version_key(model) for model in models]
+        versions = self.cache.get_many(version_keys)
+        # A version that was never set, or was evicted, restarts from the
+        # clock rather than 0, so it cannot match the key of a stale response.
+        for key in version_keys:
+            if key not in versions:
+                self.cache.add(key, time.time_ns(), timeout=None)
+                versions[key] = self.cache.get(key)
+        return versions
+
+    async def aget_many(self, models):
+        version_keys = [version_key(model) for model in models]
+        versions = await self.cache.aget_many(version_keys)
+        for key in version_keys:
+            if key not in versions:
+                await self.cache.aadd(key, time.time_ns(), timeout=None)
+                versions[key] = await self.cache.aget(key)
+        return versions
+
+    def bump(self, models):
+        for model in models:
+            key = version_key(model)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.add(key, time.time_ns(), timeout=None)
+
+
+def version_store(alias=None):
+    """The version store named by GRAPHQL_RESPONSE_CACHE_VERSIONS: a cache alias, or None for the database."""
+    return CacheVersions(alias) if alias else DatabaseVersions()
+
+
+class ResponseCache:
+    """Looks up and stores query results, keyed on the versions of the models they read."""
+
+    def __init__(self, alias, timeout=None, plan_cache_size=DEFAULT_PLAN_CACHE_SIZE, versions=None):
+        self.alias = alias
+        self.timeout = timeout
+        self.version_store = versions or DatabaseVersions()
+        self.plans = LRUCache(plan_cache_size)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return self.alias is not None
+
+    def plan(self, schema, query, document, operation_ast, operation_name):
+        key = (query_hash(query), operation_name)
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = OperationPlan(schema, document, operation_ast)
+            self.plans.set(key, plan)
+        return plan
+
+    version_key = staticmethod(version_key)
+
+    def response_key(self, plan, operation_name, variables, versions):
+        payload = json.dumps(
+            [plan.normalized_hash, operation_name, variables or {}, sorted(versions.items())],
+            sort_keys=True,
+            cls=DjangoJSONEncoder,
+        )
+        return RESPONSE_KEY_PREFIX + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def versions(self, models):
+        """The current version of each of ``models``, keyed by version key."""
+        return self.version_store.get_many(models)
+
+    async def aversions(self, models):
+        return await self.version_store.aget_many(models)
+
+    def lookup(self, plan, operation_name, variables):
+        """
+        Returns ``(key, data)`` for a cacheable plan, with ``data`` None on a
+        miss, or ``(None, None)`` when the operation must not be cached.
+        """
+        if not (self.enabled and plan.cacheable):
+            return None, None
+        versions = self.versions(plan.models)
+        key = self.response_key(plan, operation_name, variables, versions)
+        data = self.cache.get(key)
+        self._record(data is not None)
+        return key, data
+
+    async def alookup(self, plan, operation_name, variables):
+        if not (self.enabled and plan.cacheable):
+            return None, None
+        versions = await self.aversions(plan.models)
+        key = self.response_key(plan, operation_name, variables, versions)
+        data = await self.cache.aget(key)
+        self._record(data is not None)
+        return key, data
+
+    def store(self, key, data):
+        self.cache.set(key, data, timeout=self._timeout())
+
+    async def astore(self, key, data):
+        await self.cache.aset(key, data, timeout=self._timeout())
+
+    def _timeout(self):
+        # DEFAULT_TIMEOUT defers to the TIMEOUT of the cache alias.
+        return self.timeout if self.timeout is not None else DEFAULT_TIMEOUT
+
+    def bump(self, models):
+        self.version_store.bump(models)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': None,
+            'size': None,
+            'max_size': None,
+        }
+
+
+response_cache = ResponseCache(
+    getattr(settings, 'GRAPHQL_RESPONSE_CACHE', None),
+    timeout=getattr(settings, 'GRAPHQL_RESPONSE_CACHE_TIMEOUT', None),
+    versions=version_store(getattr(settings, 'GRAPHQL_RESPONSE_CACHE_VERSIONS', None)),
+)
+
+
+def bump_model_versions(*models):
+    """
+    Invalidates the cached responses that read any of ``models`` once the
+    current transaction commits (immediately outside a transaction).
+    """
+    if response_cache.enabled and models:
+        transaction.on_commit(lambda: response_cache.bump(models))
+
+
+# Cache backends whose entries live in, or are private to, one process.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_version_store(app_configs=None, **kwargs):
+    """
+    Errors when the response cache versions are kept per process while jobs
+    write from other processes (cron, ``run_scheduler``): their writes could
+    never invalidate the web workers' responses.
+    """
+    alias = getattr(settings, 'GRAPHQL_RESPONSE_CACHE_VERSIONS', None)
+    if not (getattr(settings, 'GRAPHQL_RESPONSE_CACHE', None) and alias):
+        return []
+    jobs = getattr(settings, 'CRM_SCHEDULER_JOBS', None) or getattr(settings, 'CRONJOBS', None)
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if jobs and backend in PROCESS_LOCAL_CACHES:
+        return [checks.Error(
+            f"GRAPHQL_RESPONSE_CACHE_VERSIONS names the process-local cache '{alias}' ({backend}), "
+            "but scheduled jobs write from other processes.",
+            hint="Leave GRAPHQL_RESPONSE_CACHE_VERSIONS unset to keep the versions in the database, "
+                 "or point it at a shared cache such as Redis.",
+            id='crm.E001',
+        )]
+    return []
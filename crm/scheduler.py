@@ -0,0 +1,243 @@
+# alx-backend-graphql_crm/crm/scheduler.py
+"""
+Resident scheduler for the periodic CRM jobs.
+
+Cron starts a new interpreter for every run of every job, which repeats
+``django.setup()``, the graphene schema construction and the first database
+connection each time. ``run_scheduler`` instead keeps one process with Django
+and the schema loaded, and runs the jobs of the CRM_SCHEDULER_JOBS setting
+(cron expression, dotted path of a callable) in a thread pool as they come
+due, in the local time of TIME_ZONE.
+
+A job that is still running when it comes due again is skipped rather than
+started twice, and one scheduler per state file is enforced with a lock, so
+runs never overlap. Runs missed while the scheduler was down are not caught
+up, as with cron. Every run is logged with its duration on the
+``crm.scheduler`` logger and recorded, with per-job totals, in the
+CRM_SCHEDULER_STATE JSON file.
+"""
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('crm.scheduler')
+
+DEFAULT_WORKERS = 4
+DEFAULT_STATE_PATH = '/tmp/crm_scheduler_state.json'
+# Longest sleep between checks, so clock changes are noticed.
+MAX_SLEEP_SECONDS = 60
+
+# (name, first value, last value) of the five cron fields
+CRON_FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day of month', 1, 31),
+    ('month', 1, 12),
+    ('day of week', 0, 7),
+)
+
+
+def _parse_field(text, name, low, high):
+    values = set()
+    for part in text.split(','):
+        body, _, step = part.partition('/')
+        try:
+            if body == '*':
+                start, end = low, high
+            elif '-' in body:
+                start, end = (int(value) for value in body.split('-', 1))
+            else:
+                start = end = int(body)
+                if step:
+                    end = high
+            step = int(step) if step else 1
+        except ValueError:
+            raise ValueError(f"Invalid {name} field '{text}'.")
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"Invalid {name} field '{text}'.")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """A five-field cron expression (``*``, lists, ranges and steps), in local time."""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != len(CRON_FIELDS):
+            raise ValueError(f"Cron expression '{expression}' must have five fields.")
+        try:
+            parsed = [
+                _parse_field(text, name, low, high) for text, (name, low, high) in zip(fields, CRON_FIELDS)
+            ]
+        except ValueError as e:
+            raise ValueError(f"Cron expression '{expression}': {e}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # Sunday is 0 or 7 in cron; Python's weekday() counts from Monday = 0.
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        # As in cron, when both day fields are restricted a day matching either
+        # runs; a field starting with '*' (such as '*/2') does not restrict.
+        self.any_day = not fields[2].startswith('*') and not fields[4].startswith('*')
+
+    def _day_matches(self, moment):
+        day, weekday = moment.day in self.days, moment.weekday() in self.weekdays
+        return day or weekday if self.any_day else day and weekday
+
+    def next_after(self, moment):
+        """The first matching minute after the aware datetime ``moment``."""
+        moment = timezone.localtime(moment).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        # Scans at most a few years of days for schedules such as February 29.
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months or not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return timezone.make_aware(moment)
+        raise ValueError(f"Cron expression '{self.expression}' never matches.")
+
+
+class Job:
+    def __init__(self, expression, path, name=None):
+        self.schedule = CronSchedule(expression)
+        self.path = path
+        self.name = name or path.rsplit('.', 1)[-1]
+        self.function = None
+        self.next_run = None
+        self.future = None
+
+    def load(self):
+        """Imports the job's callable, and with it its modules, once at startup."""
+        self.function = import_string(self.path)
+
+    @property
+    def running(self):
+        return self.future is not None and not self.future.done()
+
+
+def configured_jobs():
+    return [Job(*entry) for entry in getattr(settings, 'CRM_SCHEDULER_JOBS', settings.CRONJOBS)]
+
+
+class Scheduler:
+    def __init__(self, jobs, workers=DEFAULT_WORKERS, state_path=DEFAULT_STATE_PATH):
+        self.jobs = jobs
+        self.workers = workers
+        self.state_path = state_path
+        self.stop_event = threading.Event()
+        self._state_lock = threading.Lock()
+        self.state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        # Written to a temporary file and renamed so a crash never leaves a torn file.
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def record(self, job, started_at, duration, error):
+        status = 'failed' if error else 'ok'
+        with self._state_lock:
+            totals = self.state.setdefault(job.name, {'runs': 0, 'failures': 0, 'total_seconds': 0.0})
+            totals['runs'] += 1
+            totals['failures'] += bool(error)
+            totals['total_seconds'] += duration
+            totals.update(
+                last_started_at=started_at.isoformat(),
+                last_duration_seconds=round(duration, 3),
+                last_status=status,
+                last_error=error,
+            )
+            self._save_state()
+        log = logger.error if error else logger.info
+        log("job=%s status=%s duration_ms=%.1f", job.name, status, duration * 1000,
+            extra={'job': job.name, 'duration': duration, 'error': error})
+
+    def run_job(self, job):
+        close_old_connections()
+        started_at, started = timezone.now(), time.perf_counter()
+        error = None
+        try:
+            job.function()
+        except SystemExit as e:
+            # The jobs written for cron exit non-zero on failure.
+            if e.code not in (None, 0):
+                error = f"exited with status {e.code}"
+        except Exception as e:
+            logger.exception("job=%s raised", job.name)
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            close_old_connections()
+        self.record(job, started_at, time.perf_counter() - started, error)
+
+    def submit(self, executor, job):
+        if job.running:
+            logger.warning("job=%s status=skipped reason=still running", job.name)
+            return
+        job.future = executor.submit(self.run_job, job)
+
+    def due_jobs(self, now):
+        return [job for job in self.jobs if job.next_run <= now]
+
+    def run(self):
+        """Runs the jobs as they come due until ``stop()``, then waits for the running ones."""
+        now = timezone.now()
+        for job in self.jobs:
+            job.next_run = job.schedule.next_after(now)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='crm-job') as executor:
+            while not self.stop_event.is_set():
+                now = timezone.now()
+                for job in self.due_jobs(now):
+                    self.submit(executor, job)
+                    job.next_run = job.schedule.next_after(max(job.next_run, now))
+                delay = (min(job.next_run for job in self.jobs) - timezone.now()).total_seconds()
+                self.stop_event.wait(min(max(delay, 0), MAX_SLEEP_SECONDS))
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class SchedulerLock:
+    """Exclusive lock next to the state file; held while a scheduler runs."""
+
+    def __init__(self, state_path):
+        self.path = state_path + '.lock'
+        self.file = None
+
+    def acquire(self):
+        self.file = open(self.path, 'w')
+        try:
+            fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self.file.close()
+            self.file = None
+            return False
+        self.file.write(str(os.getpid()))
+        self.file.flush()
+        return True
+
+    def release(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -1,20 +1,25 @@
 # alx-backend-graphql_crm/crm/schema.py
-import re
 import graphene
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.db.models import Sum
-from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from django.db.models import Sum, F
 from crm.models import Product
 
 from graphene_django.types import DjangoObjectType
-from graphene_django.filter import DjangoFilterConnectionField
 
-from .models import Customer, Product, Order
+from .models import Customer, Product, Order, OrderDailyStats, OrderItem
+from .analytics import order_stats
+from .counters import adjust_counters
+from .documents import document_cache, persisted_queries
+from .fields import OptimizedFilterConnectionField
 from .filters import CustomerFilter, ProductFilter, OrderFilter
+from .loaders import BatchedConnection, get_loaders
+from .orders import order_quantities, place_order, place_orders
+from .response_cache import bump_model_versions, response_cache
+from .validators import validate_email, validate_phone
 
 # --- TYPES & CONNECTIONS ---
 
@@ -23,10 +28,17 @@ class CustomerType(DjangoObjectType):
     
     class Meta:
         model = Customer
-        fields = ('id', 'name', 'email', 'phone', 'created_at', 'orders') 
+        fields = (
+            'id', 'name', 'email', 'phone', 'created_at', 'orders',
+            'last_order_at', 'order_count', 'lifetime_value',
+        )
         interfaces = (graphene.Node,)
+        connection_class = BatchedConnection
         filter_fields = ()
 
+    def resolve_orders(self, info, **kwargs):
+        return get_loaders(info.context).customer_orders.load(self.pk)
+
 class CustomerConnection(graphene.relay.Connection):
     class Meta:
         node = CustomerType
@@ -36,43 +48,90 @@ class ProductType(DjangoObjectType):
         model = Product
         fields = ('id', 'name', 'price', 'stock')
         interfaces = (graphene.Node,)
+        connection_class = BatchedConnection
         filter_fields = ()
 
 class ProductConnection(graphene.relay.Connection):
     class Meta:
         node = ProductType
 
+class OrderItemType(DjangoObjectType):
+    product = graphene.Field(ProductType)
+
+    class Meta:
+        model = OrderItem
+        fields = ('product', 'quantity')
+
 class OrderType(DjangoObjectType):
+    items = graphene.List(OrderItemType)
+
     class Meta:
         model = Order
-        fields = ('id', 'customer', 'products', 'total_amount', 'order_date')
+        fields = ('id', 'customer', 'products', 'items', 'total_amount', 'order_date')
         interfaces = (graphene.Node,) # <--- FIX 1: Use graphene.Node directly
+        connection_class = BatchedConnection
         filter_fields = ()
 
+    def resolve_customer(self, info):
+        return get_loaders(info.context).customer.load(self.customer_id)
+
+    def resolve_products(self, info, **kwargs):
+        return get_loaders(info.context).order_products.load(self.pk)
+
+    def resolve_items(self, info):
+        return get_loaders(info.context).order_items.load(self.pk)
+
 class OrderConnection(graphene.relay.Connection):
     class Meta:
         node = OrderType
 
+class StatsPeriod(graphene.Enum):
+    DAY = 'day'
+    WEEK = 'week'
+    MONTH = 'month'
+
+class OrderStatsType(DjangoObjectType):
+    """Orders, revenue and distinct customers of one day, ISO week or month."""
+    period = graphene.Date(required=True, description="First day of the bucket.")
+
+    class Meta:
+        model = OrderDailyStats
+        fields = ('order_count', 'revenue', 'customer_count')
+
+    def resolve_period(self, info):
+        return self.date
+
+class CacheStatsType(graphene.ObjectType):
+    """Hit/miss counters of a server-side cache, for sizing it."""
+    hits = graphene.Int()
+    misses = graphene.Int()
+    evictions = graphene.Int()
+    size = graphene.Int()
+    max_size = graphene.Int()
+
 # --- QUERY (CRM-specific) ---
 
 class Query(graphene.ObjectType):
     """Defines all CRM-specific root query fields, using connections for filtering/ordering."""
     
-    all_customers = DjangoFilterConnectionField(
+    all_customers = OptimizedFilterConnectionField(
         CustomerType,
         filterset_class=CustomerFilter,
+        keyset_ordering=('created_at', 'id'),
         description="List of customers with filtering options."
     )
 
-    all_products = DjangoFilterConnectionField(
+    all_products = OptimizedFilterConnectionField(
         ProductType,
         filterset_class=ProductFilter,
+        keyset_ordering=('id',),
         description="List of products with filtering options."
     )
 
-    all_orders = DjangoFilterConnectionField(
+    all_orders = OptimizedFilterConnectionField(
         OrderType,
         filterset_class=OrderFilter,
+        keyset_ordering=('order_date', 'id'),
         description="List of orders with filtering options."
     )
     
@@ -82,6 +141,35 @@ class Query(graphene.ObjectType):
     # Single object query
     customer = graphene.Field(CustomerType, id=graphene.ID())
 
+    # Order analytics, from the daily rollup
+    order_stats = graphene.List(
+        graphene.NonNull(OrderStatsType),
+        required=True,
+        group_by=StatsPeriod(required=True),
+        start=graphene.Date(
+            name='from', description="Moved back to the start of its bucket; defaults to a year before 'to'."
+        ),
+        end=graphene.Date(name='to', description="Last day included; defaults to today."),
+        customer_id=graphene.ID(),
+        description="Order count, revenue and distinct customers per day, week or month with orders.",
+    )
+
+    # Parsed-document, persisted-query and response cache counters
+    document_cache_stats = graphene.Field(CacheStatsType)
+    persisted_query_stats = graphene.Field(CacheStatsType)
+    response_cache_stats = graphene.Field(CacheStatsType)
+
+    def resolve_document_cache_stats(root, info):
+        return CacheStatsType(**document_cache.stats())
+
+    def resolve_persisted_query_stats(root, info):
+        return CacheStatsType(**persisted_queries.stats())
+
+    def resolve_response_cache_stats(root, info):
+        return CacheStatsType(**response_cache.stats())
+
+    def resolve_order_stats(root, info, group_by, start=None, end=None, customer_id=None):
+        return order_stats(getattr(group_by, 'value', group_by), start, end, customer_id)
 
     def resolve_customer(root, info, id):
         try:
@@ -89,23 +177,21 @@ class Query(graphene.ObjectType):
         except Customer.DoesNotExist:
             return None
 
-# --- UTILITY VALIDATION ---
-
-def validate_phone(phone):
-    """Validates phone number format."""
-    phone_regex = re.compile(r'^\+?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}$')
-    if phone and not phone_regex.match(phone):
-        raise ValidationError("Invalid phone number format. Please use a valid format (e.g., +1234567890 or 123-456-7890).")
-
 
 class BulkCustomerInput(graphene.InputObjectType):
     name = graphene.String(required=True)
     email = graphene.String(required=True)
     phone = graphene.String(required=False)
 
+class OrderItemInput(graphene.InputObjectType):
+    product_id = graphene.ID(required=True)
+    quantity = graphene.Int(default_value=1)
+
 class OrderInput(graphene.InputObjectType):
     customer_id = graphene.ID(required=True)
-    product_ids = graphene.List(graphene.ID, required=True)
+    # One of each product; use ``items`` to order quantities.
+    product_ids = graphene.List(graphene.ID)
+    items = graphene.List(OrderItemInput)
 
 
 # 1. CreateCustomer
@@ -119,6 +205,7 @@ class CreateCustomer(graphene.Mutation):
     message = graphene.String()
 
     @classmethod
+    @transaction.atomic
     def mutate(cls, root, info, name, email, phone=None):
         try:
             validate_email(email)
@@ -136,6 +223,8 @@ class CreateCustomer(graphene.Mutation):
             phone=phone
         )
         customer.save()
+        adjust_counters(customers=1)
+        bump_model_versions(Customer)
         
         return CreateCustomer(customer=customer, message="Customer created successfully.")
 
@@ -147,12 +236,19 @@ class BulkCreateCustomers(graphene.Mutation):
     customers = graphene.List(CustomerType)
     errors = graphene.List(graphene.String)
 
+    # Rows per INSERT and emails per IN (...) lookup; stays under SQLite's
+    # bound-parameter limit.
+    BATCH_SIZE = 500
+
     @classmethod
     @transaction.atomic
     def mutate(cls, root, info, input):
-        successful_customers = []
         validation_errors = []
-        emails_in_batch = set(Customer.objects.values_list('email', flat=True))
+        existing_emails = cls.existing_emails(
+            [customer_data.get('email') for customer_data in input]
+        )
+        emails_in_batch = set()
+        pending = []
 
         for i, customer_data in enumerate(input):
             email = customer_data.get('email')
@@ -161,37 +257,73 @@ class BulkCreateCustomers(graphene.Mutation):
             try:
                 validate_email(email)
 
+                if email in existing_emails:
+                    raise ValidationError("Email already exists in database.")
                 if email in emails_in_batch:
-                    db_exists = Customer.objects.filter(email=email).exists()
-                    error_msg = "Email already exists in database." if db_exists else "Duplicate email in current batch."
-                    raise ValidationError(error_msg)
+                    raise ValidationError("Duplicate email in current batch.")
 
                 if phone:
                     validate_phone(phone)
-                
+
                 emails_in_batch.add(email)
 
-                customer = Customer(
+                pending.append((i, Customer(
                     name=customer_data.get('name'),
                     email=email,
                     phone=phone if phone else None
-                )
-                customer.save()
-                successful_customers.append(customer)
+                )))
 
             except ValidationError as e:
                 error_message = f"Record {i} (Email: {email}) failed validation: {e.message}"
                 validation_errors.append(error_message)
 
-            except Exception as e:
-                error_message = f"Record {i} (Email: {email}) failed creation: {str(e)}"
-                validation_errors.append(error_message)
+        successful_customers = []
+        for start in range(0, len(pending), cls.BATCH_SIZE):
+            chunk = pending[start:start + cls.BATCH_SIZE]
+            try:
+                with transaction.atomic():
+                    Customer.objects.bulk_create([customer for _, customer in chunk])
+                successful_customers.extend(customer for _, customer in chunk)
+            except Exception:
+                # Retry the failed chunk row by row to report which records failed.
+                successful_customers.extend(cls.save_individually(chunk, validation_errors))
+
+        adjust_counters(customers=len(successful_customers))
+        if successful_customers:
+            bump_model_versions(Customer)
 
         return BulkCreateCustomers(
             customers=successful_customers,
             errors=validation_errors
         )
 
+    @classmethod
+    def existing_emails(cls, emails):
+        """Returns which of ``emails`` already exist, one IN query per BATCH_SIZE emails."""
+        emails = list({email for email in emails if email})
+        existing = set()
+        for start in range(0, len(emails), cls.BATCH_SIZE):
+            existing.update(
+                Customer.objects
+                .filter(email__in=emails[start:start + cls.BATCH_SIZE])
+                .values_list('email', flat=True)
+            )
+        return existing
+
+    @staticmethod
+    def save_individually(chunk, validation_errors):
+        saved = []
+        for i, customer in chunk:
+            try:
+                with transaction.atomic():
+                    customer.pk = None
+                    customer.save()
+                saved.append(customer)
+            except Exception as e:
+                error_message = f"Record {i} (Email: {customer.email}) failed creation: {str(e)}"
+                validation_errors.append(error_message)
+        return saved
+
 
 # 3. CreateProduct
 class CreateProduct(graphene.Mutation):
@@ -203,6 +335,7 @@ class CreateProduct(graphene.Mutation):
     product = graphene.Field(ProductType)
 
     @classmethod
+    @transaction.atomic
     def mutate(cls, root, info, name, price, stock=0):
 
         price_decimal = Decimal(str(price))
@@ -218,6 +351,7 @@ class CreateProduct(graphene.Mutation):
             stock=stock
         )
         product.save()
+        bump_model_versions(Product)
         
         return CreateProduct(product=product)
 
@@ -229,39 +363,53 @@ class CreateOrder(graphene.Mutation):
     order = graphene.Field(OrderType)
 
     @classmethod
-    @transaction.atomic
     def mutate(cls, root, info, input):
-        customer_id = input.get('customer_id')
-        product_ids = input.get('product_ids')
-
-        if not product_ids:
-            raise Exception("Validation Error: An order must contain at least one product.")
-
         try:
-            customer = Customer.objects.get(pk=customer_id)
-        except Customer.DoesNotExist:
-            raise Exception(f"Validation Error: Invalid customer ID '{customer_id}'.")
+            quantities = order_quantities(input.get('product_ids'), input.get('items'))
+        except ValidationError as e:
+            raise Exception(f"Validation Error: {e.message}")
+        order = place_order(input.get('customer_id'), quantities)
 
-        unique_product_ids = set(product_ids)
-        products = Product.objects.filter(pk__in=unique_product_ids)
+        return CreateOrder(order=order)
+    
 
-        if products.count() != len(unique_product_ids):
-            valid_pks = set(str(p.pk) for p in products)
-            invalid_ids = [pid for pid in unique_product_ids if pid not in valid_pks]
-            raise Exception(f"Validation Error: Invalid product ID(s) found: {', '.join(invalid_ids)}.")
+# 5. BulkCreateOrders
+class BulkCreateOrders(graphene.Mutation):
+    class Arguments:
+        input = graphene.List(OrderInput, required=True)
 
-        total_amount = products.aggregate(Sum('price'))['price__sum']
+    orders = graphene.List(OrderType)
+    errors = graphene.List(graphene.String)
 
-        order = Order(
-            customer=customer,
-            total_amount=total_amount
-        )
-        order.save()
+    @classmethod
+    def mutate(cls, root, info, input):
+        failures = []
+        records = []
+        entries = []
 
-        order.products.set(products)
+        for i, order_data in enumerate(input):
+            try:
+                quantities = order_quantities(order_data.get('product_ids'), order_data.get('items'))
+            except ValidationError as e:
+                failures.append((i, e.message))
+                continue
+            records.append(i)
+            entries.append((order_data.get('customer_id'), quantities))
+
+        orders, placement_failures = place_orders(entries)
+        # Relations of the created orders are fetched in one batch each.
+        get_loaders(info.context).queue_nodes(orders)
+        failures.extend((records[position], message) for position, message in placement_failures)
+
+        validation_errors = [
+            f"Record {i} (Customer: {input[i].get('customer_id')}) failed validation: {message}"
+            for i, message in sorted(failures)
+        ]
+        return BulkCreateOrders(
+            orders=orders,
+            errors=validation_errors
+        )
 
-        return CreateOrder(order=order)
-    
 
 class UpdatedProductType(DjangoObjectType):
     """A minimal type for returning updated products."""
@@ -269,6 +417,7 @@ class UpdatedProductType(DjangoObjectType):
         model = Product
         fields = ('id', 'name', 'stock')
         interfaces = (graphene.Node,)
+        connection_class = BatchedConnection
         filter_fields = ()
 
 class UpdateLowStockProducts(graphene.Mutation):
@@ -285,7 +434,10 @@ class UpdateLowStockProducts(graphene.Mutation):
         RESTOCK_AMOUNT = 10
 
 
-        low_stock_products_ids = Product.objects.filter(stock__lt=LOW_STOCK_THRESHOLD).values_list('id', flat=True)
+        # Evaluated now: after the update these products no longer match the filter.
+        low_stock_products_ids = list(
+            Product.objects.filter(stock__lt=LOW_STOCK_THRESHOLD).values_list('id', flat=True)
+        )
 
         if not low_stock_products_ids:
             return UpdateLowStockProducts(
@@ -295,8 +447,9 @@ class UpdateLowStockProducts(graphene.Mutation):
 
 
         Product.objects.filter(id__in=low_stock_products_ids).update(stock=F('stock') + RESTOCK_AMOUNT)
+        bump_model_versions(Product)
 
-        updated_products = Product.objects.filter(id__in=low_stock_products_ids)
+        updated_products = list(Product.objects.filter(id__in=low_stock_products_ids))
         product_names = ', '.join([p.name for p in updated_products])
 
         return UpdateLowStockProducts(
@@ -312,4 +465,5 @@ class Mutation(graphene.ObjectType):
     bulk_create_customers = BulkCreateCustomers.Field()
     create_product = CreateProduct.Field()
     create_order = CreateOrder.Field()
+    bulk_create_orders = BulkCreateOrders.Field()
     update_low_stock_products = UpdateLowStockProducts.Field()
\ No newline at end of file
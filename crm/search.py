@@ -0,0 +1,162 @@
+# alx-backend-graphql_crm/crm/search.py
+"""
+Trigram search index behind the ``icontains`` filters.
+
+On SQLite, each searchable model gets an external-content FTS5 table using the
+``trigram`` tokenizer. Triggers on the model table keep it in sync on every
+insert, update and delete, including ``bulk_create``, ``update()`` and raw
+SQL. A ``LIKE '%value%'`` against that table is answered from the trigram
+index and gives exactly the rows a ``LIKE`` scan of the model table would.
+
+The index cannot help values shorter than three characters, or values that
+hold LIKE wildcards (FTS5 skips the index when an ``ESCAPE`` clause is needed).
+Those values, and other database backends, fall back to the plain
+``icontains`` lookup.
+
+Bulk inserts of many rows can ``defer_search_index`` instead: the insert
+trigger is dropped for the write, in its transaction, and the new rows indexed
+afterwards with one set-based statement, for about half the cost.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.db.utils import OperationalError
+
+from .models import Customer, Product
+
+MIN_INDEXED_LENGTH = 3
+# Ids per IN (...) list of ``defer_search_index``; stays under SQLite's
+# bound-parameter limit.
+KEY_BATCH_SIZE = 900
+LIKE_SPECIAL_CHARACTERS = ('%', '_', '\\')
+
+# (model, field names) -> FTS5 table
+SEARCH_INDEXES = {
+    Customer: ('crm_customer_search', ('name', 'email')),
+    Product: ('crm_product_search', ('name',)),
+}
+
+_installed = {}
+
+
+def _index_sql(model, table, columns):
+    source = model._meta.db_table
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+        f"{column_list}, content='{source}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {column_list} ON {source} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def install_search_indexes(using=connection):
+    """
+    Creates the FTS5 tables and their sync triggers where missing. Migrations
+    that rebuild a model table drop its triggers, so whenever a trigger had to
+    be (re)created the index is rebuilt from the model table.
+    """
+    if using.vendor != 'sqlite':
+        return
+    with using.cursor() as cursor:
+        for model, (table, columns) in SEARCH_INDEXES.items():
+            complete = _triggers_installed(cursor, table)
+            try:
+                for statement in _index_sql(model, table, columns):
+                    cursor.execute(statement)
+            except OperationalError:
+                # SQLite built without FTS5: the filters keep scanning.
+                return
+            if not complete:
+                cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+    _installed.pop(using.alias, None)
+
+
+def _triggers_installed(cursor, table):
+    cursor.execute(
+        "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s", [f'{table}_a_']
+    )
+    return cursor.fetchone()[0] == 3
+
+
+@contextmanager
+def defer_search_index(model, inserted_pks=(), using=connection):
+    """
+    Indexes the rows a bulk write, run in the block, inserts into ``model``
+    with one set-based statement instead of the per-row insert trigger.
+    ``inserted_pks`` are the explicit ids it inserts; rows given their id by
+    the table follow the largest id already there. Updates still go through
+    their trigger, so bulk updates should skip unchanged rows. Must be used
+    inside a transaction, so that other connections never see the table
+    without its trigger.
+    """
+    index = SEARCH_INDEXES.get(model)
+    if index is None or using.vendor != 'sqlite' or not using.in_atomic_block:
+        yield
+        return
+    table, columns = index
+    with using.cursor() as cursor:
+        if not _triggers_installed(cursor, table):
+            # No index, or one that install_search_indexes will rebuild.
+            yield
+            return
+        source = model._meta.db_table
+        column_list = ', '.join(columns)
+        cursor.execute(f"SELECT coalesce(max(id), 0) FROM {source}")
+        last_pk = cursor.fetchone()[0]
+        cursor.execute(f"DROP TRIGGER {table}_ai")
+        yield
+        indexed = f"INSERT INTO {table}(rowid, {column_list}) SELECT id, {column_list} FROM {source} WHERE id"
+        cursor.execute(f"{indexed} > %s", [last_pk])
+        inserted_pks = [pk for pk in inserted_pks if pk <= last_pk]
+        for start in range(0, len(inserted_pks), KEY_BATCH_SIZE):
+            batch = inserted_pks[start:start + KEY_BATCH_SIZE]
+            cursor.execute(f"{indexed} IN ({', '.join(['%s'] * len(batch))})", batch)
+        cursor.execute(_index_sql(model, table, columns)[1])
+
+
+def search_index_available(using=connection):
+    if using.vendor != 'sqlite':
+        return False
+    if using.alias not in _installed:
+        with using.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN (%s, %s)",
+                [table for table, _ in SEARCH_INDEXES.values()],
+            )
+            _installed[using.alias] = cursor.fetchone()[0] == len(SEARCH_INDEXES)
+    return _installed[using.alias]
+
+
+def contains_lookup(model, field_path, value):
+    """
+    Returns filter kwargs that match ``field_path`` containing ``value``
+    through the search index, or None when the index cannot answer it.
+    """
+    *relations, field_name = field_path.split('__')
+    target = model
+    for relation in relations:
+        target = target._meta.get_field(relation).related_model
+
+    index = SEARCH_INDEXES.get(target)
+    if (
+        index is None
+        or field_name not in index[1]
+        or len(value) < MIN_INDEXED_LENGTH
+        or any(char in value for char in LIKE_SPECIAL_CHARACTERS)
+        or not search_index_available()
+    ):
+        return None
+
+    table = index[0]
+    matching_ids = RawSQL(f"SELECT rowid FROM {table} WHERE {field_name} LIKE %s", [f'%{value}%'])
+    prefix = ''.join(f'{relation}__' for relation in relations)
+    return {f'{prefix}pk__in': matching_ids}
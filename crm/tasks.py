@@ -1,33 +1,28 @@
 import sys
 from celery import shared_task
 from django.utils import timezone
-from gql import Client, gql
-from gql.transport.requests import RequestsHTTPTransport
 from decimal import Decimal
 from datetime import datetime
-import requests
 
 GRAPHQL_ENDPOINT = "http://localhost:8000/graphql"
 
 @shared_task
 def generate_crm_report():
     """
-    Celery task that queries the GraphQL endpoint to fetch CRM totals 
+    Celery task that reads the incrementally maintained CRM totals
     and logs a summary report weekly.
     """
 
     
     try:
 
-        from crm.models import Customer, Order
-        from django.db.models import Sum
+        from crm.counters import get_counters
 
 
-        total_customers = Customer.objects.count()
-        total_orders = Order.objects.count()
-        
-        revenue_aggregation = Order.objects.aggregate(Sum('total_amount'))
-        total_revenue_decimal = revenue_aggregation['total_amount__sum'] or Decimal('0.00')
+        counters = get_counters()
+        total_customers = counters.customer_count
+        total_orders = counters.order_count
+        total_revenue_decimal = counters.total_revenue or Decimal('0.00')
         
         total_revenue = f"{total_revenue_decimal:.2f}"
         
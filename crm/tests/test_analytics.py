@@ -0,0 +1,86 @@
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from crm.analytics import order_stats, period_start, rebuild_order_stats
+from crm.counters import delete_orders
+from crm.models import Customer, Order, OrderDailyStats, Product
+from crm.orders import place_order
+
+START, END = date(2025, 12, 1), date(2026, 3, 31)
+
+
+def create_order(customer, day, amount='10.00'):
+    order = Order.objects.create(customer=customer, total_amount=Decimal(amount))
+    order_date = timezone.make_aware(datetime.combine(day, time(12)))
+    Order.objects.filter(pk=order.pk).update(order_date=order_date)
+    return order
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class OrderStatsTests(TestCase):
+    """The rollup's distinct customers per day, week and month equal those of the orders."""
+
+    def setUp(self):
+        caches['graphql'].clear()
+        self.ada, self.bob, self.cy = (
+            Customer.objects.create(name=name, email=f"{name.lower()}@example.com")
+            for name in ("Ada", "Bob", "Cy")
+        )
+
+    def expected(self, group_by):
+        customers = defaultdict(set)
+        for customer_pk, order_date in Order.objects.values_list('customer_id', 'order_date'):
+            customers[period_start(timezone.localdate(order_date), group_by)].add(customer_pk)
+        return {day: len(pks) for day, pks in customers.items()}
+
+    def assertStatsMatchOrders(self):
+        for group_by in ('day', 'week', 'month'):
+            stats = {row.date: row.customer_count for row in order_stats(group_by, START, END)}
+            self.assertEqual(stats, self.expected(group_by), group_by)
+
+    def test_rebuild_matches_the_orders(self):
+        for customer, day in ((self.ada, date(2026, 1, 5)), (self.ada, date(2026, 1, 7)),
+                              (self.bob, date(2026, 1, 7)), (self.bob, date(2026, 2, 2)),
+                              (self.cy, date(2026, 2, 28)), (self.ada, date(2026, 3, 1))):
+            create_order(customer, day)
+        rebuild_order_stats()
+        self.assertStatsMatchOrders()
+
+    def test_new_orders_are_added_incrementally(self):
+        product = Product.objects.create(name="Pen", price=Decimal('2.00'), stock=10)
+        for customer in (self.ada, self.ada, self.bob):
+            place_order(customer.pk, {str(product.pk): 1})
+        for group_by in ('day', 'week', 'month'):
+            stats = {row.date: row.customer_count for row in order_stats(group_by)}
+            self.assertEqual(stats, self.expected(group_by), group_by)
+
+    def test_deleting_the_last_order_of_a_month_updates_the_rest_of_its_week(self):
+        # Friday 30 January and Sunday 1 February 2026 share an ISO week.
+        january = create_order(self.ada, date(2026, 1, 30))
+        create_order(self.ada, date(2026, 2, 1))
+        create_order(self.bob, date(2026, 1, 30))
+        rebuild_order_stats()
+        self.assertEqual(OrderDailyStats.objects.get(date=date(2026, 2, 1)).week_customer_count, 0)
+
+        delete_orders(Order.objects.filter(pk=january.pk))
+        sunday = OrderDailyStats.objects.get(date=date(2026, 2, 1))
+        self.assertEqual((sunday.week_customer_count, sunday.month_customer_count), (1, 1))
+        self.assertStatsMatchOrders()
+        self.assertEqual(rebuild_order_stats(dry_run=True), 0)
+
+    def test_deletions_across_months(self):
+        orders = [
+            create_order(customer, day)
+            for customer, day in ((self.ada, date(2025, 12, 29)), (self.ada, date(2026, 1, 2)),
+                                  (self.bob, date(2026, 1, 2)), (self.bob, date(2026, 2, 27)),
+                                  (self.bob, date(2026, 3, 1)), (self.cy, date(2026, 3, 1)))
+        ]
+        rebuild_order_stats()
+        delete_orders(Order.objects.filter(pk__in=[orders[0].pk, orders[3].pk]))
+        self.assertStatsMatchOrders()
+        self.assertEqual(rebuild_order_stats(dry_run=True), 0)
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from crm.counters import compute_totals, get_counters
+from crm.models import Customer, Order
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class CleanInactiveCustomersTests(TestCase):
+    def setUp(self):
+        caches['graphql'].clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, 'checkpoint.json')
+
+        long_ago = timezone.now() - timedelta(days=400)
+        self.inactive = []
+        for i in range(5):
+            customer = Customer.objects.create(name=f"Inactive {i}", email=f"inactive{i}@example.com")
+            if i % 2:
+                Order.objects.create(customer=customer, total_amount=Decimal('10.00'))
+                Customer.objects.filter(pk=customer.pk).update(last_order_at=long_ago, order_count=1,
+                                                               lifetime_value=Decimal('10.00'))
+                Order.objects.filter(customer=customer).update(order_date=long_ago)
+            self.inactive.append(customer.pk)
+        self.active = Customer.objects.create(name="Active", email="active@example.com")
+        Order.objects.create(customer=self.active, total_amount=Decimal('5.00'))
+        Customer.objects.filter(pk=self.active.pk).update(last_order_at=timezone.now(), order_count=1,
+                                                          lifetime_value=Decimal('5.00'))
+        call_command('reconcile_crm_counters', stdout=StringIO())
+
+    def clean(self, *args):
+        out = StringIO()
+        call_command('clean_inactive_customers', '--sleep', '0', '--checkpoint', self.checkpoint, *args, stdout=out)
+        return out.getvalue()
+
+    def write_checkpoint(self, **state):
+        with open(self.checkpoint, 'w') as file:
+            cutoff = timezone.now() - timedelta(days=365)
+            json.dump({'days': 365, 'cutoff': cutoff.isoformat(), **state}, file)
+
+    def remaining(self):
+        return sorted(Customer.objects.values_list('pk', flat=True))
+
+    def test_deletes_in_chunks_and_keeps_the_counters(self):
+        output = self.clean('--chunk-size', '2')
+        self.assertIn("5 inactive customer(s) to delete.", output)
+        self.assertEqual(output.count("chunk "), 3)
+        self.assertIn("Deleted 5 inactive customers and 2 orders.", output)
+        self.assertEqual(self.remaining(), [self.active.pk])
+        self.assertFalse(os.path.exists(self.checkpoint))
+        counters, totals = get_counters(), compute_totals()
+        self.assertEqual((counters.customer_count, counters.order_count, counters.total_revenue),
+                         (totals['customer_count'], totals['order_count'], totals['total_revenue']))
+
+    def test_resumes_after_the_checkpoint(self):
+        self.write_checkpoint(last_pk=self.inactive[2])
+        output = self.clean('--chunk-size', '2')
+        self.assertIn(f"Resuming after customer {self.inactive[2]}", output)
+        self.assertIn("2 inactive customer(s) to delete.", output)
+        self.assertEqual(self.remaining(), self.inactive[:3] + [self.active.pk])
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_restart_ignores_the_checkpoint(self):
+        self.write_checkpoint(last_pk=self.inactive[2])
+        output = self.clean('--restart')
+        self.assertNotIn("Resuming", output)
+        self.assertEqual(self.remaining(), [self.active.pk])
+
+    def test_checkpoint_of_other_days_is_discarded(self):
+        self.write_checkpoint(last_pk=self.inactive[2], days=30)
+        output = self.clean()
+        self.assertIn("Discarding the checkpoint of a run with --days 30.", output)
+        self.assertEqual(self.remaining(), [self.active.pk])
+
+    def test_dry_run_ignores_and_keeps_the_checkpoint(self):
+        self.write_checkpoint(last_pk=self.inactive[2])
+        output = self.clean('--dry-run', '--chunk-size', '2')
+        self.assertNotIn("Resuming", output)
+        self.assertIn("Would delete 5 inactive customers and 2 orders.", output)
+        self.assertEqual(len(self.remaining()), 6)
+        with open(self.checkpoint) as file:
+            self.assertEqual(json.load(file)['last_pk'], self.inactive[2])
+
+    def test_unreadable_checkpoint(self):
+        with open(self.checkpoint, 'w') as file:
+            file.write('[1, 2]')
+        with self.assertRaisesMessage(CommandError, "Use --restart to ignore it."):
+            self.clean()
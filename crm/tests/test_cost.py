@@ -0,0 +1,76 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from alx_backend_graphql.schema import schema
+from crm.cost import QueryCost
+from graphql import parse
+
+NESTED = """
+{ allCustomers(first: 10) { edges { node {
+    name
+    orders(first: 5) { edges { node { totalAmount products { edges { node { name } } } } } }
+} } } }
+"""
+
+FRAGMENTS = """
+query Orders($withItems: Boolean!, $skipCustomer: Boolean!) {
+  allOrders(first: 4) { edges { node { ...OrderFields } } }
+}
+fragment OrderFields on OrderType {
+  totalAmount
+  customer @skip(if: $skipCustomer) { name }
+  ... on OrderType { items @include(if: $withItems) { quantity product { name } } }
+}
+"""
+
+
+class QueryCostTests(SimpleTestCase):
+    def cost(self, query, **variables):
+        return QueryCost(schema.graphql_schema, parse(query), variables=variables)
+
+    def test_nested_connections_multiply(self):
+        # 10 customers * (1 + 5 orders * (1 + 100 products by default))
+        cost = self.cost(NESTED)
+        self.assertEqual(cost.cost, 10 * (1 + 5 * (1 + 100)))
+        self.assertEqual(cost.depth, 4)
+
+    def test_default_page_size_without_first_or_last(self):
+        self.assertEqual(self.cost("{ allProducts { edges { node { name } } } }").cost, 100)
+        self.assertEqual(self.cost("{ allProducts(last: 7) { edges { node { name } } } }").cost, 7)
+        self.assertEqual(
+            self.cost("query P($n: Int) { allProducts(first: $n) { edges { node { name } } } }", n=3).cost, 3,
+        )
+        # Scalars and the connection's own fields are free.
+        self.assertEqual(self.cost("{ allProducts(first: 2) { totalCount edges { cursor } } }").cost, 2)
+
+    def test_fragments_and_directives(self):
+        # 4 orders * (1 + customer 1 + 100 items * (1 + product 1))
+        self.assertEqual(self.cost(FRAGMENTS, withItems=True, skipCustomer=False).cost, 4 * (1 + 1 + 100 * 2))
+        self.assertEqual(self.cost(FRAGMENTS, withItems=False, skipCustomer=False).cost, 4 * (1 + 1))
+        self.assertEqual(self.cost(FRAGMENTS, withItems=False, skipCustomer=True).cost, 4)
+
+    def test_operation_name_selects_the_operation(self):
+        document = parse("query A { allProducts(first: 1) { edges { node { name } } } }"
+                         "query B { allProducts(first: 9) { edges { node { name } } } }")
+        self.assertEqual(QueryCost(schema.graphql_schema, document, 'B').cost, 9)
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class QueryCostLimitTests(TestCase):
+    def setUp(self):
+        caches['graphql'].clear()
+
+    def post(self, query):
+        return self.client.post('/graphql', {'query': query}, content_type='application/json').json()
+
+    def test_costly_operation_rejected_before_any_query(self):
+        with self.settings(GRAPHQL_QUERY_COST_LIMIT=500), self.assertNumQueries(0):
+            body = self.post(NESTED)
+        self.assertNotIn('data', body)
+        error, = body['errors']
+        self.assertEqual(error['extensions']['code'], 'QUERY_TOO_COSTLY')
+        self.assertEqual(error['extensions']['cost'], {'estimated': 5060, 'depth': 4, 'limit': 500})
+
+    def test_operation_within_the_limit_reports_its_cost(self):
+        body = self.post("{ allProducts(first: 3) { edges { node { name } } } }")
+        self.assertEqual(body['extensions']['cost'], {'estimated': 3, 'depth': 2, 'limit': 20000})
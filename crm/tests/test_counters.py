@@ -0,0 +1,156 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db.models import Count, Max, Sum
+from django.test import TestCase, override_settings
+
+from crm.counters import compute_totals, delete_customers, delete_orders, get_counters, purge_customers
+from crm.models import Customer, Order, Product
+from crm.orders import place_order, place_orders
+
+CREATE_CUSTOMER = """
+mutation Create($name: String!, $email: String!) {
+  createCustomer(name: $name, email: $email) { customer { id } }
+}
+"""
+
+BULK_CREATE_CUSTOMERS = """
+mutation Bulk($input: [BulkCustomerInput]!) {
+  bulkCreateCustomers(input: $input) { customers { id } errors }
+}
+"""
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class CounterConsistencyTests(TestCase):
+    """After every kind of write the counters match the tables, as reconciliation sees them."""
+
+    def setUp(self):
+        caches['graphql'].clear()
+        self.products = [
+            Product.objects.create(name=f"Product {i}", price=Decimal(price), stock=100)
+            for i, price in enumerate(('9.99', '25.00', '0.50'))
+        ]
+
+    def mutate(self, query, **variables):
+        response = self.client.post(
+            '/graphql', {'query': query, 'variables': variables}, content_type='application/json'
+        )
+        body = response.json()
+        self.assertNotIn('errors', body)
+        return body['data']
+
+    def assertInSync(self):
+        counters = get_counters()
+        totals = compute_totals()
+        self.assertEqual(counters.customer_count, Customer.objects.count())
+        self.assertEqual(counters.order_count, Order.objects.count())
+        self.assertEqual(counters.total_revenue, totals['total_revenue'])
+
+        for customer in Customer.objects.annotate(
+            orders_count=Count('orders'), orders_value=Sum('orders__total_amount'), latest=Max('orders__order_date'),
+        ):
+            self.assertEqual(customer.order_count, customer.orders_count)
+            self.assertEqual(customer.lifetime_value, customer.orders_value or Decimal('0.00'))
+            self.assertEqual(customer.last_order_at, customer.latest)
+
+        out = StringIO()
+        call_command('reconcile_crm_counters', '--dry-run', stdout=out)
+        output = out.getvalue()
+        self.assertIn("Counters are in sync.", output)
+        self.assertIn("Customer order activity is in sync.", output)
+        self.assertIn("Daily order stats are in sync.", output)
+
+    def create_customers(self, count, prefix='bulk'):
+        data = self.mutate(BULK_CREATE_CUSTOMERS, input=[
+            {'name': f"Customer {i}", 'email': f"{prefix}{i}@example.com"} for i in range(count)
+        ])
+        self.assertEqual(len(data['bulkCreateCustomers']['customers']), count)
+        return list(Customer.objects.filter(email__startswith=prefix).order_by('pk').values_list('pk', flat=True))
+
+    def test_create_customer(self):
+        self.mutate(CREATE_CUSTOMER, name="Ada", email="ada@example.com")
+        self.assertInSync()
+
+    def test_bulk_create_customers_with_rejected_rows(self):
+        self.mutate(CREATE_CUSTOMER, name="Ada", email="ada@example.com")
+        data = self.mutate(BULK_CREATE_CUSTOMERS, input=[
+            {'name': "Bob", 'email': "bob@example.com"},
+            {'name': "Ada again", 'email': "ada@example.com"},
+            {'name': "Bob again", 'email': "bob@example.com"},
+            {'name': "Bad", 'email': "not-an-email"},
+        ])
+        self.assertEqual(len(data['bulkCreateCustomers']['customers']), 1)
+        self.assertEqual(len(data['bulkCreateCustomers']['errors']), 3)
+        self.assertInSync()
+
+    def test_place_order_and_rejected_order(self):
+        customer_pk, = self.create_customers(1)
+        place_order(customer_pk, {str(self.products[0].pk): 2, str(self.products[1].pk): 1})
+        with self.assertRaises(Exception):
+            place_order(customer_pk, {str(self.products[2].pk): 1000})
+        self.assertInSync()
+
+    def test_bulk_orders(self):
+        customers = self.create_customers(3)
+        orders, failures = place_orders([
+            (customers[0], {str(self.products[0].pk): 1}),
+            (customers[1], {str(self.products[1].pk): 3, str(self.products[2].pk): 4}),
+            (customers[0], {str(self.products[2].pk): 1}),
+            ('999999', {str(self.products[0].pk): 1}),
+        ])
+        self.assertEqual((len(orders), len(failures)), (3, 1))
+        self.assertInSync()
+
+    def test_delete_orders(self):
+        customers = self.create_customers(2)
+        place_orders([(customer, {str(self.products[i % 3].pk): i + 1})
+                      for i, customer in enumerate(customers * 2)])
+        delete_orders(Order.objects.filter(customer_id=customers[0]))
+        self.assertInSync()
+        delete_orders(Order.objects.filter(pk=Order.objects.latest('pk').pk))
+        self.assertInSync()
+
+    def test_delete_customers(self):
+        customers = self.create_customers(3)
+        place_orders([(customer, {str(self.products[0].pk): 1}) for customer in customers])
+        delete_customers(Customer.objects.filter(pk__in=customers[:2]))
+        self.assertInSync()
+
+    def test_purge_customers(self):
+        customers = self.create_customers(4)
+        place_orders([(customer, {str(self.products[1].pk): 2}) for customer in customers[1:]])
+        self.assertEqual(purge_customers(Customer.objects.filter(pk__in=customers[:3])), (3, 2))
+        self.assertInSync()
+
+    def test_supported_delete_paths(self):
+        customers = self.create_customers(6)
+        place_orders([(customer, {str(self.products[2].pk): 1}) for customer in customers * 2])
+        for delete, queryset in (
+            (delete_orders, Order.objects.filter(customer_id=customers[0])),
+            (delete_customers, Customer.objects.filter(pk__in=customers[1:3])),
+            (purge_customers, Customer.objects.filter(pk__in=customers[3:5])),
+        ):
+            delete(queryset)
+            self.assertInSync()
+        self.assertEqual(get_counters().customer_count, 2)
+
+    def test_other_deletes_need_reconciliation(self):
+        customers = self.create_customers(2)
+        place_orders([(customer, {str(self.products[0].pk): 1}) for customer in customers])
+        Customer.objects.get(pk=customers[0]).delete()
+        Order.objects.filter(customer_id=customers[1]).delete()
+        self.assertEqual(get_counters().order_count, 2)
+        call_command('reconcile_crm_counters', stdout=StringIO())
+        self.assertInSync()
+
+    def test_dry_run_reports_drift(self):
+        customer_pk, = self.create_customers(1)
+        place_order(customer_pk, {str(self.products[0].pk): 1})
+        Order.objects.all().delete()
+        out = StringIO()
+        call_command('reconcile_crm_counters', '--dry-run', stdout=out)
+        self.assertIn("order_count: stored 1, actual 0 (drift +1)", out.getvalue())
+        self.assertIn("order activity: 1 customer(s) out of sync", out.getvalue())
@@ -0,0 +1,103 @@
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from crm.counters import get_counters
+from crm.counts import count_rows
+from crm.models import Customer, Order, Product, ReportCounters
+
+CREATE_PRODUCT = """
+mutation { createProduct(name: "Pen", price: 1.5) { product { id } } }
+"""
+
+PRODUCTS_PAGE = """
+query Products($first: Int, $after: String, $offset: Int, $stockGte: Decimal) {
+  allProducts(first: $first, after: $after, offset: $offset, stockGte: $stockGte) {
+    totalCount isEstimate
+    pageInfo { hasNextPage endCursor }
+    edges { node { name } }
+  }
+}
+"""
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class CountTests(TestCase):
+    def setUp(self):
+        caches['graphql'].clear()
+
+    def execute(self, query, **variables):
+        response = self.client.post(
+            '/graphql', {'query': query, 'variables': variables}, content_type='application/json'
+        )
+        body = response.json()
+        self.assertNotIn('errors', body)
+        return body['data']
+
+    def create_products(self, count):
+        Product.objects.bulk_create(
+            Product(name=f"Product {i}", price=Decimal('1.00'), stock=i % 2) for i in range(count)
+        )
+
+    def test_writes_invalidate_the_cached_count(self):
+        Product.objects.create(name="Pen", price=Decimal('1.00'))
+        pens = Product.objects.filter(name="Pen")
+        self.assertEqual(count_rows(pens), (1, False))
+
+        # Without a version bump the cached count stands...
+        Product.objects.create(name="Pen", price=Decimal('1.00'))
+        with self.assertNumQueries(1):
+            self.assertEqual(count_rows(pens), (1, False))
+        # ...and a mutation bumps the Product version when it commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.execute(CREATE_PRODUCT)
+        self.assertEqual(count_rows(pens), (3, False))
+
+    def test_unfiltered_customers_and_orders_come_from_the_counters(self):
+        get_counters()
+        ReportCounters.objects.update(customer_count=42, order_count=7)
+        self.assertEqual(count_rows(Customer.objects.all()), (42, False))
+        self.assertEqual(count_rows(Order.objects.all()), (7, False))
+
+        customer = Customer.objects.create(name="Ada", email="ada@example.com")
+        self.assertEqual(count_rows(Customer.objects.filter(pk=customer.pk)), (1, False))
+
+    def test_estimates_above_the_exact_count_limit(self):
+        self.create_products(40)
+        with self.settings(GRAPHQL_EXACT_COUNT_LIMIT=40):
+            data = self.execute(PRODUCTS_PAGE, first=1, stockGte=1)['allProducts']
+        self.assertEqual((data['totalCount'], data['isEstimate']), (20, False))
+
+        caches['graphql'].clear()
+        with self.settings(GRAPHQL_EXACT_COUNT_LIMIT=8):
+            data = self.execute(PRODUCTS_PAGE, first=1, stockGte=1)['allProducts']
+        self.assertTrue(data['isEstimate'])
+        # Every other product matches, in every window.
+        self.assertEqual(data['totalCount'], 20)
+
+    def test_forward_pages_fetch_one_extra_row(self):
+        self.create_products(5)
+        query = "{ allProducts(first: 2) { pageInfo { hasNextPage } edges { node { name } } } }"
+        with CaptureQueriesContext(connection) as queries:
+            page = self.execute(query)['allProducts']
+        self.assertTrue(page['pageInfo']['hasNextPage'])
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in queries), queries.captured_queries)
+
+        for variables, names, has_next_page in (
+            ({'first': 5}, [f"Product {i}" for i in range(5)], False),
+            ({'first': 4}, [f"Product {i}" for i in range(4)], True),
+            ({'first': 2, 'offset': 3}, ["Product 3", "Product 4"], False),
+            ({'first': 2, 'offset': 2}, ["Product 2", "Product 3"], True),
+        ):
+            data = self.execute(PRODUCTS_PAGE, **variables)['allProducts']
+            self.assertEqual([edge['node']['name'] for edge in data['edges']], names, variables)
+            self.assertEqual(data['pageInfo']['hasNextPage'], has_next_page, variables)
+            self.assertEqual(data['totalCount'], 5)
+
+        page = self.execute(PRODUCTS_PAGE, first=3)['allProducts']
+        page = self.execute(PRODUCTS_PAGE, first=3, after=page['pageInfo']['endCursor'])['allProducts']
+        self.assertEqual([edge['node']['name'] for edge in page['edges']], ["Product 3", "Product 4"])
+        self.assertFalse(page['pageInfo']['hasNextPage'])
@@ -0,0 +1,97 @@
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from crm.db import ReadWriteRouter, read_from
+from crm.models import Customer
+from crm.threadpool import run_blocking
+
+CUSTOMERS = "{ allCustomers(first: 5) { edges { node { name } } } }"
+CREATE_CUSTOMER = 'mutation { createCustomer(name: "Bob", email: "bob@example.com") { customer { id } } }'
+
+
+class ReadWriteRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReadWriteRouter()
+
+    def test_reads_follow_read_from_and_writes_stay_on_the_write_alias(self):
+        self.assertEqual(self.router.db_for_read(Customer), 'default')
+        with read_from('replica'):
+            self.assertEqual(self.router.db_for_read(Customer), 'replica')
+            self.assertEqual(self.router.db_for_write(Customer), 'default')
+            with read_from(None):
+                self.assertEqual(self.router.db_for_read(Customer), 'default')
+            self.assertEqual(self.router.db_for_read(Customer), 'replica')
+        self.assertEqual(self.router.db_for_read(Customer), 'default')
+
+    def test_migrations_only_on_the_write_alias(self):
+        self.assertTrue(self.router.allow_migrate('default', 'crm'))
+        self.assertFalse(self.router.allow_migrate('replica', 'crm'))
+
+    def test_read_from_carries_into_pool_threads(self):
+        def read_alias():
+            return threading.current_thread().name, self.router.db_for_read(Customer)
+
+        async def read():
+            with read_from('replica'):
+                return await run_blocking(read_alias)
+
+        thread_name, alias = async_to_sync(read)()
+        self.assertTrue(thread_name.startswith('crm-orm'), thread_name)
+        self.assertEqual(alias, 'replica')
+        # The pool thread's context does not leak into later calls.
+        self.assertEqual(async_to_sync(run_blocking)(read_alias)[1], 'default')
+
+
+class GraphQLRoutingTests(TransactionTestCase):
+    """Query operations read from the replica alias; mutations read and write on default."""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        caches['graphql'].clear()
+        Customer.objects.create(name="Ada", email="ada@example.com")
+
+    def post(self, path, query):
+        with CaptureQueriesContext(connections['default']) as default, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            body = self.client.post(path, {'query': query}, content_type='application/json').json()
+        self.assertNotIn('errors', body)
+        return body['data'], default, replica
+
+    def customer_queries(self, queries):
+        return [query['sql'] for query in queries if 'crm_customer' in query['sql']]
+
+    def test_query_reads_from_the_replica(self):
+        data, default, replica = self.post('/graphql', CUSTOMERS)
+        self.assertEqual(data['allCustomers']['edges'], [{'node': {'name': "Ada"}}])
+        self.assertTrue(self.customer_queries(replica))
+        self.assertEqual(self.customer_queries(default), [])
+
+    def test_mutation_uses_the_write_alias(self):
+        _, default, replica = self.post('/graphql', CREATE_CUSTOMER)
+        self.assertTrue(any(sql.startswith('INSERT') for sql in self.customer_queries(default)))
+        self.assertEqual(len(replica), 0)
+        self.assertTrue(Customer.objects.filter(email="bob@example.com").exists())
+
+    def test_async_query_reads_from_the_replica_in_pool_threads(self):
+        reads = []
+        db_for_read = ReadWriteRouter.db_for_read
+
+        def record(router, model, **hints):
+            alias = db_for_read(router, model, **hints)
+            reads.append((threading.current_thread().name, model, alias))
+            return alias
+
+        with mock.patch.object(ReadWriteRouter, 'db_for_read', autospec=True, side_effect=record):
+            response = self.client.post('/graphql/async', {'query': CUSTOMERS}, content_type='application/json')
+        self.assertEqual(response.json()['data']['allCustomers']['edges'], [{'node': {'name': "Ada"}}])
+        customer_reads = [(thread, alias) for thread, model, alias in reads if model is Customer]
+        self.assertTrue(customer_reads)
+        self.assertTrue(all(thread.startswith('crm-orm') and alias == 'replica' for thread, alias in customer_reads),
+                        customer_reads)
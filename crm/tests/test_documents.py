@@ -0,0 +1,78 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from alx_backend_graphql.schema import schema
+from crm.documents import DocumentCache, PersistedQueryStore, document_cache, query_hash
+
+VALID = "{ hello }"
+UNKNOWN_FIELD = "{ noSuchField }"
+
+
+class DocumentCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = DocumentCache(4)
+        self.graphql_schema = schema.graphql_schema
+
+    def test_valid_document_is_cached(self):
+        document, errors = self.cache.get_document(self.graphql_schema, VALID)
+        self.assertEqual(errors, [])
+        self.assertIs(self.cache.get_document(self.graphql_schema, VALID)[0], document)
+        self.assertEqual(self.cache.stats()['size'], 1)
+
+    def test_syntax_errors_are_not_cached(self):
+        document, errors = self.cache.get_document(self.graphql_schema, "{ hello", cache_invalid=True)
+        self.assertIsNone(document)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_validation_errors_are_cached_only_on_request(self):
+        document, errors = self.cache.get_document(self.graphql_schema, UNKNOWN_FIELD)
+        self.assertIsNotNone(document)
+        self.assertTrue(errors)
+        self.assertNotIn(query_hash(UNKNOWN_FIELD), self.cache)
+
+        self.cache.get_document(self.graphql_schema, UNKNOWN_FIELD, cache_invalid=True)
+        self.assertIn(query_hash(UNKNOWN_FIELD), self.cache)
+
+    def test_invalid_queries_do_not_evict_valid_documents(self):
+        self.cache.get_document(self.graphql_schema, VALID)
+        for number in range(50):
+            self.cache.get_document(self.graphql_schema, f"{{ garbage{number} ")
+            self.cache.get_document(self.graphql_schema, f"{{ unknown{number} }}")
+        self.assertIn(query_hash(VALID), self.cache)
+        self.assertEqual(self.cache.stats()['evictions'], 0)
+
+
+class PersistedQueryStoreTests(SimpleTestCase):
+    def test_register_and_resolve(self):
+        store = PersistedQueryStore(2)
+        key = store.register(VALID)
+        self.assertEqual(store.resolve(key), VALID)
+
+    def test_mismatched_hash_is_rejected(self):
+        with self.assertRaisesMessage(Exception, "sha256Hash does not match query"):
+            PersistedQueryStore(2).register(VALID, sha256_hash='0' * 64)
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class DocumentCacheViewTests(TestCase):
+    def setUp(self):
+        caches['graphql'].clear()
+
+    def post(self, payload):
+        return self.client.post('/graphql', payload, content_type='application/json').json()
+
+    def test_failing_ad_hoc_queries_are_not_cached(self):
+        body = self.post({'query': "{ unknownField12345 }"})
+        self.assertTrue(body['errors'])
+        self.assertNotIn(query_hash("{ unknownField12345 }"), document_cache)
+
+    def test_persisted_query_round_trip(self):
+        query = "{ unknownPersisted67890 }"
+        extensions = {'persistedQuery': {'version': 1, 'sha256Hash': query_hash(query)}}
+        self.assertEqual(
+            self.post({'extensions': extensions})['errors'][0]['message'], "PersistedQueryNotFound"
+        )
+        self.assertTrue(self.post({'query': query, 'extensions': extensions})['errors'])
+        self.assertIn(query_hash(query), document_cache)
+        self.assertTrue(self.post({'extensions': extensions})['errors'])
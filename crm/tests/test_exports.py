@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+import django_filters
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from crm.exports import EXPORTS, Export
+from crm.filters import OrderFilter
+from crm.models import Customer, Order, OrderItem, Product
+
+
+class JoinedOrderFilter(OrderFilter):
+    """An order filter joining the order items, as a plain related lookup does."""
+    product = django_filters.CharFilter(field_name='products__name', lookup_expr='icontains')
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = Customer.objects.create(name="Ada", email="ada@example.com", phone="+1234567890")
+        cls.bob = Customer.objects.create(name="Bob", email="bob@example.com")
+        cls.pen = Product.objects.create(name="Pen", price=Decimal('2.50'), stock=10)
+        cls.pencil = Product.objects.create(name="Pencil", price=Decimal('1.00'), stock=10)
+        cls.orders = []
+        for customer, amount, lines in ((cls.ada, '3.50', ((cls.pen, 1), (cls.pencil, 1))),
+                                        (cls.bob, '5.00', ((cls.pen, 2),)),
+                                        (cls.ada, '2.00', ((cls.pencil, 2),))):
+            order = Order.objects.create(customer=customer, total_amount=Decimal(amount))
+            OrderItem.objects.bulk_create(OrderItem(order=order, product=product, quantity=quantity)
+                                          for product, quantity in lines)
+            cls.orders.append(order)
+
+    def setUp(self):
+        caches['graphql'].clear()
+
+    def export(self, path, **params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_orders_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export('/export/orders.csv'))))
+        self.assertEqual(rows[0], ['id', 'customer_id', 'customer_email', 'total_amount', 'order_date', 'items'])
+        first = self.orders[0]
+        self.assertEqual(rows[1][:4], [str(first.pk), str(self.ada.pk), "ada@example.com", "3.50"])
+        self.assertEqual(rows[1][4], first.order_date.isoformat())
+        self.assertEqual(rows[1][5], f"{self.pen.pk}:1;{self.pencil.pk}:1")
+        self.assertEqual([row[0] for row in rows[1:]], [str(order.pk) for order in self.orders])
+
+    def test_orders_ndjson(self):
+        records = [json.loads(line) for line in self.export('/export/orders.ndjson').splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[1]['customer_email'], "bob@example.com")
+        self.assertEqual(records[1]['total_amount'], "5.00")
+        self.assertEqual(records[1]['items'], [{'product_id': self.pen.pk, 'quantity': 2}])
+
+    def test_customers_ndjson_with_filters_and_ordering(self):
+        lines = self.export('/export/customers.ndjson', name="ad", order_by="-created_at").splitlines()
+        self.assertEqual([json.loads(line)['email'] for line in lines], ["ada@example.com"])
+        lines = self.export('/export/customers.ndjson', order_by="-created_at").splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], ["Bob", "Ada"])
+
+    def test_related_filters_export_each_order_once(self):
+        for params, expected in (
+            ({'product_name': "pen"}, self.orders),
+            ({'product_id': self.pen.pk}, self.orders[:2]),
+            ({'customer_name': "ada", 'total_amount_gte': "3"}, self.orders[:1]),
+        ):
+            rows = list(csv.reader(io.StringIO(self.export('/export/orders.csv', **params))))[1:]
+            self.assertEqual([row[0] for row in rows], [str(order.pk) for order in expected], params)
+
+    def test_joined_filters_are_rewritten_to_a_pk_subquery(self):
+        export = Export(JoinedOrderFilter, ('id',), items=True)
+        filterset = export.filterset({'product': "pen"})
+        self.assertTrue(filterset.is_valid())
+        self.assertEqual(filterset.qs.count(), 4)
+        queryset = export.queryset(filterset)
+        self.assertEqual(list(queryset), [(order.pk,) for order in self.orders])
+
+    def test_invalid_filters_are_rejected(self):
+        response = self.client.get('/export/orders.csv', {'total_amount_gte': "lots", 'order_date_lte': "soon"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'total_amount_gte', 'order_date_lte'})
+        self.assertEqual(self.client.get('/export/invoices.csv').status_code, 404)
+        self.assertEqual(self.client.get('/export/orders.xml').status_code, 404)
+
+    def test_one_order_item_query_per_chunk(self):
+        export = EXPORTS['orders']
+        filterset = export.filterset({})
+        with self.assertNumQueries(1 + 2):
+            chunks = list(export.chunks(export.queryset(filterset), chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(chunks[1][0][-1], [(self.pencil.pk, 2)])
+
+        with self.assertNumQueries(2):
+            self.export('/export/orders.ndjson')
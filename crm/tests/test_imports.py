@@ -0,0 +1,154 @@
+import io
+import json
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from crm.counters import get_counters
+from crm.imports import import_rows
+from crm.models import Customer, Product
+from crm.search import SEARCH_INDEXES
+
+CUSTOMERS_CSV = """name,email,phone
+Ada,ada@example.com,+1234567890
+Bob,bob@example.com,
+Ada Again,ada@example.com,123-456-7890
+"""
+
+
+def ndjson(*rows):
+    return [json.dumps(row) + '\n' for row in rows]
+
+
+class ImportTests(TestCase):
+    def run_import(self, resource, lines, import_format, chunk_size=1000):
+        errors = io.StringIO()
+        result = import_rows(resource, lines, import_format, errors, chunk_size=chunk_size)
+        return result, [json.loads(line) for line in errors.getvalue().splitlines()]
+
+    def assertSearchIndexIntact(self):
+        with connection.cursor() as cursor:
+            for table, _ in SEARCH_INDEXES.values():
+                cursor.execute(f"INSERT INTO {table}({table}, rank) VALUES ('integrity-check', 1)")
+
+    def test_existing_customers_get_only_their_name_and_phone_updated(self):
+        customer = Customer.objects.create(name="Ada", email="ada@example.com", order_count=3,
+                                           lifetime_value=Decimal('42.00'))
+        result, errors = self.run_import('customers', ndjson(
+            {'name': "Ada Lovelace", 'email': "ada@example.com", 'phone': "+1234567890"},
+        ), 'ndjson')
+        self.assertEqual((result.created, result.updated, errors), (0, 1, []))
+
+        updated = Customer.objects.get()
+        self.assertEqual((updated.pk, updated.name, updated.phone), (customer.pk, "Ada Lovelace", "+1234567890"))
+        self.assertEqual((updated.created_at, updated.order_count, updated.lifetime_value),
+                         (customer.created_at, 3, Decimal('42.00')))
+        self.assertSearchIndexIntact()
+
+    def test_last_row_of_an_email_wins(self):
+        result, _ = self.run_import('customers', io.StringIO(CUSTOMERS_CSV), 'csv')
+        self.assertEqual((result.rows, result.created, result.updated), (3, 2, 0))
+        self.assertEqual(
+            Customer.objects.get(email="ada@example.com").name, "Ada Again"
+        )
+        self.assertEqual(Customer.objects.get(email="ada@example.com").phone, "123-456-7890")
+
+    def test_created_and_updated_counts_adjust_the_counters(self):
+        Customer.objects.create(name="Bob", email="bob@example.com")
+        before = get_counters().customer_count
+        rows = [{'name': f"Customer {i}", 'email': f"customer{i}@example.com"} for i in range(5)]
+        rows.append({'name': "Robert", 'email': "bob@example.com"})
+        result, _ = self.run_import('customers', ndjson(*rows), 'ndjson', chunk_size=2)
+        self.assertEqual((result.created, result.updated), (5, 1))
+        self.assertEqual(get_counters().customer_count - before, 5)
+        self.assertEqual(Customer.objects.count(), 6)
+        self.assertSearchIndexIntact()
+
+    def test_products_with_explicit_ids(self):
+        product = Product.objects.create(name="Pen", price=Decimal('1.00'), stock=1)
+        result, _ = self.run_import('products', ndjson(
+            {'id': product.pk, 'name': "Fountain pen", 'price': "12.50", 'stock': 4},
+            {'id': product.pk + 10, 'name': "Ink", 'price': "3.00"},
+        ), 'ndjson')
+        self.assertEqual((result.created, result.updated), (1, 1))
+        self.assertEqual(
+            list(Product.objects.order_by('pk').values_list('pk', 'name', 'price', 'stock')),
+            [(product.pk, "Fountain pen", Decimal('12.50'), 4), (product.pk + 10, "Ink", Decimal('3.00'), 0)],
+        )
+        self.assertSearchIndexIntact()
+
+    def test_products_without_ids_are_inserted(self):
+        Product.objects.create(name="Pen", price=Decimal('1.00'))
+        result, _ = self.run_import('products', ndjson(
+            {'name': "Pen", 'price': "1.00"}, {'name': "Pen", 'price': "1.00"},
+        ), 'ndjson')
+        self.assertEqual((result.created, result.updated), (2, 0))
+        self.assertEqual(Product.objects.filter(name="Pen").count(), 3)
+        self.assertSearchIndexIntact()
+
+    def test_products_with_and_without_ids(self):
+        existing = Product.objects.create(name="Pen", price=Decimal('1.00'))
+        result, _ = self.run_import('products', io.StringIO(
+            "id,name,price,stock\n"
+            f"{existing.pk},Pencil,0.80,10\n"
+            ",Eraser,0.50,3\n"
+            f"{existing.pk + 5},Ruler,2.00,1\n"
+            f"{existing.pk},Pencil HB,0.90,12\n"
+        ), 'csv')
+        self.assertEqual((result.rows, result.created, result.updated), (4, 2, 1))
+        self.assertEqual(Product.objects.get(pk=existing.pk).name, "Pencil HB")
+        self.assertEqual(sorted(Product.objects.values_list('name', flat=True)), ["Eraser", "Pencil HB", "Ruler"])
+        # New products without an id continue after the explicit ones.
+        self.assertGreater(Product.objects.create(name="Glue", price=Decimal('1.00')).pk, existing.pk + 5)
+        self.assertSearchIndexIntact()
+
+    def test_csv_error_lines(self):
+        result, errors = self.run_import('customers', io.StringIO(
+            "name,email,phone\n"
+            "Ada,ada@example.com,\n"
+            ",nobody@example.com,\n"
+            "Bad,not-an-email,\n"
+            "Cy,cy@example.com,call me\n"
+        ), 'csv')
+        self.assertEqual((result.rows, result.created, result.rejected), (4, 1, 3))
+        self.assertEqual([error['line'] for error in errors], [3, 4, 5])
+        self.assertEqual(errors[0]['errors'], ["name: This field is required."])
+        self.assertTrue(errors[1]['errors'][0].startswith("email: "))
+        self.assertTrue(errors[2]['errors'][0].startswith("phone: Invalid phone number format."))
+        self.assertEqual(errors[2]['row'], {'name': "Cy", 'email': "cy@example.com", 'phone': "call me"})
+
+    def test_ndjson_error_lines(self):
+        result, errors = self.run_import('products', [
+            '{"name": "Pen", "price": "1.00"}\n',
+            'not json\n',
+            '\n',
+            '["a", "list"]\n',
+            '{"name": "Free", "price": "0"}\n',
+            '{"id": "x", "name": "Odd", "price": "1"}\n',
+            '{"name": "Cents", "price": "1.005", "stock": -1}\n',
+        ], 'ndjson')
+        self.assertEqual((result.rows, result.created, result.rejected), (6, 1, 5))
+        self.assertEqual([(error['line'], error['errors']) for error in errors], [
+            (2, ["Not a JSON object."]),
+            (4, ["Not a JSON object."]),
+            (5, ["price: Price must be a positive number."]),
+            (6, ["id: Enter a whole number."]),
+            (7, ["price: Ensure that there are no more than 2 decimal places."]),
+        ])
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class ImportViewTests(TestCase):
+    def setUp(self):
+        caches['graphql'].clear()
+
+    def test_upload_reports_the_summary_and_errors(self):
+        response = self.client.post(
+            '/import/customers.csv', CUSTOMERS_CSV + "Bad,bad,\n", content_type='text/csv'
+        )
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(lines[0]['created'], 2)
+        self.assertEqual(lines[0]['rejected'], 1)
+        self.assertEqual(lines[1]['line'], 5)
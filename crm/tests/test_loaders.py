@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from crm.models import Customer, Order, OrderItem, Product
+
+NESTED_ORDERS = """
+query {
+  allOrders(first: 50) {
+    edges {
+      node {
+        id
+        customer { name email }
+        products { edges { node { name stock } } }
+        items { quantity product { name } }
+      }
+    }
+  }
+}
+"""
+
+NESTED_CUSTOMERS = """
+query {
+  allCustomers(first: 50) {
+    edges { node { name orders(first: 10) { edges { node { id totalAmount customer { email } } } } } }
+  }
+}
+"""
+
+
+def create_orders(count):
+    products = [Product.objects.create(name=f"Product {i}", price=Decimal('5.00'), stock=10) for i in range(3)]
+    for i in range(count):
+        customer = Customer.objects.create(name=f"Customer {i}", email=f"customer{i}@example.com")
+        for products_of_order in (products[:2], products[1:]):
+            order = Order.objects.create(customer=customer, total_amount=Decimal('10.00'))
+            OrderItem.objects.bulk_create(OrderItem(order=order, product=product) for product in products_of_order)
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class BatchedRelationsTests(TestCase):
+    """
+    The nested relations of a page are fetched with a fixed number of queries:
+    the response cache versions, the page, and one per batched relation.
+    """
+
+    def setUp(self):
+        caches['graphql'].clear()
+
+    def execute(self, query):
+        response = self.client.post('/graphql', {'query': query}, content_type='application/json')
+        body = response.json()
+        self.assertNotIn('errors', body)
+        return body['data']
+
+    def test_nested_orders_small_page(self):
+        create_orders(2)
+        with self.assertNumQueries(4):
+            data = self.execute(NESTED_ORDERS)
+        self.assertEqual(len(data['allOrders']['edges']), 4)
+
+    def test_nested_orders_query_count_does_not_grow_with_page(self):
+        create_orders(20)
+        with self.assertNumQueries(4):
+            data = self.execute(NESTED_ORDERS)
+        edges = data['allOrders']['edges']
+        self.assertEqual(len(edges), 40)
+        self.assertTrue(all(len(edge['node']['items']) == 2 for edge in edges))
+        self.assertTrue(all(edge['node']['customer']['email'] for edge in edges))
+
+    def test_nested_customer_orders(self):
+        create_orders(2)
+        with CaptureQueriesContext(connection) as small:
+            self.execute(NESTED_CUSTOMERS)
+        Customer.objects.all().delete()
+        caches['graphql'].clear()
+        create_orders(15)
+        with CaptureQueriesContext(connection) as large:
+            data = self.execute(NESTED_CUSTOMERS)
+        self.assertEqual(len(data['allCustomers']['edges']), 15)
+        self.assertEqual(len(large), len(small))
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class AsyncBatchedRelationsTests(TransactionTestCase):
+    """
+    The async view runs its ORM calls in pool threads, where
+    ``assertNumQueries`` cannot see them; the operation trace counts the
+    statements of every thread.
+    """
+
+    def setUp(self):
+        caches['graphql'].clear()
+
+    async def sql_count(self, query):
+        response = await self.async_client.post('/graphql/async', {'query': query}, content_type='application/json')
+        body = response.json()
+        self.assertNotIn('errors', body)
+        return body['data'], body['extensions']['tracing']['sql']['count']
+
+    async def test_nested_orders_query_count(self):
+        await sync_to_async(create_orders)(20)
+        data, count = await self.sql_count(NESTED_ORDERS)
+        self.assertEqual(len(data['allOrders']['edges']), 40)
+        self.assertEqual(count, 4)
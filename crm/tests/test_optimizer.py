@@ -0,0 +1,138 @@
+import re
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+import crm.fields
+from crm.models import Customer, Order, OrderItem, Product
+from crm.optimizer import optimize_queryset
+
+FRAGMENTS = """
+query Orders($withItems: Boolean!, $skipCustomer: Boolean!) {
+  allOrders(first: 5) { edges { node { ...OrderFields } } }
+}
+fragment OrderFields on OrderType {
+  totalAmount
+  customer @skip(if: $skipCustomer) { name }
+  ... on OrderType { items @include(if: $withItems) { quantity product { name } } }
+}
+"""
+
+NESTED = """
+{ allCustomers(first: 5) { edges { node {
+    email
+    orders(first: 5) { edges { node { orderDate products { edges { node { stock } } } } } }
+} } } }
+"""
+
+TWO_ROOT_FIELDS = """
+{
+  allOrders(first: 5) { edges { node { customer { name } items { product { name } } } } }
+  allCustomers(first: 5) { edges { node { email orders(first: 5) { edges { node { totalAmount customer { phone } } } } } } }
+  allProducts(first: 5) { edges { node { stock } } }
+}
+"""
+
+FROM_TABLE = re.compile(r'\bFROM "(\w+)"')
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class OptimizerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = Customer.objects.create(name="Ada", email="ada@example.com", phone="+1234567890")
+        cls.pen = Product.objects.create(name="Pen", price=Decimal('2.50'), stock=10)
+        for _ in range(2):
+            order = Order.objects.create(customer=cls.ada, total_amount=Decimal('2.50'))
+            OrderItem.objects.create(order=order, product=cls.pen, quantity=1)
+
+    def setUp(self):
+        caches['graphql'].clear()
+
+    def plan(self, query, **variables):
+        """Runs ``query`` and returns its data and the querysets built by the optimizer, by model."""
+        planned = {}
+
+        def record(queryset, info, columns=()):
+            planned[queryset.model] = optimize_queryset(queryset, info, columns)
+            return planned[queryset.model]
+
+        with mock.patch.object(crm.fields, 'optimize_queryset', side_effect=record):
+            body = self.client.post(
+                '/graphql', {'query': query, 'variables': variables}, content_type='application/json'
+            ).json()
+        self.assertNotIn('errors', body)
+        return body['data'], planned
+
+    def describe(self, queryset):
+        """The ``only()`` columns, ``select_related`` paths and nested prefetches of ``queryset``."""
+        only, defer = queryset.query.deferred_loading
+        self.assertFalse(defer)
+        return {
+            'only': set(only),
+            'select_related': set(queryset.query.select_related or ()),
+            'prefetch': {
+                lookup.prefetch_to: self.describe(lookup.queryset)
+                for lookup in queryset._prefetch_related_lookups
+            },
+        }
+
+    def test_fragments_and_directives(self):
+        data, planned = self.plan(FRAGMENTS, withItems=True, skipCustomer=False)
+        self.assertEqual(data['allOrders']['edges'][0]['node']['items'], [{'quantity': 1, 'product': {'name': "Pen"}}])
+        self.assertEqual(self.describe(planned[Order]), {
+            'only': {'id', 'customer', 'total_amount', 'customer__id', 'customer__name'},
+            'select_related': {'customer'},
+            'prefetch': {'items': {
+                'only': {'id', 'order', 'product', 'quantity', 'product__id', 'product__name'},
+                'select_related': {'product'},
+                'prefetch': {},
+            }},
+        })
+
+        caches['graphql'].clear()
+        _, planned = self.plan(FRAGMENTS, withItems=False, skipCustomer=True)
+        self.assertEqual(self.describe(planned[Order]), {
+            'only': {'id', 'customer', 'total_amount'}, 'select_related': set(), 'prefetch': {},
+        })
+
+    def test_nested_connections(self):
+        data, planned = self.plan(NESTED)
+        orders = data['allCustomers']['edges'][0]['node']['orders']['edges']
+        self.assertEqual([order['node']['products']['edges'] for order in orders], [[{'node': {'stock': 10}}]] * 2)
+        self.assertEqual(self.describe(planned[Customer]), {
+            'only': {'id', 'email'},
+            'select_related': set(),
+            'prefetch': {'orders': {
+                'only': {'id', 'customer', 'order_date'},
+                'select_related': set(),
+                'prefetch': {'products': {'only': {'id', 'stock'}, 'select_related': set(), 'prefetch': {}}},
+            }},
+        })
+
+    def test_columns_are_shared_across_root_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            data, planned = self.plan(TWO_ROOT_FIELDS)
+        customer = data['allCustomers']['edges'][0]['node']
+        self.assertEqual(customer['email'], "ada@example.com")
+        self.assertEqual(customer['orders']['edges'][0]['node']['customer'], {'phone': "+1234567890"})
+        self.assertEqual(data['allOrders']['edges'][0]['node']['items'], [{'product': {'name': "Pen"}}])
+
+        # Each model is projected to its columns across the whole operation...
+        customer_columns = {'id', 'name', 'email', 'phone'}
+        self.assertEqual(self.describe(planned[Customer])['only'], customer_columns)
+        self.assertEqual(self.describe(planned[Order])['only'],
+                         {'id', 'customer', 'total_amount'} | {f'customer__{column}' for column in customer_columns})
+        self.assertEqual(self.describe(planned[Product])['only'], {'id', 'name', 'stock'})
+        # ...so no instance shared between the root fields reloads a deferred column.
+        tables = [FROM_TABLE.search(query['sql'])[1] for query in queries]
+        self.assertEqual(tables, [
+            'crm_modelversion',
+            'crm_order', 'crm_order_products',
+            'crm_customer', 'crm_order',
+            'crm_product',
+        ])
@@ -0,0 +1,66 @@
+import importlib
+import json
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from crm.cron_jobs import send_order_reminders as reminders
+from crm.models import Customer, Order
+
+
+@override_settings(CRM_READ_DATABASE=None, CRM_GRAPHQL_TRANSPORT='inprocess')
+class SendOrderRemindersTests(TestCase):
+    def setUp(self):
+        caches['graphql'].clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log_path = os.path.join(directory.name, 'reminders.log')
+        self.checkpoint_path = os.path.join(directory.name, 'checkpoint.json')
+        for name, value in (('LOG_PATH', self.log_path), ('CHECKPOINT_PATH', self.checkpoint_path),
+                            ('PAGE_SIZE', 2)):
+            patcher = mock.patch.object(reminders, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        customer = Customer.objects.create(name="Ada", email="ada@example.com")
+        for _ in range(5):
+            Order.objects.create(customer=customer, total_amount=Decimal('10.00'))
+        old = Order.objects.create(customer=customer, total_amount=Decimal('10.00'))
+        Order.objects.filter(pk=old.pk).update(order_date=timezone.now() - timedelta(days=30))
+
+    def logged_reminders(self):
+        with open(self.log_path) as f:
+            return [line for line in f if 'REMINDER' in line]
+
+    def test_import_does_not_set_up_django(self):
+        with mock.patch('django.setup') as setup:
+            importlib.reload(reminders)
+        setup.assert_not_called()
+
+    def test_logs_the_orders_of_the_window_and_clears_the_checkpoint(self):
+        reminders.send_order_reminders()
+        self.assertEqual(len(self.logged_reminders()), 5)
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_checkpoint_of_the_same_window_is_resumed(self):
+        start_date = reminders.window_start()
+        first_page = list(reminders.iter_order_pages(reminders.graphql_client(), start_date))[0]
+        reminders.save_checkpoint(start_date, first_page[1])
+        reminders.send_order_reminders()
+        self.assertEqual(len(self.logged_reminders()), 3)
+
+    def test_checkpoint_of_another_window_is_discarded(self):
+        start_date = reminders.window_start()
+        first_page = list(reminders.iter_order_pages(reminders.graphql_client(), start_date))[0]
+        stale_start = (timezone.now() - timedelta(days=9)).isoformat()
+        with open(self.checkpoint_path, 'w') as f:
+            json.dump({'start_date': stale_start, 'cursor': first_page[1]}, f)
+        reminders.send_order_reminders()
+        self.assertEqual(len(self.logged_reminders()), 5)
+        self.assertFalse(os.path.exists(self.checkpoint_path))
@@ -0,0 +1,168 @@
+import threading
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from crm import orders as orders_module
+from crm.counters import get_counters
+from crm.models import Customer, Order, OrderItem, Product
+from crm.orders import order_quantities, place_order, place_orders, reserve_stock
+
+CREATE_ORDER = """
+mutation Create($input: OrderInput!) {
+  createOrder(input: $input) { order { totalAmount items { quantity product { name } } } }
+}
+"""
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class PlaceOrderTests(TestCase):
+    def setUp(self):
+        caches['graphql'].clear()
+        self.customer = Customer.objects.create(name="Ada", email="ada@example.com")
+        self.pen = Product.objects.create(name="Pen", price=Decimal('2.50'), stock=5)
+        self.ink = Product.objects.create(name="Ink", price=Decimal('4.00'), stock=2)
+
+    def stock(self):
+        return dict(Product.objects.values_list('name', 'stock'))
+
+    def test_reserve_stock(self):
+        self.assertEqual(reserve_stock({self.pen.pk: 5, self.ink.pk: 2}), [])
+        self.assertEqual(self.stock(), {'Pen': 0, 'Ink': 0})
+        self.assertEqual(reserve_stock({self.pen.pk: 1}), [self.pen.pk])
+
+    def test_reserve_stock_is_all_or_nothing(self):
+        self.assertEqual(reserve_stock({self.pen.pk: 1, self.ink.pk: 3}), [self.ink.pk])
+        self.assertEqual(self.stock(), {'Pen': 5, 'Ink': 2})
+
+    def test_order_of_the_exact_stock_succeeds(self):
+        order = place_order(self.customer.pk, {str(self.pen.pk): 5, str(self.ink.pk): 2})
+        self.assertEqual(order.total_amount, Decimal('20.50'))
+        self.assertEqual(self.stock(), {'Pen': 0, 'Ink': 0})
+
+    def test_order_over_the_stock_is_rejected(self):
+        with self.assertRaisesMessage(Exception, f"Insufficient stock for product ID(s): {self.ink.pk}."):
+            place_order(self.customer.pk, {str(self.ink.pk): 3})
+
+    def test_short_order_leaves_nothing_behind(self):
+        with self.assertRaises(Exception):
+            place_order(self.customer.pk, {str(self.pen.pk): 2, str(self.ink.pk): 3})
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        self.assertEqual(self.stock(), {'Pen': 5, 'Ink': 2})
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.order_count, 0)
+
+    def test_repeated_product_ids_merge_into_one_quantity(self):
+        quantities = order_quantities(
+            [self.pen.pk],
+            [{'product_id': self.pen.pk, 'quantity': 2}, {'product_id': str(self.ink.pk), 'quantity': 1},
+             {'product_id': self.ink.pk}],
+        )
+        self.assertEqual(quantities, {str(self.pen.pk): 3, str(self.ink.pk): 2})
+
+        order = place_order(self.customer.pk, quantities)
+        self.assertEqual(
+            sorted(order.items.values_list('product__name', 'quantity')), [('Ink', 2), ('Pen', 3)]
+        )
+        self.assertEqual(self.stock(), {'Pen': 2, 'Ink': 0})
+
+    def test_repeated_items_of_the_mutation_merge(self):
+        response = self.client.post('/graphql', {'query': CREATE_ORDER, 'variables': {'input': {
+            'customerId': str(self.customer.pk),
+            'items': [{'productId': str(self.pen.pk), 'quantity': 2}, {'productId': str(self.pen.pk)}],
+        }}}, content_type='application/json')
+        order = response.json()['data']['createOrder']['order']
+        self.assertEqual(order['items'], [{'quantity': 3, 'product': {'name': "Pen"}}])
+        self.assertEqual(self.stock()['Pen'], 2)
+
+    def test_batch_allots_stock_in_input_order(self):
+        other = Customer.objects.create(name="Bob", email="bob@example.com")
+        orders, failures = place_orders([
+            (self.customer.pk, {str(self.pen.pk): 3}),
+            (other.pk, {str(self.pen.pk): 3}),
+            (other.pk, {str(self.pen.pk): 2, str(self.ink.pk): 1}),
+            (self.customer.pk, {str(self.ink.pk): 2}),
+        ])
+        self.assertEqual(
+            [(order.customer_id, order.total_amount) for order in orders],
+            [(self.customer.pk, Decimal('7.50')), (other.pk, Decimal('9.00'))],
+        )
+        self.assertEqual(failures, [
+            (1, "Insufficient stock for this order."), (3, "Insufficient stock for this order."),
+        ])
+        self.assertEqual(self.stock(), {'Pen': 0, 'Ink': 1})
+
+    def test_batch_allotted_again_when_stock_moves(self):
+        def short_the_first_time(quantities):
+            # As if another order had taken the pens since they were read.
+            return [self.pen.pk] if reserve.call_count == 1 else reserve_stock(quantities)
+
+        before = get_counters().order_count
+        with mock.patch.object(orders_module, 'reserve_stock', side_effect=short_the_first_time) as reserve:
+            orders, failures = place_orders([
+                (self.customer.pk, {str(self.pen.pk): 3}),
+                (self.customer.pk, {str(self.pen.pk): 2}),
+            ])
+        self.assertEqual((reserve.call_count, len(orders), failures), (2, 2, []))
+        # The writes of the first allotment were rolled back with it.
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(get_counters().order_count - before, 2)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.order_count, 2)
+        self.assertEqual(self.stock(), {'Pen': 0, 'Ink': 2})
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class ConcurrentOrderTests(TransactionTestCase):
+    """
+    Orders placed at once from several threads never take more than the stock.
+    The in-memory test database fails a writer that finds the table locked
+    instead of queueing it as the file database does, so such orders retry
+    until they are placed or rejected.
+    """
+
+    THREADS = 8
+
+    def place_order(self, customer_pk, quantities):
+        while True:
+            try:
+                return place_order(customer_pk, quantities)
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                time.sleep(0.005)
+
+    def test_no_oversell(self):
+        customers = [
+            Customer.objects.create(name=f"Customer {i}", email=f"customer{i}@example.com")
+            for i in range(self.THREADS)
+        ]
+        product = Product.objects.create(name="Last units", price=Decimal('1.00'), stock=5)
+        barrier = threading.Barrier(self.THREADS)
+        rejected = []
+
+        def order(customer):
+            try:
+                barrier.wait()
+                self.place_order(customer.pk, {str(product.pk): 2})
+            except Exception as e:
+                rejected.append(str(e))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=order, args=(customer,)) for customer in customers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 1)
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(sum(OrderItem.objects.values_list('quantity', flat=True)), 4)
+        self.assertTrue(all("Insufficient stock" in message for message in rejected), rejected)
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from crm.models import Customer
+from crm.pagination import decode_cursor, encode_cursor, keyset_page, seek_filter
+
+CUSTOMERS_PAGE = """
+query Customers($keyset: Boolean, $first: Int, $after: String, $last: Int, $before: String, $orderBy: String) {
+  allCustomers(keyset: $keyset, first: $first, after: $after, last: $last, before: $before, orderBy: $orderBy) {
+    pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+    edges { cursor node { email } }
+  }
+}
+"""
+
+ORDERING = ('created_at', 'id')
+START = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def create_customers(count, per_timestamp=3):
+    """Customers whose created_at repeats ``per_timestamp`` times and runs against the pk order."""
+    customers = [
+        Customer.objects.create(name=f"Customer {i}", email=f"customer{i:02}@example.com")
+        for i in range(count)
+    ]
+    for index, customer in enumerate(customers):
+        created_at = START - timedelta(days=index // per_timestamp)
+        Customer.objects.filter(pk=customer.pk).update(created_at=created_at)
+    return list(Customer.objects.order_by(*ORDERING).values_list('email', flat=True))
+
+
+class KeysetPageTests(TestCase):
+    def test_cursor_round_trip(self):
+        create_customers(4)
+        customer = Customer.objects.order_by(*ORDERING).first()
+        cursor = encode_cursor(customer, ORDERING)
+        self.assertEqual(decode_cursor(cursor, Customer, ORDERING), [customer.created_at, customer.pk])
+
+    def test_invalid_cursor(self):
+        with self.assertRaisesMessage(Exception, "Validation Error: Invalid keyset cursor"):
+            decode_cursor('bm90LWEta2V5c2V0', Customer, ORDERING)
+
+    def test_seek_filter_descending(self):
+        create_customers(6)
+        rows = list(Customer.objects.order_by('-created_at', '-id'))
+        pivot = rows[2]
+        after = Customer.objects.filter(seek_filter(('-created_at', '-id'), [pivot.created_at, pivot.pk]))
+        self.assertEqual(list(after.order_by('-created_at', '-id')), rows[3:])
+
+    def test_forward_and_backward_pages(self):
+        expected = create_customers(9)
+        queryset = Customer.objects.all()
+
+        rows, has_previous, has_next = keyset_page(queryset, ORDERING, first=4)
+        self.assertEqual([row.email for row in rows], expected[:4])
+        self.assertEqual((has_previous, has_next), (False, True))
+
+        after = encode_cursor(rows[-1], ORDERING)
+        rows, has_previous, has_next = keyset_page(queryset, ORDERING, first=4, after=after)
+        self.assertEqual([row.email for row in rows], expected[4:8])
+        self.assertEqual((has_previous, has_next), (True, True))
+
+        before = encode_cursor(rows[0], ORDERING)
+        rows, has_previous, has_next = keyset_page(queryset, ORDERING, last=3, before=before)
+        self.assertEqual([row.email for row in rows], expected[1:4])
+        self.assertEqual((has_previous, has_next), (True, True))
+
+        rows, has_previous, has_next = keyset_page(queryset, ORDERING, last=2)
+        self.assertEqual([row.email for row in rows], expected[7:])
+        self.assertEqual((has_previous, has_next), (True, False))
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class KeysetConnectionTests(TestCase):
+    def setUp(self):
+        caches['graphql'].clear()
+
+    def execute(self, **variables):
+        response = self.client.post(
+            '/graphql', {'query': CUSTOMERS_PAGE, 'variables': variables}, content_type='application/json'
+        )
+        return response.json()
+
+    def page(self, **variables):
+        body = self.execute(**variables)
+        self.assertNotIn('errors', body)
+        return body['data']['allCustomers']
+
+    def walk(self, page_size, **variables):
+        """Every page of the connection, following endCursor."""
+        emails, after = [], None
+        while True:
+            page = self.page(first=page_size, after=after, **variables)
+            emails += [edge['node']['email'] for edge in page['edges']]
+            if not page['pageInfo']['hasNextPage']:
+                return emails
+            after = page['pageInfo']['endCursor']
+
+    def test_pages_follow_the_sort_key_with_ties_broken_by_pk(self):
+        expected = create_customers(10)
+        self.assertEqual(self.walk(3, keyset=True), expected)
+
+    def test_no_row_skipped_or_repeated_compared_with_offset_pages(self):
+        create_customers(11)
+        keyset = self.walk(4, keyset=True)
+        offset = self.walk(4)
+        self.assertEqual(len(keyset), len(set(keyset)))
+        self.assertEqual(sorted(keyset), sorted(offset))
+        self.assertEqual(len(keyset), 11)
+
+    def test_rows_inserted_before_the_cursor_do_not_shift_the_next_page(self):
+        expected = create_customers(8)
+        first = self.page(keyset=True, first=4)
+        Customer.objects.create(name="Early", email="early@example.com")
+        Customer.objects.filter(email="early@example.com").update(created_at=START - timedelta(days=30))
+        caches['graphql'].clear()
+        second = self.page(keyset=True, first=4, after=first['pageInfo']['endCursor'])
+        emails = [edge['node']['email'] for edge in first['edges'] + second['edges']]
+        self.assertEqual(emails, expected)
+
+    def test_backward_pages(self):
+        expected = create_customers(7)
+        last = self.page(keyset=True, last=3)
+        self.assertEqual([edge['node']['email'] for edge in last['edges']], expected[4:])
+        self.assertTrue(last['pageInfo']['hasPreviousPage'])
+        self.assertFalse(last['pageInfo']['hasNextPage'])
+
+        previous = self.page(keyset=True, last=3, before=last['pageInfo']['startCursor'])
+        self.assertEqual([edge['node']['email'] for edge in previous['edges']], expected[1:4])
+        self.assertTrue(previous['pageInfo']['hasPreviousPage'])
+        self.assertTrue(previous['pageInfo']['hasNextPage'])
+
+    def test_order_by_cannot_be_combined_with_keyset(self):
+        create_customers(2)
+        body = self.execute(keyset=True, first=2, orderBy='-order_count')
+        self.assertIsNone(body['data']['allCustomers'])
+        self.assertIn("'orderBy' cannot be combined with keyset pagination", body['errors'][0]['message'])
+
+    def test_offset_cursor_is_rejected_in_keyset_mode(self):
+        create_customers(3)
+        offset_cursor = self.page(first=1)['pageInfo']['endCursor']
+        body = self.execute(keyset=True, first=1, after=offset_cursor)
+        self.assertIn("Invalid keyset cursor", body['errors'][0]['message'])
@@ -0,0 +1,78 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+
+from alx_backend_graphql.schema import schema
+from crm.models import Customer, ModelVersion, Product
+from crm.response_cache import (
+    DatabaseVersions, OperationPlan, ResponseCache, check_version_store, response_cache,
+)
+from graphql import parse
+
+QUERY = "{ allCustomers(first: 5) { edges { node { name } } } }"
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'graphql': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'versions-test'},
+}
+
+
+class ProcessCache(ResponseCache):
+    """A response cache with its own local memory, as in another process."""
+
+    def __init__(self, name):
+        super().__init__(name, versions=DatabaseVersions())
+        self._cache = LocMemCache(name, {})
+
+    @property
+    def cache(self):
+        return self._cache
+
+
+class SharedVersionsTests(TestCase):
+    def setUp(self):
+        document = parse(QUERY)
+        self.plan = OperationPlan(schema.graphql_schema, document, document.definitions[0])
+
+    def test_bump_from_another_process_invalidates(self):
+        web, scheduler = ProcessCache('web'), ProcessCache('scheduler')
+        key, data = web.lookup(self.plan, None, {})
+        self.assertIsNone(data)
+        web.store(key, {'allCustomers': []})
+        self.assertEqual(web.lookup(self.plan, None, {})[1], {'allCustomers': []})
+
+        scheduler.bump([Customer])
+        self.assertIsNone(web.lookup(self.plan, None, {})[1])
+
+    def test_unrelated_bump_keeps_the_response(self):
+        web, scheduler = ProcessCache('web'), ProcessCache('scheduler')
+        key, _ = web.lookup(self.plan, None, {})
+        web.store(key, {'allCustomers': []})
+        scheduler.bump([Product])
+        self.assertEqual(web.lookup(self.plan, None, {})[1], {'allCustomers': []})
+
+    def test_versions_start_at_zero_and_move_on(self):
+        versions = DatabaseVersions()
+        key = response_cache.version_key(Customer)
+        self.assertEqual(versions.get_many([Customer]), {key: 0})
+        versions.bump([Customer])
+        versions.bump([Customer])
+        self.assertEqual(versions.get_many([Customer])[key], 2)
+        versions.bump([Customer, Product])
+        self.assertGreater(versions.get_many([Customer])[key], 2)
+        self.assertEqual(ModelVersion.objects.get(label='crm.product').version, 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GRAPHQL_RESPONSE_CACHE='graphql')
+class VersionStoreCheckTests(TestCase):
+    def test_database_versions_pass(self):
+        with self.settings(GRAPHQL_RESPONSE_CACHE_VERSIONS=None):
+            self.assertEqual(check_version_store(), [])
+
+    def test_local_memory_versions_are_refused_with_scheduled_jobs(self):
+        with self.settings(GRAPHQL_RESPONSE_CACHE_VERSIONS='graphql'):
+            errors = check_version_store()
+        self.assertEqual([error.id for error in errors], ['crm.E001'])
+
+    def test_local_memory_versions_without_jobs_pass(self):
+        with self.settings(GRAPHQL_RESPONSE_CACHE_VERSIONS='graphql', CRONJOBS=[], CRM_SCHEDULER_JOBS=[]):
+            self.assertEqual(check_version_store(), [])
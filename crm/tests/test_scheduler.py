@@ -0,0 +1,65 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import SimpleTestCase, override_settings
+
+from crm.scheduler import CronSchedule
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+@override_settings(TIME_ZONE='UTC')
+class CronScheduleTests(SimpleTestCase):
+    def assertNextRuns(self, expression, moment, *expected):
+        schedule = CronSchedule(expression)
+        runs = []
+        for _ in expected:
+            moment = schedule.next_after(moment)
+            runs.append(moment)
+        self.assertEqual(runs, list(expected))
+
+    def test_minute_steps(self):
+        self.assertNextRuns('*/15 * * * *', utc(2026, 1, 1, 10, 7), utc(2026, 1, 1, 10, 15))
+        self.assertNextRuns('*/15 * * * *', utc(2026, 1, 1, 10, 45), utc(2026, 1, 1, 11, 0))
+
+    def test_stepped_hour_range(self):
+        self.assertNextRuns(
+            '0 9-17/4 * * *', utc(2026, 1, 1, 13, 0),
+            utc(2026, 1, 1, 17, 0), utc(2026, 1, 2, 9, 0), utc(2026, 1, 2, 13, 0),
+        )
+
+    def test_lists_and_single_value_steps(self):
+        self.assertNextRuns(
+            '5,50 22/1 * * *', utc(2026, 1, 1, 23, 10), utc(2026, 1, 1, 23, 50), utc(2026, 1, 2, 22, 5),
+        )
+
+    def test_sunday_is_zero_or_seven(self):
+        # 1 January 2026 is a Thursday.
+        for expression in ('30 8 * * 0', '30 8 * * 7'):
+            self.assertNextRuns(
+                expression, utc(2026, 1, 1, 12, 0), utc(2026, 1, 4, 8, 30), utc(2026, 1, 11, 8, 30),
+            )
+        self.assertNextRuns(
+            '0 12 * * 5-7', utc(2026, 1, 1), utc(2026, 1, 2, 12), utc(2026, 1, 3, 12), utc(2026, 1, 4, 12),
+        )
+
+    def test_both_day_fields_restricted_match_either(self):
+        self.assertNextRuns(
+            '0 0 13 * 5', utc(2026, 1, 1, 12, 0),
+            utc(2026, 1, 2), utc(2026, 1, 9), utc(2026, 1, 13), utc(2026, 1, 16),
+        )
+
+    def test_stepped_day_field_does_not_restrict(self):
+        # Odd days that are Mondays, not odd days or Mondays.
+        self.assertNextRuns('0 0 */2 * 1', utc(2026, 1, 1, 12, 0), utc(2026, 1, 5), utc(2026, 1, 19))
+        # The first of the month on a Sunday, Tuesday, Thursday or Saturday.
+        self.assertNextRuns('0 0 1 * */2', utc(2026, 1, 1, 12, 0), utc(2026, 2, 1), utc(2026, 3, 1))
+
+    def test_leap_day(self):
+        self.assertNextRuns('0 0 29 2 *', utc(2026, 3, 1), utc(2028, 2, 29))
+
+    def test_invalid_expressions(self):
+        for expression in ('* * * *', '60 * * * *', '* * 0 * *', '*/0 * * * *', '* * * * 8', 'a * * * *'):
+            with self.assertRaises(ValueError, msg=expression):
+                CronSchedule(expression)
@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from crm.filters import CustomerFilter, OrderFilter, ProductFilter
+from crm.models import Customer, Order, OrderItem, Product
+from crm.search import SEARCH_INDEXES, contains_lookup, install_search_indexes, search_index_available
+
+CUSTOMER_NAMES = (
+    "Ada Lovelace", "ADA BYRON", "ada", "Grace Hopper", "Adalbert", "100% Pure", "snake_case",
+    "back\\slash", "Élodie", "élan",
+)
+PRODUCT_NAMES = ("Laptop", "LAPTOP stand", "Mouse pad", "Ink 50%", "usb_c cable", "C:\\drivers")
+VALUES = (
+    "ada", "ADA", "aDa lOV", "lovelace", "ace", "xyz", "a", "Ad", "%", "0% p", "_", "e_c", "\\", "k\\s",
+    "élo", "Élo", "lan", "laptop", "TOP", "pad", "50%", "b_c", ":\\d",
+)
+
+
+def check_search_index():
+    with connection.cursor() as cursor:
+        for table, _ in SEARCH_INDEXES.values():
+            cursor.execute(f"INSERT INTO {table}({table}, rank) VALUES ('integrity-check', 1)")
+
+
+class SearchFilterTests(TestCase):
+    """The search index filters give the rows of a plain ``icontains`` on the same data."""
+
+    @classmethod
+    def setUpTestData(cls):
+        customers = [Customer.objects.create(name=name, email=f"c{i}@example.com")
+                     for i, name in enumerate(CUSTOMER_NAMES)]
+        products = [Product.objects.create(name=name, price=Decimal('1.00')) for name in PRODUCT_NAMES]
+        for customer in customers[:6]:
+            order = Order.objects.create(customer=customer, total_amount=Decimal('3.00'))
+            # Every order holds both laptop products, so a join would repeat it.
+            OrderItem.objects.bulk_create(
+                OrderItem(order=order, product=product) for product in (products[0], products[1], products[3])
+            )
+
+    def assertSameRows(self, filterset_class, name, field_path, values=VALUES):
+        model = filterset_class._meta.model
+        for value in values:
+            with self.subTest(value=value):
+                filtered = list(filterset_class({name: value}, model.objects.all()).qs.values_list('pk', flat=True))
+                expected = set(model.objects.filter(**{f'{field_path}__icontains': value}).values_list('pk', flat=True))
+                self.assertEqual(len(filtered), len(set(filtered)), "rows repeated")
+                self.assertEqual(set(filtered), expected)
+
+    def test_the_index_answers_values_of_three_or_more_plain_characters(self):
+        self.assertTrue(search_index_available())
+        self.assertIsNotNone(contains_lookup(Customer, 'name', "ada"))
+        self.assertIsNotNone(contains_lookup(Order, 'products__name', "LAP"))
+        for value in ("ad", "50%", "e_c", "k\\s"):
+            self.assertIsNone(contains_lookup(Customer, 'name', value), value)
+        self.assertIsNone(contains_lookup(Customer, 'phone', "123"))
+
+    def test_customer_name_and_email(self):
+        self.assertSameRows(CustomerFilter, 'name', 'name')
+        self.assertSameRows(CustomerFilter, 'email', 'email', ("C1@", "example", "@EX", "c1"))
+
+    def test_product_name(self):
+        self.assertSameRows(ProductFilter, 'name', 'name')
+
+    def test_order_customer_name(self):
+        self.assertSameRows(OrderFilter, 'customer_name', 'customer__name')
+
+    def test_order_product_name_returns_each_order_once(self):
+        self.assertSameRows(OrderFilter, 'product_name', 'products__name')
+        for value in ("lap", "la"):
+            self.assertEqual(OrderFilter({'product_name': value}, Order.objects.all()).qs.count(), 6)
+
+    def test_index_follows_writes(self):
+        customer = Customer.objects.get(name="Grace Hopper")
+        customer.name = "Grace Brewster"
+        customer.save()
+        Customer.objects.filter(name="ada").update(name="Ida")
+        Customer.objects.filter(name="Adalbert").delete()
+        self.assertSameRows(CustomerFilter, 'name', 'name', ("grace", "hopper", "brew", "ada", "ida", "albert"))
+        check_search_index()
+
+
+class InstallSearchIndexesTests(TransactionTestCase):
+    def test_index_rebuilt_after_the_table_is_remade(self):
+        Customer.objects.create(name="Ada Lovelace", email="ada@example.com")
+        # A migration that alters a column on SQLite copies the table into a
+        # new one, which drops the triggers along with the old table.
+        with connection.schema_editor() as editor:
+            editor._remake_table(Customer)
+        Customer.objects.create(name="Grace Hopper", email="grace@example.com")
+        Customer.objects.filter(name="Ada Lovelace").update(name="Ada King")
+
+        install_search_indexes()
+        check_search_index()
+        for value, expected in (("hopper", ["Grace Hopper"]), ("king", ["Ada King"]), ("lovelace", [])):
+            self.assertEqual(
+                list(CustomerFilter({'name': value}, Customer.objects.all()).qs.values_list('name', flat=True)),
+                expected,
+            )
+        Customer.objects.create(name="Alan Turing", email="alan@example.com")
+        self.assertEqual(CustomerFilter({'name': "turing"}, Customer.objects.all()).qs.count(), 1)
@@ -0,0 +1,73 @@
+import re
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from crm.models import Customer
+from crm.tracing import OperationTrace, server_timing
+
+CUSTOMERS = "query Customers { allCustomers(first: 5) { edges { node { name } } } }"
+SERVER_TIMING = re.compile(r'^graphql;dur=(\d+\.\d\d), sql;dur=(\d+\.\d\d);desc="(\d+) queries"$')
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class TracingTests(TestCase):
+    def setUp(self):
+        caches['graphql'].clear()
+        Customer.objects.create(name="Ada", email="ada@example.com")
+
+    def post(self, query, path='/graphql'):
+        return self.client.post(path, {'query': query}, content_type='application/json')
+
+    def test_tracing_extension_and_server_timing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(CUSTOMERS)
+        tracing = response.json()['extensions']['tracing']
+        self.assertEqual(tracing['version'], 1)
+        self.assertGreater(tracing['duration'], 0)
+        self.assertEqual(tracing['sql']['count'], len(queries))
+        root, = [resolver for resolver in tracing['execution']['resolvers'] if resolver['path'] == ['allCustomers']]
+        self.assertEqual((root['parentType'], root['fieldName']), ('Query', 'allCustomers'))
+        self.assertLessEqual(root['startOffset'] + root['duration'], tracing['duration'])
+        self.assertIn(['allCustomers', 'edges', 0, 'node', 'name'],
+                      [resolver['path'] for resolver in tracing['execution']['resolvers']])
+
+        match = SERVER_TIMING.match(response['Server-Timing'])
+        self.assertIsNotNone(match, response['Server-Timing'])
+        self.assertEqual(int(match[3]), len(queries))
+        self.assertEqual(float(match[1]), round(tracing['duration'] / 1e6, 2))
+
+    def test_one_log_line_per_operation(self):
+        with self.assertLogs('crm.graphql', 'INFO') as logs:
+            self.post(CUSTOMERS)
+        record, = logs.records
+        self.assertIn("graphql operation=Customers type=query", record.getMessage())
+        self.assertEqual(record.graphql['operation_type'], 'query')
+        self.assertGreater(record.graphql['sql_count'], 0)
+
+    def test_tracing_switched_off(self):
+        with self.settings(GRAPHQL_TRACING=False), self.assertNoLogs('crm.graphql'):
+            response = self.post(CUSTOMERS)
+        self.assertNotIn('tracing', response.json().get('extensions', {}))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+@override_settings(CRM_READ_DATABASE=None)
+class AsyncTracingTests(TransactionTestCase):
+    def test_sql_of_the_pool_threads_is_counted(self):
+        caches['graphql'].clear()
+        Customer.objects.create(name="Ada", email="ada@example.com")
+        response = self.client.post('/graphql/async', {'query': CUSTOMERS}, content_type='application/json')
+        tracing = response.json()['extensions']['tracing']
+        self.assertGreater(tracing['sql']['count'], 0)
+        self.assertEqual(SERVER_TIMING.match(response['Server-Timing'])[3], str(tracing['sql']['count']))
+
+
+class ServerTimingTests(SimpleTestCase):
+    def test_traces_of_a_batch_add_up(self):
+        traces = [OperationTrace(), OperationTrace()]
+        for trace, (duration, sql_count, sql_duration) in zip(traces, ((3_000_000, 2, 1_000_000), (1_500_000, 1, 250_000))):
+            trace.duration, trace.sql_count, trace.sql_duration = duration, sql_count, sql_duration
+        self.assertEqual(server_timing(traces), 'graphql;dur=4.50, sql;dur=1.25;desc="3 queries"')
@@ -0,0 +1,37 @@
+# alx-backend-graphql_crm/crm/threadpool.py
+"""
+Bounded thread pool for the blocking ORM calls of the async GraphQL view.
+
+Django's ORM cannot run on the event loop, and ``sync_to_async``'s default
+thread-sensitive mode funnels every call through one thread. The async view
+instead hands blocking work to this pool, so independent root fields and
+DataLoader batches run in parallel while a request waits on the database
+without holding a worker. Each pool thread keeps its own database connection.
+The pool size comes from the GRAPHQL_ASYNC_ORM_WORKERS setting.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+DEFAULT_ORM_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'GRAPHQL_ASYNC_ORM_WORKERS', DEFAULT_ORM_WORKERS),
+                thread_name_prefix='crm-orm',
+            )
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Awaits ``func(*args, **kwargs)`` run in the ORM thread pool."""
+    return await sync_to_async(func, thread_sensitive=False, executor=get_executor())(*args, **kwargs)
@@ -0,0 +1,178 @@
+# alx-backend-graphql_crm/crm/tracing.py
+"""
+Per-operation tracing of GraphQL requests.
+
+While the view executes an operation, a trace is the current one (a context
+variable, so it follows the request into the ORM pool threads and loader
+tasks of the async view). ``TracingMiddleware`` records the duration of every
+field resolver, and an execute wrapper installed on each database connection
+counts the SQL statements run for the trace and the time spent in them.
+
+The view reports a finished trace in three places: the ``tracing`` response
+extension (the Apollo tracing format, plus the SQL totals), a
+``Server-Timing`` header, and one log line on the ``crm.graphql`` logger.
+Tracing is switched off with the GRAPHQL_TRACING setting.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from inspect import isawaitable
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger('crm.graphql')
+
+_current_trace = ContextVar('crm_graphql_trace', default=None)
+
+
+def tracing_enabled():
+    return getattr(settings, 'GRAPHQL_TRACING', True)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+class OperationTrace:
+    """Resolver timings and SQL totals of one GraphQL operation. Durations are in nanoseconds."""
+
+    def __init__(self, operation_name=None):
+        self.operation_name = operation_name
+        self.operation_type = None
+        self.started_at = timezone.now()
+        self.start = time.perf_counter_ns()
+        self.duration = None
+        self.resolvers = []
+        self.sql_count = 0
+        self.sql_duration = 0
+        self._lock = threading.Lock()
+
+    def set_operation(self, operation_ast):
+        if operation_ast is None:
+            return
+        self.operation_type = operation_ast.operation.value
+        if operation_ast.name is not None:
+            self.operation_name = operation_ast.name.value
+
+    def record_sql(self, duration):
+        with self._lock:
+            self.sql_count += 1
+            self.sql_duration += duration
+
+    def record_resolver(self, info, start, end):
+        self.resolvers.append({
+            'path': info.path.as_list(),
+            'parentType': info.parent_type.name,
+            'fieldName': info.field_name,
+            'returnType': str(info.return_type),
+            'startOffset': start - self.start,
+            'duration': end - start,
+        })
+
+    def finish(self):
+        if self.duration is None:
+            self.duration = time.perf_counter_ns() - self.start
+
+    def extension(self):
+        return {
+            'version': 1,
+            'startTime': self.started_at.isoformat(),
+            'endTime': (self.started_at + timedelta(microseconds=self.duration / 1000)).isoformat(),
+            'duration': self.duration,
+            'execution': {'resolvers': self.resolvers},
+            'sql': {'count': self.sql_count, 'duration': self.sql_duration},
+        }
+
+    def slowest_resolver(self):
+        return max(self.resolvers, key=lambda resolver: resolver['duration'], default=None)
+
+    def log(self):
+        slowest = self.slowest_resolver()
+        logger.info(
+            'graphql operation=%s type=%s duration_ms=%.2f sql_count=%d sql_ms=%.2f resolvers=%d slowest=%s',
+            self.operation_name or '-',
+            self.operation_type or '-',
+            self.duration / 1e6,
+            self.sql_count,
+            self.sql_duration / 1e6,
+            len(self.resolvers),
+            '.'.join(map(str, slowest['path'])) if slowest else '-',
+            extra={'graphql': {
+                'operation_name': self.operation_name,
+                'operation_type': self.operation_type,
+                'duration_ms': self.duration / 1e6,
+                'sql_count': self.sql_count,
+                'sql_ms': self.sql_duration / 1e6,
+                'resolvers': len(self.resolvers),
+            }},
+        )
+
+
+def server_timing(traces):
+    """The Server-Timing header value for the traces of one request (several for a batch)."""
+    duration = sum(trace.duration for trace in traces)
+    sql_duration = sum(trace.sql_duration for trace in traces)
+    sql_count = sum(trace.sql_count for trace in traces)
+    return (
+        f'graphql;dur={duration / 1e6:.2f}, '
+        f'sql;dur={sql_duration / 1e6:.2f};desc="{sql_count} queries"'
+    )
+
+
+@contextmanager
+def trace_operation(operation_name=None):
+    """Makes a new trace current for the duration of the block; yields None when tracing is off."""
+    if not tracing_enabled():
+        yield None
+        return
+    trace = OperationTrace(operation_name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        trace.finish()
+
+
+def trace_sql(execute, sql, params, many, context):
+    """Database execute wrapper that adds each statement to the current trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter_ns()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        trace.record_sql(time.perf_counter_ns() - start)
+
+
+def install_sql_tracing(sender, connection, **kwargs):
+    """``connection_created`` receiver; a reconnecting wrapper keeps its execute wrappers."""
+    if trace_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(trace_sql)
+
+
+class TracingMiddleware:
+    """Graphene middleware recording the duration of each field resolver in the current trace."""
+
+    def resolve(self, next, root, info, **args):
+        trace = _current_trace.get()
+        if trace is None:
+            return next(root, info, **args)
+        start = time.perf_counter_ns()
+        result = next(root, info, **args)
+        if isawaitable(result):
+            return self.resolve_async(trace, result, info, start)
+        trace.record_resolver(info, start, time.perf_counter_ns())
+        return result
+
+    @staticmethod
+    async def resolve_async(trace, result, info, start):
+        try:
+            return await result
+        finally:
+            trace.record_resolver(info, start, time.perf_counter_ns())
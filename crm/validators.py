@@ -0,0 +1,37 @@
+# alx-backend-graphql_crm/crm/validators.py
+"""
+Field validation shared by the GraphQL mutations and the bulk importer, kept
+apart from the schema so the importer does not load graphene to check a row.
+"""
+import re
+from functools import lru_cache
+
+from django.core import validators
+from django.core.exceptions import ValidationError
+
+PHONE_REGEX = re.compile(r'^\+?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}$')
+
+
+class EmailValidator(validators.EmailValidator):
+    """
+    Django's email validation, with its patterns compiled up front instead of
+    reached through a lazy object on every call, and the verdict for each
+    domain remembered: an import checks many addresses on a few domains.
+    """
+
+    user_regex = re.compile(validators.EmailValidator.user_regex.pattern, re.IGNORECASE)
+    domain_regex = re.compile(validators.EmailValidator.domain_regex.pattern, re.IGNORECASE)
+    literal_regex = re.compile(validators.EmailValidator.literal_regex.pattern, re.IGNORECASE)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.validate_domain_part = lru_cache(maxsize=1024)(self.validate_domain_part)
+
+
+validate_email = EmailValidator()
+
+
+def validate_phone(phone):
+    """Validates phone number format."""
+    if phone and not PHONE_REGEX.match(phone):
+        raise ValidationError("Invalid phone number format. Please use a valid format (e.g., +1234567890 or 123-456-7890).")
@@ -1,3 +1,444 @@
-from django.shortcuts import render
+import codecs
+import json
+import tempfile
+from collections import namedtuple
+from dataclasses import asdict
+from inspect import isawaitable
 
-# Create your views here.
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBadRequest
+from django.views import View
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, OperationType, execute, get_operation_ast, validate_schema
+from graphql.error import GraphQLError
+
+from .cost import check_query_cost
+from .db import read_alias, read_from
+from .documents import PersistedQueryNotFound, document_cache, persisted_queries
+from .exports import EXPORTS, FORMATS, stream_export
+from .imports import IMPORTS, import_rows
+from .loaders import AsyncDataLoader, RequestLoaders
+from .response_cache import response_cache
+from .threadpool import run_blocking
+from .tracing import current_trace, server_timing, trace_operation
+
+# Rejected rows of an upload kept in memory before spooling to disk
+IMPORT_ERRORS_MEMORY_SIZE = 1024 * 1024
+
+# A parsed, validated and costed operation, ready to execute.
+PreparedOperation = namedtuple(
+    'PreparedOperation',
+    ('schema', 'query', 'document', 'operation_ast', 'variables', 'operation_name', 'extensions'),
+)
+
+
+def with_extensions(result, extensions):
+    result.extensions = {**(result.extensions or {}), **extensions}
+    return result
+
+
+class CRMGraphQLView(GraphQLView):
+    """
+    GraphQLView that reuses parsed and validated documents from an LRU cache
+    and accepts persisted queries sent as a SHA-256 id. Operations over the
+    query cost limit are rejected before execution, and the response
+    ``extensions`` carry the computed cost. Query results are served from
+    the response cache while the models they read are unchanged. Query
+    operations read from the read database alias (see crm/db.py). Each
+    operation is traced (see crm/tracing.py).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        return self.add_server_timing(request, super().dispatch(request, *args, **kwargs))
+
+    @staticmethod
+    def add_server_timing(request, response):
+        traces = getattr(request, '_crm_traces', None)
+        if traces:
+            response['Server-Timing'] = server_timing(traces)
+        return response
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        with trace_operation(operation_name) as trace:
+            execution_result = self.execute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+        execution_result = self.report_trace(request, trace, execution_result)
+        return self.build_response(request, execution_result, id, show_graphiql)
+
+    @staticmethod
+    def report_trace(request, trace, execution_result):
+        """Logs a finished trace and adds it to the result and the request's Server-Timing."""
+        if trace is None or execution_result is None:
+            return execution_result
+        trace.log()
+        request._crm_traces = [*getattr(request, '_crm_traces', ()), trace]
+        return with_extensions(execution_result, {"tracing": trace.extension()})
+
+    def build_response(self, request, execution_result, id, show_graphiql=False):
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                set_rollback()
+                response["errors"] = [
+                    self.format_error(e) for e in execution_result.errors
+                ]
+
+            if execution_result.errors and any(
+                not getattr(e, "path", None) for e in execution_result.errors
+            ):
+                status_code = 400
+            else:
+                response["data"] = execution_result.data
+
+            if execution_result.extensions:
+                response["extensions"] = execution_result.extensions
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+    def get_persisted_query(self, request, data):
+        """Returns the ``extensions.persistedQuery`` payload of the request, if any."""
+        extensions = request.GET.get('extensions') or data.get('extensions')
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        return (extensions or {}).get('persistedQuery')
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        operation = self.prepare_operation(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if not isinstance(operation, PreparedOperation):
+            return operation
+
+        plan = self.get_cache_plan(operation)
+        cache_key, data = response_cache.lookup(plan, operation.operation_name, operation.variables)
+        if data is not None:
+            return self.cached_result(data, operation)
+
+        result = self.execute_operation(request, operation)
+        if cache_key is not None and not result.errors:
+            response_cache.store(cache_key, result.data)
+        return with_extensions(result, operation.extensions)
+
+    @staticmethod
+    def get_cache_plan(operation):
+        return response_cache.plan(
+            operation.schema,
+            operation.query,
+            operation.document,
+            operation.operation_ast,
+            operation.operation_name,
+        )
+
+    @staticmethod
+    def cached_result(data, operation):
+        return with_extensions(ExecutionResult(data=data), {**operation.extensions, "responseCache": "HIT"})
+
+    def prepare_operation(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        """
+        Resolves, parses, validates and costs the requested operation. Returns
+        a PreparedOperation, or the ExecutionResult (None for GraphiQL) to
+        answer with instead.
+        """
+        persisted_query = self.get_persisted_query(request, data)
+        if persisted_query:
+            sha256_hash = persisted_query.get('sha256Hash')
+            try:
+                if query:
+                    persisted_queries.register(query, sha256_hash)
+                else:
+                    query = persisted_queries.resolve(sha256_hash)
+            except PersistedQueryNotFound as e:
+                return ExecutionResult(errors=[
+                    GraphQLError(str(e), extensions={'code': 'PERSISTED_QUERY_NOT_FOUND'})
+                ])
+            except Exception as e:
+                return ExecutionResult(errors=[e])
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        document, errors = document_cache.get_document(
+            schema, query, self.validation_rules, graphene_settings.MAX_VALIDATION_ERRORS,
+            cache_invalid=bool(persisted_query),
+        )
+        if document is None:
+            return ExecutionResult(errors=errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseNotAllowed(
+                ["POST"],
+                f"Can only perform a {operation_ast.operation.value} operation from a POST request.",
+            ))
+
+        if errors:
+            return ExecutionResult(data=None, errors=errors)
+
+        trace = current_trace()
+        if trace is not None:
+            trace.set_operation(operation_ast)
+
+        try:
+            extensions = {"cost": check_query_cost(schema, document, operation_name, variables)}
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e])
+
+        return PreparedOperation(
+            schema, query, document, operation_ast, variables, operation_name, extensions
+        )
+
+    def get_execute_options(self, request, operation):
+        execute_options = {
+            "root_value": self.get_root_value(request),
+            "context_value": self.get_context(request),
+            "variable_values": operation.variables,
+            "operation_name": operation.operation_name,
+            "middleware": self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            execute_options["execution_context_class"] = self.execution_context_class
+        return execute_options
+
+    @staticmethod
+    def is_atomic_mutation(operation_ast):
+        return (
+            operation_ast is not None
+            and operation_ast.operation == OperationType.MUTATION
+            and (
+                graphene_settings.ATOMIC_MUTATIONS is True
+                or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+            )
+        )
+
+    @staticmethod
+    def database_for_reads(operation_ast):
+        """Query operations read from the read alias; mutations keep reading where they write."""
+        if operation_ast is not None and operation_ast.operation == OperationType.QUERY:
+            return read_alias()
+        return None
+
+    def execute_operation(self, request, operation):
+        with read_from(self.database_for_reads(operation.operation_ast)):
+            return self.execute_routed_operation(request, operation)
+
+    def execute_routed_operation(self, request, operation):
+        try:
+            execute_options = self.get_execute_options(request, operation)
+
+            if self.is_atomic_mutation(operation.operation_ast):
+                with transaction.atomic():
+                    result = execute(operation.schema, operation.document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            return execute(operation.schema, operation.document, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+
+class OffloadRootResolversMiddleware:
+    """
+    Runs root query and mutation resolvers in the ORM thread pool. Root
+    connection fields evaluate their page inside the resolver; nested
+    relations are left to the async loaders.
+    """
+
+    def resolve(self, next, root, info, **args):
+        if info.path.prev is not None or info.field_name.startswith('__'):
+            return next(root, info, **args)
+        return run_blocking(self.resolve_blocking, next, root, info, **args)
+
+    @staticmethod
+    def resolve_blocking(next, root, info, **args):
+        result = next(root, info, **args)
+        # A lazy queryset would otherwise be evaluated on the event loop.
+        return list(result) if isinstance(result, QuerySet) else result
+
+
+class AsyncCRMGraphQLView(CRMGraphQLView):
+    """
+    CRMGraphQLView for ASGI. The request does not hold a worker thread: root
+    query fields and mutations run in the bounded ORM thread pool, relations
+    are batched by AsyncDataLoaders, and independent root fields and loader
+    batches run concurrently.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method.lower() not in ("get", "post"):
+                raise HttpError(HttpResponseNotAllowed(
+                    ["GET", "POST"], "GraphQL only supports GET and POST requests."
+                ))
+
+            data = self.parse_body(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                return super().dispatch(request, *args, **kwargs)
+
+            if self.batch:
+                responses = [await self.aget_response(request, entry) for entry in data]
+                result = "[{}]".format(",".join([response[0] for response in responses]))
+                status_code = (
+                    responses and max(responses, key=lambda response: response[1])[1] or 200
+                )
+            else:
+                result, status_code = await self.aget_response(request, data)
+
+            return self.add_server_timing(
+                request,
+                HttpResponse(status=status_code, content=result, content_type="application/json"),
+            )
+
+        except HttpError as e:
+            response = e.response
+            response["Content-Type"] = "application/json"
+            response.content = self.json_encode(request, {"errors": [self.format_error(e)]})
+            return response
+
+    async def aget_response(self, request, data):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        with trace_operation(operation_name) as trace:
+            operation = self.prepare_operation(request, data, query, variables, operation_name)
+            if isinstance(operation, PreparedOperation):
+                execution_result = await self.aexecute_cached(request, operation)
+            else:
+                execution_result = operation
+        execution_result = self.report_trace(request, trace, execution_result)
+        return self.build_response(request, execution_result, id)
+
+    async def aexecute_cached(self, request, operation):
+        plan = self.get_cache_plan(operation)
+        cache_key, data = await response_cache.alookup(
+            plan, operation.operation_name, operation.variables
+        )
+        if data is not None:
+            return self.cached_result(data, operation)
+
+        result = await self.aexecute_operation(request, operation)
+        if cache_key is not None and not result.errors:
+            await response_cache.astore(cache_key, result.data)
+        return with_extensions(result, operation.extensions)
+
+    async def aexecute_operation(self, request, operation):
+        if self.is_atomic_mutation(operation.operation_ast):
+            # A transaction cannot span awaits on the event loop, so atomic
+            # mutations run synchronously in one pool thread.
+            return await run_blocking(self.execute_operation, request, operation)
+
+        request._crm_loaders = RequestLoaders(loader_class=AsyncDataLoader)
+        try:
+            execute_options = self.get_execute_options(request, operation)
+            execute_options["middleware"] = [
+                OffloadRootResolversMiddleware(),
+                *(execute_options["middleware"] or []),
+            ]
+            with read_from(self.database_for_reads(operation.operation_ast)):
+                result = execute(operation.schema, operation.document, **execute_options)
+                if isawaitable(result):
+                    result = await result
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+
+class ExportView(View):
+    """
+    Streams the orders, customers or products matching the filters in the
+    query string as CSV or NDJSON (see crm/exports.py).
+    """
+    http_method_names = ['get']
+
+    def get(self, request, resource, export_format):
+        export = EXPORTS.get(resource)
+        if export is None or export_format not in FORMATS:
+            raise Http404(f"No export of '{resource}' as '{export_format}'.")
+        filterset = export.filterset(request.GET)
+        if not filterset.is_valid():
+            return JsonResponse({'errors': filterset.errors}, status=400)
+
+        response = StreamingHttpResponse(
+            stream_export(export, filterset, export_format), content_type=FORMATS[export_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{resource}.{export_format}"'
+        return response
+
+
+class ImportView(View):
+    """
+    Imports customers or products from a CSV or NDJSON upload, sent as the
+    request body or as the ``file`` field of a multipart form (see
+    crm/imports.py). Responds with NDJSON: a summary line, then one line per
+    rejected row. Rejected rows are spooled to disk past
+    IMPORT_ERRORS_MEMORY_SIZE bytes.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, resource, import_format):
+        if resource not in IMPORTS or import_format not in FORMATS:
+            raise Http404(f"No import of '{resource}' from '{import_format}'.")
+        upload = request.FILES.get('file') if request.content_type == 'multipart/form-data' else request
+        if upload is None:
+            return JsonResponse({'errors': ["Send the file as the request body or a 'file' field."]}, status=400)
+
+        errors = tempfile.SpooledTemporaryFile(max_size=IMPORT_ERRORS_MEMORY_SIZE, mode='w+', encoding='utf-8')
+        try:
+            result = import_rows(resource, codecs.iterdecode(upload, 'utf-8-sig', 'replace'), import_format, errors)
+        except BaseException:
+            errors.close()
+            raise
+        errors.seek(0)
+
+        def lines():
+            try:
+                yield json.dumps(asdict(result)) + '\n'
+                yield from errors
+            finally:
+                errors.close()
+
+        return StreamingHttpResponse(lines(), content_type=FORMATS['ndjson'])